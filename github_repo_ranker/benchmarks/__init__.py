@@ -0,0 +1,3 @@
+"""
+ranker 的离线基准测试，在 github_repo_ranker 目录下运行 python -m benchmarks.run_benchmark
+"""
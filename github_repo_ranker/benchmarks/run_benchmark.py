@@ -0,0 +1,211 @@
+"""
+离线基准测试
+
+在本地启动 GitHub API 桩服务，分别对 30、1000、10000 个仓库的关注列表运行完整调研流程，
+统计吞吐量（仓库/秒）、单个仓库的 p50/p95 延迟、每个仓库的 API 调用次数和峰值内存，结果保存为 JSON 便于对比。
+每个场景在独立的子进程中运行，峰值内存互不影响；ranker 通过环境变量指向桩服务，不会访问真实的 GitHub。
+
+    python -m benchmarks.run_benchmark
+    python -m benchmarks.run_benchmark --sizes 30,1000 --fetch-mode graphql --latency-ms 100 --error-rate 0.01
+    python -m benchmarks.run_benchmark --compare benchmarks/results/ranker-20250420-101500.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .stub_server import StubConfig, StubServer
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULT_MARKER = "BENCHMARK_RESULT "
+# 不计入 GitHub API 调用次数的接口：翻译接口和 README 原文下载
+NON_API_ENDPOINTS = ("mymemory", "raw")
+
+
+def watch_list(size: int) -> List[str]:
+    return [f"bench-owner-{i // 100}/bench-repo-{i}" for i in range(size)]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # Windows 没有 resource 模块
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_worker(options: Dict):
+    """
+    子进程入口：环境变量已指向桩服务，运行一次调研并输出耗时和峰值内存
+    """
+    from ranker.core import rank
+
+    output_file = None
+    if options["report"] != "none":
+        output_file = str(Path(options["work_dir"]) / f"report.{options['report']}")
+    started = time.perf_counter()
+    repos = rank(
+        repo_names=watch_list(options["size"]),
+        search_query=options["search_query"],
+        search_results=options["search_results"],
+        fetch_mode=options["fetch_mode"],
+        backend=options["backend"],
+        output_file=output_file,
+        use_cache=options["use_cache"],
+    )
+    elapsed = time.perf_counter() - started
+    print(RESULT_MARKER + json.dumps({
+        "seconds": elapsed,
+        "repos": len(repos),
+        "errors": sum(1 for repo in repos if repo.get("error")),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def run_scenario(server: StubServer, options: Dict, label: str) -> Dict:
+    server.stats.reset()
+    env = dict(os.environ,
+               GITHUB_TOKEN="benchmark-token",
+               GITHUB_API_URL=server.base_url,
+               GITHUB_GRAPHQL_URL=f"{server.base_url}/graphql",
+               MYMEMORY_URL=f"{server.base_url}/mymemory",
+               GITHUB_RANKER_CACHE_DIR=str(Path(options["work_dir"]) / "cache"),
+               GITHUB_RANKER_DATA_DIR=str(Path(options["work_dir"]) / "data"))
+    process = subprocess.run([sys.executable, "-m", "benchmarks.run_benchmark", "--worker", json.dumps(options)],
+                             cwd=str(ROOT_DIR), env=env, capture_output=True, text=True, encoding="utf-8")
+    result_lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if process.returncode != 0 or not result_lines:
+        raise RuntimeError(f"场景 {label} 运行失败:\n{process.stderr[-2000:]}")
+    worker = json.loads(result_lines[-1][len(RESULT_MARKER):])
+
+    stats = server.stats.snapshot()
+    api_calls = sum(endpoint["calls"] for name, endpoint in stats["endpoints"].items() if name not in NON_API_ENDPOINTS)
+    latencies = stats["repo_latencies"]
+    size = options["size"]
+    return {
+        "scenario": label,
+        "size": size,
+        "run": options["run"],
+        "fetch_mode": options["fetch_mode"],
+        "backend": options["backend"],
+        "seconds": round(worker["seconds"], 3),
+        "repos": worker["repos"],
+        "errors": worker["errors"],
+        "repos_per_sec": round(worker["repos"] / worker["seconds"], 2) if worker["seconds"] else None,
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        "api_calls": api_calls,
+        "api_calls_per_repo": round(api_calls / size, 2) if size else None,
+        "rate_limit_used": stats["rate_limit_used"],
+        "bytes_sent": sum(endpoint["bytes"] for endpoint in stats["endpoints"].values()),
+        "peak_rss_mb": worker["peak_rss_mb"],
+        "statuses": stats["statuses"],
+        "endpoints": stats["endpoints"],
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT_DIR), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(scenarios: List[Dict], baseline: Optional[Dict] = None):
+    baseline_scenarios = {item["scenario"]: item for item in (baseline or {}).get("scenarios", [])}
+    metrics = [("repos_per_sec", "仓库/秒"), ("latency_p50_ms", "p50(ms)"), ("latency_p95_ms", "p95(ms)"),
+               ("api_calls_per_repo", "调用/仓库"), ("peak_rss_mb", "峰值内存(MB)")]
+    print(f"{'场景':<28}" + "".join(f"{title:>16}" for _, title in metrics))
+    for scenario in scenarios:
+        previous = baseline_scenarios.get(scenario["scenario"])
+        cells = []
+        for key, _ in metrics:
+            value = scenario[key]
+            cell = "-" if value is None else f"{value}"
+            if previous and previous.get(key) and value is not None:
+                cell += f" ({(value - previous[key]) / previous[key]:+.0%})"
+            cells.append(f"{cell:>16}")
+        print(f"{scenario['scenario']:<28}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在本地 GitHub API 桩服务上运行调研基准测试")
+    parser.add_argument("--sizes", default="30,1000,10000", help="关注列表的仓库数量，逗号分隔")
+    parser.add_argument("--fetch-mode", default="rest", choices=("rest", "graphql"))
+    parser.add_argument("--backend", default="threads", choices=("threads", "async"))
+    parser.add_argument("--report", default="none", choices=("none", "xlsx", "csv", "jsonl", "parquet"),
+                        help="同时输出报告，xlsx 会包含描述翻译")
+    parser.add_argument("--search-query", default=None, help="同时运行一次动态搜索")
+    parser.add_argument("--search-results", type=int, default=30, help="动态搜索结果数量")
+    parser.add_argument("--no-cache", action="store_true", help="不使用本地缓存")
+    parser.add_argument("--warm", action="store_true", help="每个场景在冷缓存运行后再用同一份缓存运行一次")
+    parser.add_argument("--output", help="结果 JSON 路径，默认写入 benchmarks/results/")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    for field, value in asdict(StubConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value, help=f"桩服务参数，默认 {value}")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return
+
+    config = StubConfig(**{field: getattr(args, field) for field in asdict(StubConfig())})
+    server = StubServer(config)
+    server.start()
+    print(f"桩服务已启动: {server.base_url}")
+
+    scenarios = []
+    try:
+        for size in [int(size) for size in args.sizes.split(",") if size.strip()]:
+            with tempfile.TemporaryDirectory(prefix="ranker-bench-") as work_dir:
+                runs = ["cold", "warm"] if args.warm and not args.no_cache else ["cold"]
+                for run in runs:
+                    label = f"{size}-{args.fetch_mode}-{args.backend}-{run}"
+                    print(f"运行场景 {label}...")
+                    scenarios.append(run_scenario(server, {
+                        "size": size, "run": run, "fetch_mode": args.fetch_mode, "backend": args.backend,
+                        "report": args.report, "search_query": args.search_query,
+                        "search_results": args.search_results, "use_cache": not args.no_cache, "work_dir": work_dir,
+                    }, label))
+    finally:
+        server.stop()
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stub": asdict(config),
+        "scenarios": scenarios,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"ranker-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    print_summary(scenarios, baseline)
+    print(f"结果已保存到 {output}")
+
+
+if __name__ == "__main__":
+    main()
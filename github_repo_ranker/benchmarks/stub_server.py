@@ -0,0 +1,359 @@
+"""
+本地 GitHub API 桩服务
+
+回放 fixtures/ 中录制的 GitHub REST、GraphQL 和 MyMemory 响应，按请求的仓库名改写名称、star 数等字段，
+可配置延迟、错误率、限流比例和 X-RateLimit-* 响应头，并支持 ETag 条件请求。
+同时按接口和仓库统计请求次数、字节数和耗时，供基准测试计算每个仓库的 API 调用次数和延迟。
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from copy import deepcopy
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+REPO_ROUTES = [
+    ("repo", re.compile(r"^/repos/([^/]+)/([^/]+)$")),
+    ("release", re.compile(r"^/repos/([^/]+)/([^/]+)/releases/latest$")),
+    ("license", re.compile(r"^/repos/([^/]+)/([^/]+)/license$")),
+    ("contents", re.compile(r"^/repos/([^/]+)/([^/]+)/contents/?$")),
+    ("readme", re.compile(r"^/repos/([^/]+)/([^/]+)/readme$")),
+    ("stargazers", re.compile(r"^/repos/([^/]+)/([^/]+)/stargazers$")),
+    ("raw", re.compile(r"^/raw/([^/]+)/([^/]+)/README\.md$")),
+]
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 50  # 每个请求的基础延迟(毫秒)
+    jitter_ms: float = 10  # 延迟的随机抖动(毫秒)
+    error_rate: float = 0.0  # 返回 502 的请求比例
+    throttle_rate: float = 0.0  # 返回 403 + Retry-After（二级速率限制）的请求比例
+    retry_after: int = 1  # 限流响应的 Retry-After(秒)
+    rate_limit: int = 1_000_000  # X-RateLimit-Limit，耗尽后返回 403 直到窗口重置
+    rate_limit_window: int = 3600  # 速率限制窗口(秒)
+    search_total: int = 1000  # 搜索接口返回的 total_count
+    seed: int = 0  # 随机数种子，保证多次运行的错误分布一致
+
+
+def repo_numbers(full_name: str) -> Tuple[int, int]:
+    """
+    由仓库名确定性地生成 star、fork 数，多次运行结果一致
+    """
+    digest = int(hashlib.md5(full_name.encode("utf-8")).hexdigest(), 16)
+    stars = digest % 50000
+    return stars, stars // 10
+
+
+class StubStats:
+    """
+    请求统计，线程安全
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.endpoints: Dict[str, Dict[str, float]] = {}
+            self.statuses: Dict[int, int] = {}
+            self.repo_spans: Dict[str, list] = {}
+            self.rate_limit_used = 0
+
+    def record(self, endpoint: str, status: int, sent_bytes: int, started: float, finished: float, repos=()):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {"calls": 0, "bytes": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["bytes"] += sent_bytes
+            stats["seconds"] += finished - started
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            for repo in repos:
+                span = self.repo_spans.setdefault(repo, [started, finished])
+                span[0] = min(span[0], started)
+                span[1] = max(span[1], finished)
+
+    def record_rate_limit_use(self):
+        with self._lock:
+            self.rate_limit_used += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "endpoints": deepcopy(self.endpoints),
+                "statuses": dict(self.statuses),
+                "repo_latencies": [finished - started for started, finished in self.repo_spans.values()],
+                "rate_limit_used": self.rate_limit_used,
+            }
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # 默认的监听队列只有 5，高并发时连接被丢弃后要等 1 秒才重试握手
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubServer:
+    """
+    在后台线程中运行的桩服务
+    """
+
+    def __init__(self, config: StubConfig = None, host: str = "127.0.0.1", port: int = 0,
+                 fixtures_dir: Path = FIXTURES_DIR):
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self.random = random.Random(self.config.seed)
+        # 随机数和速率限制窗口共用此锁
+        self.random_lock = threading.Lock()
+        self.fixtures = json.loads((fixtures_dir / "github_rest.json").read_text(encoding="utf-8"))
+        self.graphql_node = json.loads((fixtures_dir / "github_graphql.json").read_text(encoding="utf-8"))["repository"]
+        self.translation = json.loads((fixtures_dir / "mymemory.json").read_text(encoding="utf-8"))
+        self.readme = (fixtures_dir / "readme.md").read_bytes()
+        self.reset_at = int(time.time()) + self.config.rate_limit_window
+        self.window_used = 0
+        self.httpd = _HTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.random_lock:
+            return self.random.random() < rate
+
+    def consume_rate_limit(self) -> Optional[int]:
+        """
+        消耗一次配额，返回剩余配额；本窗口已耗尽时返回 None，窗口到期后重置
+        """
+        with self.random_lock:
+            if time.time() >= self.reset_at:
+                self.reset_at = int(time.time()) + self.config.rate_limit_window
+                self.window_used = 0
+            if self.window_used >= self.config.rate_limit:
+                return None
+            self.window_used += 1
+        self.stats.record_rate_limit_use()
+        return self.config.rate_limit - self.window_used
+
+    def peek_rate_limit(self) -> int:
+        with self.random_lock:
+            return self.config.rate_limit - self.window_used
+
+    def delay(self) -> float:
+        with self.random_lock:
+            jitter = self.random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(0.0, self.config.latency_ms + jitter) / 1000
+
+    # ---------- 响应构造 ----------
+
+    def repo_json(self, full_name: str) -> Dict:
+        owner, name = full_name.split("/", 1)
+        stars, forks = repo_numbers(full_name)
+        repo = deepcopy(self.fixtures["repo"])
+        repo.update(name=name, full_name=full_name, stargazers_count=stars, watchers_count=stars, watchers=stars,
+                    forks_count=forks, forks=forks, html_url=f"https://github.com/{full_name}",
+                    url=f"{self.base_url}/repos/{full_name}")
+        repo["owner"]["login"] = owner
+        return repo
+
+    def contents_json(self, full_name: str) -> list:
+        entries = deepcopy(self.fixtures["contents"])
+        for entry in entries:
+            if entry["name"] == "README.md":
+                entry["download_url"] = f"{self.base_url}/raw/{full_name}/README.md"
+                entry["sha"] = hashlib.sha1(full_name.encode("utf-8") + self.readme).hexdigest()
+        return entries
+
+    def stargazers_json(self, full_name: str, page: int, per_page: int) -> list:
+        """
+        生成按时间升序的 stargazers 分页：star 分布在最近两年内，越接近当前越密集
+        """
+        stars, _ = repo_numbers(full_name)
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=730)
+        template = self.fixtures["stargazer"]
+        items = []
+        for index in range((page - 1) * per_page, min(page * per_page, stars)):
+            progress = ((index + 1) / stars) ** 0.5
+            item = deepcopy(template)
+            item["starred_at"] = (start + (now - start) * progress).strftime("%Y-%m-%dT%H:%M:%SZ")
+            items.append(item)
+        return items
+
+    def search_json(self, page: int, per_page: int) -> Dict:
+        total = self.config.search_total
+        items = []
+        for index in range((page - 1) * per_page, min(page * per_page, total, 1000)):
+            full_name = f"search-owner-{index // 100}/search-repo-{index}"
+            item = deepcopy(self.fixtures["search_item"])
+            repo = self.repo_json(full_name)
+            item.update({key: repo[key] for key in item if key in repo})
+            items.append(item)
+        return {"total_count": total, "incomplete_results": False, "items": items}
+
+    def graphql_json(self, variables: Dict) -> Dict:
+        data = {}
+        index = 0
+        while f"owner{index}" in variables:
+            full_name = f"{variables[f'owner{index}']}/{variables[f'name{index}']}"
+            stars, forks = repo_numbers(full_name)
+            node = deepcopy(self.graphql_node)
+            node.update(nameWithOwner=full_name, stargazerCount=stars, forkCount=forks,
+                        owner={"login": variables[f"owner{index}"]})
+            node["readme0"] = {"text": self.readme.decode("utf-8")}
+            data[f"repo{index}"] = node
+            index += 1
+        return {"data": data}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 保持长连接，才能测出客户端连接池的效果
+            protocol_version = "HTTP/1.1"
+            # 响应头和响应体合并发送，避免 Nagle 算法与延迟确认叠加出额外的 40ms 延迟
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def _handle(self, method: str):
+                started = time.time()
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                body = None
+                if method == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                endpoint, repos, status, payload, content_type = server.route(method, url.path, query, body)
+
+                time.sleep(server.delay())
+                headers = {}
+                if endpoint not in ("mymemory", "raw"):
+                    if server.roll(server.config.throttle_rate):
+                        status, payload = 403, {"message": "You have exceeded a secondary rate limit."}
+                        headers["Retry-After"] = str(server.config.retry_after)
+                    elif server.roll(server.config.error_rate):
+                        status, payload = 502, {"message": "Server Error"}
+
+                content = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                etag = f'"{hashlib.md5(content).hexdigest()}"'
+                not_modified = status == 200 and method == "GET" and self.headers.get("If-None-Match") == etag
+                if not_modified:
+                    status, content = 304, b""
+                if endpoint not in ("mymemory", "raw"):
+                    # 与 GitHub 一致，304 响应同样带有速率限制头，但不消耗配额
+                    remaining = server.peek_rate_limit() if not_modified else server.consume_rate_limit()
+                    if remaining is None:
+                        remaining = 0
+                        status = 403
+                        content = json.dumps({"message": "API rate limit exceeded"}).encode("utf-8")
+                    headers.update({
+                        "X-RateLimit-Limit": str(server.config.rate_limit),
+                        "X-RateLimit-Remaining": str(remaining),
+                        "X-RateLimit-Reset": str(server.reset_at),
+                        "X-RateLimit-Used": str(server.config.rate_limit - remaining),
+                    })
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                if status in (200, 304):
+                    self.send_header("ETag", etag)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if content:
+                    self.wfile.write(content)
+                server.stats.record(endpoint, status, len(content), started, time.time(), repos)
+
+        return Handler
+
+    def route(self, method: str, path: str, query: Dict[str, str], body: Optional[Dict]):
+        """
+        :return: (接口名, 涉及的仓库, 状态码, 响应内容, Content-Type)
+        """
+        json_type = "application/json; charset=utf-8"
+        if method == "POST" and path == "/graphql":
+            variables = (body or {}).get("variables") or {}
+            payload = self.graphql_json(variables)
+            repos = [node["nameWithOwner"] for node in payload["data"].values()]
+            return "graphql", repos, 200, payload, json_type
+        if path == "/search/repositories":
+            payload = self.search_json(int(query.get("page", 1)), int(query.get("per_page", 30)))
+            return "search", (), 200, payload, json_type
+        if path == "/mymemory":
+            return "mymemory", (), 200, self.translation, json_type
+
+        for endpoint, pattern in REPO_ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            full_name = f"{match.group(1)}/{match.group(2)}"
+            repos = (full_name,)
+            if endpoint == "repo":
+                return endpoint, repos, 200, self.repo_json(full_name), json_type
+            if endpoint == "release":
+                return endpoint, repos, 200, self.fixtures["release"], json_type
+            if endpoint == "license":
+                return endpoint, repos, 200, self.fixtures["license"], json_type
+            if endpoint == "contents":
+                return endpoint, repos, 200, self.contents_json(full_name), json_type
+            if endpoint in ("readme", "raw"):
+                return endpoint, repos, 200, self.readme, "text/plain; charset=utf-8"
+            if endpoint == "stargazers":
+                page, per_page = int(query.get("page", 1)), int(query.get("per_page", 30))
+                return endpoint, repos, 200, self.stargazers_json(full_name, page, per_page), json_type
+        return "unknown", (), 404, {"message": "Not Found"}, json_type
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动本地 GitHub API 桩服务，便于手动调试")
+    parser.add_argument("--port", type=int, default=8765)
+    for field, value in asdict(StubConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    config = StubConfig(**{field: getattr(args, field) for field in asdict(StubConfig())})
+    server = StubServer(config, port=args.port)
+    print(f"桩服务已启动: {server.base_url}")
+    print(f"GITHUB_API_URL={server.base_url} GITHUB_GRAPHQL_URL={server.base_url}/graphql "
+          f"MYMEMORY_URL={server.base_url}/mymemory")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+GitHub Repo Ranker
+
+在进程内调用：
+
+    from ranker import rank
+    repos = rank(repo_names=["cline/cline"], search_query="mcp client", output_file="repo_rank.xlsx")
+
+rank 和 RepoRanker 在第一次访问时才导入，import ranker 本身不会加载 requests、PyGithub 等依赖。
+"""
+
+__all__ = ["rank", "RepoRanker", "clear_caches"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import core
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,238 @@
+"""
+基于 asyncio 的 HTTP 引擎
+
+所有请求共用一个 httpx.AsyncClient 连接池（安装 h2 后启用 HTTP/2 多路复用），按主机限制并发数，
+单线程即可同时处理上千个仓库。与线程池后端共用 HTTP 条件请求缓存、翻译缓存和文档链接缓存。
+"""
+import asyncio
+import importlib.util
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .doc_link import README_ACCEPT, STREAM_CHUNK_SIZE, DocLinkScanner
+from .graphql_engine import NO_LICENSE, parse_datetime
+from .http_cache import HttpCache, cache_key
+from .kv_cache import KVCache
+from .metrics import Metrics
+from .scheduler import throttle_delay
+from .settings import (ASYNC_MAX_CONNECTIONS_PER_HOST, ASYNC_MAX_IN_FLIGHT, GITHUB_API_URL, GITHUB_REQUEST_TIMEOUT,
+                       MYMEMORY_URL, README_MAX_BYTES, SCHEDULER_MAX_RETRIES, TRANSLATION_TIMEOUT)
+from .translation import parse_translation
+
+
+class AsyncGitHubClient:
+    """
+    asyncio 版本的仓库信息获取、搜索和翻译，需在 async with 中使用
+    """
+
+    def __init__(self, token: str, http_cache: Optional[HttpCache] = None, doc_link_cache: Optional[KVCache] = None,
+                 max_connections_per_host: int = ASYNC_MAX_CONNECTIONS_PER_HOST,
+                 max_in_flight: int = ASYNC_MAX_IN_FLIGHT, timeout: float = GITHUB_REQUEST_TIMEOUT,
+                 max_retries: int = SCHEDULER_MAX_RETRIES, metrics: Optional[Metrics] = None):
+        """
+        :param token: GitHub Token
+        :param http_cache: HTTP 条件请求缓存
+        :param doc_link_cache: 文档链接缓存，按仓库保存 README 的 ETag 和文档链接
+        :param max_connections_per_host: 每个主机的最大并发请求数
+        :param max_in_flight: 同时处理的最大仓库数
+        :param timeout: 请求超时时间(秒)
+        :param max_retries: 被限流时的最大重试次数
+        :param metrics: 指标收集器，请求和重试计入调用方所在的阶段
+        """
+        self.token = token
+        self.http_cache = http_cache
+        self.doc_link_cache = doc_link_cache
+        self.max_connections_per_host = max_connections_per_host
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retries = 0
+        self.metrics = metrics or Metrics()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        # 未安装 h2 时 httpx 无法协商 HTTP/2，退回 HTTP/1.1 keep-alive
+        http2 = importlib.util.find_spec("h2") is not None
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.max_connections_per_host * 4,
+                                max_keepalive_connections=self.max_connections_per_host * 4),
+            follow_redirects=True,
+        )
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"token {self.token}"}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_limits[host]
+
+    async def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                  timeout: Optional[float] = None) -> httpx.Response:
+        """
+        发送 GET 请求：按主机限制并发，附加条件请求头，被限流时按 Retry-After 等待后重试
+
+        :return: 成功的响应，304 时返回缓存内容；其他错误抛出 httpx.HTTPStatusError
+        """
+        for attempt in range(self.max_retries + 1):
+            request = self._client.build_request("GET", url, params=params, headers=headers,
+                                                 timeout=timeout or self.timeout)
+            key = entry = None
+            if self.http_cache:
+                key = cache_key(request)
+                entry = self.http_cache.get(key)
+                if entry and entry["etag"]:
+                    request.headers["If-None-Match"] = entry["etag"]
+                if entry and entry["last_modified"]:
+                    request.headers["If-Modified-Since"] = entry["last_modified"]
+
+            async with self._host_limit(url):
+                started = time.perf_counter()
+                response = await self._client.send(request)
+            elapsed = time.perf_counter() - started
+
+            if response.status_code == 304 and entry:
+                headers = httpx.Headers(entry["headers"])
+                headers.update(response.headers)
+                self.http_cache.record_hit()
+                self.metrics.record_response("GET", str(request.url), entry["status"], headers, 0, elapsed, True)
+                return httpx.Response(entry["status"], headers=headers, content=entry["body"], request=request)
+            self.metrics.record_response("GET", str(request.url), response.status_code, response.headers,
+                                         len(response.content), elapsed)
+
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                delay = throttle_delay(e)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                self.metrics.record_retry()
+                await asyncio.sleep(delay)
+                continue
+
+            if key and response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+                self.http_cache.set(key, str(request.url), response)
+            return response
+
+    async def fetch_repo_info(self, repo_name: str, error_handler: Callable[[str, str], Dict]) -> Dict:
+        """
+        获取仓库信息，返回结构与 RepoRanker.fetch_repo_info 一致
+        """
+        async with self._in_flight:
+            try:
+                with self.metrics.stage("fetch_repo_info"):
+                    return await self._load_repo_info(repo_name)
+            except Exception as e:
+                return error_handler(repo_name, str(e))
+
+    async def _load_repo_info(self, repo_name: str) -> Dict:
+        repo = (await self.get(f"{GITHUB_API_URL}/repos/{repo_name}", headers=self.auth_headers)).json()
+        full_name = repo["full_name"]
+        # 仓库详情已包含开源协议，其余两项并发获取
+        latest_release, doc_link = await asyncio.gather(self._latest_release(full_name), self._doc_link(full_name))
+        return {
+            "name": full_name,
+            "stars": repo["stargazers_count"],
+            "forks": repo["forks_count"],
+            "last_updated": parse_datetime(repo.get("updated_at")),
+            "owner": (repo.get("owner") or {}).get("login"),
+            "doc_link": doc_link,
+            "license": (repo.get("license") or {}).get("name") or NO_LICENSE,
+            "description": repo.get("description"),
+            "latest_release": latest_release,
+            "error": None
+        }
+
+    async def _latest_release(self, repo_name: str) -> Optional[str]:
+        try:
+            response = await self.get(f"{GITHUB_API_URL}/repos/{repo_name}/releases/latest", headers=self.auth_headers)
+            return response.json().get("tag_name")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    async def _doc_link(self, repo_name: str) -> Optional[str]:
+        with self.metrics.stage("extract_doc_link"):
+            return await self._find_doc_link(repo_name)
+
+    async def _find_doc_link(self, repo_name: str) -> Optional[str]:
+        url = f"{GITHUB_API_URL}/repos/{repo_name}/readme"
+        cached = self.doc_link_cache.get(repo_name) if self.doc_link_cache else None
+        headers = {"Accept": README_ACCEPT, **self.auth_headers}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        try:
+            async with self._host_limit(url):
+                started = time.perf_counter()
+                async with self._client.stream("GET", url, headers=headers) as response:
+                    scanner = DocLinkScanner(README_MAX_BYTES)
+                    try:
+                        if response.status_code == 304 and cached:
+                            return cached["doc_link"]
+                        if response.status_code == 404:
+                            return None
+                        response.raise_for_status()
+                        doc_link = None
+                        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                            doc_link = scanner.feed(chunk)
+                            if doc_link or scanner.exhausted:
+                                break
+                        else:
+                            doc_link = scanner.finish()
+                        etag = response.headers.get("ETag")
+                    finally:
+                        self.metrics.record_response("GET", url, response.status_code, response.headers,
+                                                     scanner.read_bytes, time.perf_counter() - started)
+            if self.doc_link_cache and etag:
+                self.doc_link_cache.set(repo_name, {"etag": etag, "doc_link": doc_link})
+            return doc_link
+        except Exception:
+            return None
+
+    async def fetch_many(self, repo_names: List[str], error_handler: Callable[[str, str], Dict]) -> List[Dict]:
+        """
+        并发获取多个仓库的信息，结果顺序与 repo_names 一致
+        """
+        return list(await asyncio.gather(*(self.fetch_repo_info(name, error_handler) for name in repo_names)))
+
+    async def search_repositories(self, query: str, per_page: int,
+                                  error_handler: Callable[[str, str], Dict]) -> List[Dict]:
+        """
+        搜索仓库并并发获取每个结果的完整信息
+        """
+        response = await self.get(f"{GITHUB_API_URL}/search/repositories", headers=self.auth_headers,
+                                  params={"q": query, "sort": "stars", "order": "desc", "per_page": per_page})
+        repo_names = [item.get("full_name") for item in response.json().get("items", [])]
+        return await self.fetch_many(repo_names, error_handler)
+
+    async def translate_many(self, texts: List[str], langpair: str) -> Dict[str, Optional[str]]:
+        """
+        并发翻译，返回 原文 -> 译文，失败为 None
+        """
+        results = await asyncio.gather(*(self._translate(text, langpair) for text in texts))
+        return dict(zip(texts, results))
+
+    async def _translate(self, text: str, langpair: str) -> Optional[str]:
+        try:
+            response = await self.get(MYMEMORY_URL, params={"q": text, "langpair": langpair},
+                                      timeout=TRANSLATION_TIMEOUT)
+            return parse_translation(response.json())
+        except Exception as e:
+            print(f"翻译 API 调用失败: {e}")
+            return None
@@ -0,0 +1,65 @@
+"""
+命令行入口
+
+只在解析完参数后才导入核心流程，--help 等不需要访问网络的操作无需加载 requests、PyGithub 等依赖。
+"""
+import argparse
+
+from .settings import (BACKENDS, DEFAULT_BACKEND, DEFAULT_FETCH_MODE, DEFAULT_INCREMENTAL, DEFAULT_OUTPUT_FILE, DEFAULT_SEARCH_ALL,
+                       DEFAULT_SEARCH_QUERY, DEFAULT_SEARCH_RESULTS, DEFAULT_SORT_KEY, DEFAULT_SPECIFY_REPO_NAMES,
+                       DEFAULT_STAR_HISTORY, FETCH_MODES, METRICS_FILE, PROMETHEUS_TEXTFILE, REPORT_FORMATS, SORT_KEYS)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="调研 GitHub 仓库并导出为 Excel/CSV/JSONL/Parquet 文件")
+    parser.add_argument("--repos", nargs="*", default=DEFAULT_SPECIFY_REPO_NAMES,
+                        help="指定仓库列表，如 owner/name，默认使用 settings.py 中的 DEFAULT_SPECIFY_REPO_NAMES")
+    parser.add_argument("--query", default=DEFAULT_SEARCH_QUERY, help="动态搜索关键词，传空字符串表示不搜索")
+    parser.add_argument("--search-results", type=int, default=DEFAULT_SEARCH_RESULTS, help="动态搜索结果数量")
+    parser.add_argument("--search-all", action="store_true", default=DEFAULT_SEARCH_ALL,
+                        help="获取搜索的全部结果，按 stars/created 区间分片突破 1000 条上限")
+    parser.add_argument("--sort", choices=SORT_KEYS, default=DEFAULT_SORT_KEY,
+                        help="排序方式，growth_7d/growth_30d/growth_90d 按近期新增 star 数排序（会自动采样 star 历史）")
+    parser.add_argument("--star-history", action="store_true", default=DEFAULT_STAR_HISTORY,
+                        help="采样 star 历史，在报告中输出近 7/30/90 天新增 star 数")
+    parser.add_argument("--fetch-mode", choices=FETCH_MODES, default=DEFAULT_FETCH_MODE,
+                        help="仓库信息获取方式：rest 逐个仓库调用 REST API，graphql 批量查询")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="并发后端：threads 使用线程池，async 使用 asyncio + httpx 连接池（需安装 httpx）")
+    parser.add_argument("--incremental", action="store_true", default=DEFAULT_INCREMENTAL,
+                        help="增量刷新指定仓库：对比本地快照，只重新获取有变化的仓库")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_FILE, help="输出文件路径，格式默认由扩展名决定")
+    parser.add_argument("--format", choices=REPORT_FORMATS,
+                        help="输出格式：xlsx 供人阅读（含描述翻译），csv/jsonl/parquet 输出原始字段供程序处理")
+    parser.add_argument("--metrics", default=METRICS_FILE,
+                        help="把分阶段指标（耗时、请求次数、字节数、重试、API 配额消耗）保存为 JSON 文件")
+    parser.add_argument("--prometheus-textfile", default=PROMETHEUS_TEXTFILE,
+                        help="同时把指标写成 node_exporter textfile collector 格式的 .prom 文件")
+    parser.add_argument("--no-cache", action="store_true", help="不使用本地缓存（HTTP、翻译、文档链接），所有请求直接访问接口")
+    parser.add_argument("--clear-cache", action="store_true", help="运行前清空所有本地缓存")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from .core import clear_caches, rank
+
+    if args.clear_cache:
+        clear_caches()
+    rank(
+        repo_names=args.repos,
+        search_query=args.query,
+        search_results=args.search_results,
+        search_all=args.search_all,
+        sort_key=args.sort,
+        fetch_mode=args.fetch_mode,
+        backend=args.backend,
+        star_history=args.star_history,
+        metrics_file=args.metrics,
+        prometheus_file=args.prometheus_textfile,
+        incremental=args.incremental,
+        output_file=args.output,
+        fmt=args.format,
+        use_cache=not args.no_cache,
+    )
@@ -0,0 +1,350 @@
+"""
+GitHub 仓库调研的核心流程
+
+RepoRanker 持有一次调研所需的客户端和缓存，PyGithub 客户端在第一次使用时才创建；
+rank() 是供其他程序在进程内直接调用的入口。
+backend="async" 时逐仓库获取、搜索和翻译改由 asyncio 引擎在单线程内并发完成，需要安装 httpx。
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+from .doc_link import DocLinkExtractor
+from .graphql_engine import NO_LICENSE, fetch_repos_graphql
+from .http_cache import CachingHTTPAdapter, HttpCache, install_pygithub_adapter
+from .kv_cache import KVCache
+from .metrics import Metrics
+from .report_writer import needs_translation, resolve_format, write_report
+from .scheduler import AdaptiveScheduler, RateLimitState
+from .search import search_all_repositories
+from .settings import (DEFAULT_BACKEND, DEFAULT_FETCH_MODE, DEFAULT_SEARCH_RESULTS, DEFAULT_SORT_KEY,
+                       DEFAULT_STAR_HISTORY, DOC_LINK_CACHE_PATH, GITHUB_API_URL, GITHUB_REQUEST_TIMEOUT, GITHUB_TOKEN,
+                       GROWTH_SORT_KEYS, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_PATH, METRICS_FILE, PROMETHEUS_TEXTFILE,
+                       SNAPSHOT_DB_PATH, STAR_HISTORY_CACHE_PATH, STAR_HISTORY_CACHE_TTL, TRANSLATION_CACHE_PATH)
+from .snapshot import SnapshotStore, refresh_incremental
+from .star_history import StarHistorySampler
+from .translation import Translator
+
+
+def clear_caches():
+    """
+    清空 HTTP、翻译、文档链接、star 历史缓存，快照和历史数据不受影响
+    """
+    HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES).clear()
+    KVCache(TRANSLATION_CACHE_PATH, "translations").clear()
+    KVCache(DOC_LINK_CACHE_PATH, "doc_links").clear()
+    KVCache(STAR_HISTORY_CACHE_PATH, "star_history").clear()
+    print(f"已清空本地缓存: {HTTP_CACHE_PATH.parent}")
+
+
+class RepoRanker:
+    """
+    GitHub 仓库调研器
+    """
+
+    def __init__(self, token: Optional[str] = None, fetch_mode: str = DEFAULT_FETCH_MODE, use_cache: bool = True,
+                 backend: str = DEFAULT_BACKEND):
+        """
+        :param token: GitHub Token，默认读取环境变量 GITHUB_TOKEN
+        :param fetch_mode: 仓库信息获取方式，"rest" 或 "graphql"
+        :param use_cache: 是否使用本地 HTTP、翻译、文档链接缓存
+        :param backend: 并发后端，"threads" 使用线程池和 PyGithub，"async" 使用 asyncio + httpx
+        """
+        self.token = token or GITHUB_TOKEN
+        if not self.token:
+            raise ValueError("GITHUB_TOKEN 未设置，请配置有效的 GitHub Token。")
+        self.fetch_mode = fetch_mode
+        self.backend = backend
+        self._github = None
+        self._github_lock = threading.Lock()
+        # 启用缓存时挂载到 PyGithub 客户端的 adapter
+        self._github_adapter = None
+        # 分阶段统计耗时、请求和 API 配额消耗
+        self.metrics = Metrics()
+        # PyGithub 最近一次响应的速率限制头，供调度器调整并发
+        self.github_rate_limit = RateLimitState()
+        # 搜索、GraphQL、翻译等直接发起的请求共用此 Session
+        self.http_session = requests.Session()
+        self.http_session.hooks["response"].append(self.metrics.response_hook)
+        self.http_cache = None
+        request_many = None
+        if backend == "async":
+            request_many = lambda texts: self._run_async(
+                lambda client: client.translate_many(texts, self.translator.langpair))
+        self.translator = Translator(session=self.http_session, request_many=request_many, metrics=self.metrics)
+        self.doc_link_extractor = DocLinkExtractor(self.token, session=self.http_session)
+        self.star_history_sampler = StarHistorySampler(self.token, session=self.http_session)
+        if use_cache:
+            self.enable_cache()
+
+    @property
+    def github(self):
+        """
+        PyGithub 客户端，第一次使用时才导入并创建，连接挂载本实例的缓存和指标钩子
+        """
+        if self._github is None:
+            with self._github_lock:
+                if self._github is None:
+                    from github import Github
+                    github = Github(self.token, base_url=GITHUB_API_URL)
+                    install_pygithub_adapter(github, self._github_adapter,
+                                             response_hooks=[self.metrics.response_hook,
+                                                             self.github_rate_limit.response_hook])
+                    self._github = github
+        return self._github
+
+    # 启用本地缓存，PyGithub 客户端与 http_session 共用同一份 HTTP 缓存
+    def enable_cache(self):
+        self.http_cache = HttpCache(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES)
+        adapter = CachingHTTPAdapter(self.http_cache)
+        self.http_session.mount("https://", adapter)
+        self.http_session.mount("http://", adapter)
+        self._github_adapter = adapter
+        self.translator.cache = KVCache(TRANSLATION_CACHE_PATH, "translations")
+        self.doc_link_extractor.cache = KVCache(DOC_LINK_CACHE_PATH, "doc_links")
+        self.star_history_sampler.cache = KVCache(STAR_HISTORY_CACHE_PATH, "star_history", ttl=STAR_HISTORY_CACHE_TTL)
+
+    # 在新的事件循环中运行 make_coro(client)，client 与线程池后端共用 HTTP、文档链接缓存；
+    # 调用方所在线程已有运行中的事件循环时（Jupyter、异步服务中调用 rank()），改在单独的线程中运行
+    def _run_async(self, make_coro):
+        from .async_engine import AsyncGitHubClient
+
+        async def runner():
+            async with AsyncGitHubClient(self.token, http_cache=self.http_cache,
+                                         doc_link_cache=self.doc_link_extractor.cache,
+                                         metrics=self.metrics) as client:
+                return await make_coro(client)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(runner())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            # 复制上下文，请求仍计入调用方所在的指标阶段
+            return executor.submit(contextvars.copy_context().run, asyncio.run, runner()).result()
+
+    # 获取仓库信息
+    def fetch_repo_info(self, repo_name):
+        try:
+            return self.load_repo_info(repo_name)
+        except Exception as e:
+            return self.handle_repo_error(repo_name, str(e))
+
+    # 获取仓库信息，出错时直接抛出异常，供调度器区分限流和其他错误
+    def load_repo_info(self, repo_name):
+        with self.metrics.stage("fetch_repo_info"):
+            repo = self.github.get_repo(repo_name)
+            # 仓库详情已包含开源协议，不再单独请求 /license
+            return {
+                "name": repo.full_name,
+                "stars": repo.stargazers_count,
+                "forks": repo.forks_count,
+                "last_updated": repo.updated_at,
+                "owner": repo.owner.login,
+                "doc_link": self.extract_doc_link(repo),
+                "license": repo.license.name if repo.license else NO_LICENSE,
+                "description": repo.description,
+                "latest_release": self.latest_release(repo),
+                "error": None
+            }
+
+    # 获取最近发布版本的标签，仓库没有发布版本时 GitHub 返回 404，记为 None 而不是错误
+    @staticmethod
+    def latest_release(repo):
+        from github import UnknownObjectException
+        try:
+            return repo.get_latest_release().tag_name
+        except UnknownObjectException:
+            return None
+
+    # 处理仓库错误
+    @staticmethod
+    def handle_repo_error(repo_name, error_message):
+        if "404" in error_message:
+            error_message = "仓库不存在或不可访问 (404)"
+        print(f"获取 {repo_name} 的信息时出错: {error_message}")
+        return {
+            "name": repo_name,
+            "stars": 0,
+            "forks": 0,
+            "last_updated": None,
+            "owner": None,
+            "doc_link": None,
+            "license": NO_LICENSE,
+            "description": None,
+            "latest_release": None,
+            "error": error_message
+        }
+
+    # 提取文档链接，流式读取 README，命中第一个链接即停止
+    def extract_doc_link(self, repo):
+        try:
+            with self.metrics.stage("extract_doc_link"):
+                return self.doc_link_extractor.extract(repo.full_name)
+        except Exception:
+            pass
+        return None
+
+    # 搜索 GitHub 仓库
+    def search_github_repositories(self, query, per_page=10, search_all=False):
+        if search_all:
+            print("分片获取全部搜索结果...")
+            return search_all_repositories(query, self.token, session=self.http_session)
+        if self.backend == "async" and self.fetch_mode == "rest":
+            try:
+                return self._run_async(lambda client: client.search_repositories(query, per_page, self.handle_repo_error))
+            except Exception as e:
+                print(f"GitHub 搜索 API 调用失败: {e}")
+                return []
+        url = f"{GITHUB_API_URL}/search/repositories"
+        headers = {"Authorization": f"token {self.token}"}
+        params = {"q": query, "sort": "stars", "order": "desc", "per_page": per_page}
+        try:
+            response = self.http_session.get(url, headers=headers, params=params, timeout=GITHUB_REQUEST_TIMEOUT)
+            response.raise_for_status()
+            repo_names = [item.get("full_name") for item in response.json().get("items", [])]
+            if self.fetch_mode == "graphql":
+                return self.fetch_repos(repo_names)
+            return [self.fetch_repo_info(repo_name) for repo_name in repo_names]
+        except Exception as e:
+            print(f"GitHub 搜索 API 调用失败: {e}")
+            return []
+
+    # 获取指定仓库信息
+    def fetch_specified_repos(self, repo_names, incremental=False):
+        print("获取指定仓库信息...")
+        if incremental:
+            return refresh_incremental(repo_names, SnapshotStore(SNAPSHOT_DB_PATH), self.token, self.fetch_repos,
+                                       session=self.http_session)
+        return self.fetch_repos(repo_names)
+
+    # 按配置的获取方式完整获取一批仓库信息
+    def fetch_repos(self, repo_names):
+        if self.fetch_mode == "graphql":
+            with self.metrics.stage("fetch_repos_graphql"):
+                return fetch_repos_graphql(repo_names, self.token, self.handle_repo_error, session=self.http_session)
+        if self.backend == "async":
+            return self._run_async(lambda client: client.fetch_many(repo_names, self.handle_repo_error))
+        scheduler = AdaptiveScheduler(rate_limit_probe=self.github_rate_limit)
+        results = scheduler.run(self.load_repo_info, repo_names,
+                                lambda repo_name, e: self.handle_repo_error(repo_name, str(e)))
+        self.metrics.record_retry(scheduler.stats.retries, stage="fetch_repo_info")
+        print(scheduler.stats.summary())
+        return results
+
+    # 采样 star 历史，为每个仓库补充近 7/30/90 天新增 star 数（growth_7d 等）和 star 曲线（star_curve）
+    def add_star_history(self, repo_infos):
+        targets = [repo_info for repo_info in repo_infos if not repo_info.get("error")]
+        print(f"采样 {len(targets)} 个仓库的 star 历史...")
+        sampler = self.star_history_sampler
+        scheduler = AdaptiveScheduler(rate_limit_probe=sampler.rate_limit)
+
+        def on_error(repo_info, e):
+            print(f"采样 {repo_info['name']} 的 star 历史时出错: {e}")
+            return None
+
+        histories = scheduler.run(lambda repo_info: sampler.sample(repo_info["name"], repo_info["stars"]), targets,
+                                  on_error)
+        self.metrics.record_retry(scheduler.stats.retries, stage="add_star_history")
+        for repo_info, history in zip(targets, histories):
+            if history:
+                repo_info.update({key: history.get(key) for key in GROWTH_SORT_KEYS}, star_curve=history["curve"])
+        print(scheduler.stats.summary())
+
+    # 流式保存报告，格式由 fmt 或文件扩展名决定（xlsx/csv/jsonl/parquet）；
+    # Excel 的描述译文在写入前一次性预取，写入过程只读内存
+    def save_report(self, repo_infos, output_file, fmt=None, translations=None):
+        fmt = resolve_format(output_file, fmt)
+        if translations is None and needs_translation(fmt):
+            repo_infos = list(repo_infos)
+            translations = self.translator.prefetch(repo_info['description'] for repo_info in repo_infos)
+        with self.metrics.stage("save_report"):
+            count = write_report(repo_infos, output_file, fmt, translations=translations)
+        print(f"结果已保存到 {output_file}，共 {count} 个仓库")
+
+    # 保存为 Excel，translations 为预先翻译好的 描述 -> 译文 映射，不传时在写入前预取
+    def save_to_excel(self, repo_info_list, output_file, translations=None):
+        self.save_report(repo_info_list, output_file, "xlsx", translations)
+
+    # 翻译为中文
+    def translate_to_chinese(self, text):
+        return self.translator.translate(text)
+
+
+def rank(repo_names: Optional[List[str]] = None, search_query: Optional[str] = None,
+         search_results: int = DEFAULT_SEARCH_RESULTS, search_all: bool = False,
+         sort_key: str = DEFAULT_SORT_KEY, fetch_mode: str = DEFAULT_FETCH_MODE, incremental: bool = False,
+         output_file: Optional[str] = None, fmt: Optional[str] = None, use_cache: bool = True,
+         token: Optional[str] = None, backend: str = DEFAULT_BACKEND,
+         star_history: bool = DEFAULT_STAR_HISTORY, metrics_file: Optional[str] = METRICS_FILE,
+         prometheus_file: Optional[str] = PROMETHEUS_TEXTFILE) -> List[Dict]:
+    """
+    调研指定仓库和搜索结果，合并去重后排序
+
+    :param repo_names: 指定仓库列表
+    :param search_query: 动态搜索关键词，None 表示不搜索
+    :param search_results: 搜索结果数量
+    :param search_all: 是否分片获取搜索的全部结果
+    :param sort_key: 排序字段，可选 "stars"、"forks"、"last_updated"、"growth_7d"、"growth_30d"、"growth_90d"
+    :param fetch_mode: 仓库信息获取方式，"rest" 或 "graphql"
+    :param incremental: 是否对指定仓库增量刷新
+    :param output_file: 输出文件路径，None 表示不输出文件
+    :param fmt: 输出格式，默认由文件扩展名决定
+    :param use_cache: 是否使用本地缓存
+    :param token: GitHub Token，默认读取环境变量 GITHUB_TOKEN
+    :param backend: 并发后端，"threads" 或 "async"
+    :param star_history: 是否采样 star 历史估算近期增长，按增长排序时总会采样
+    :param metrics_file: 分阶段指标的 JSON 输出路径，None 表示不输出
+    :param prometheus_file: node_exporter textfile 格式的指标输出路径，None 表示不输出
+    :return: 排序后的仓库信息列表
+    """
+    ranker = RepoRanker(token=token, fetch_mode=fetch_mode, use_cache=use_cache, backend=backend)
+    print("开始调研 GitHub 仓库...")
+
+    metrics = ranker.metrics
+
+    # 获取指定仓库信息
+    specified_repos = []
+    if repo_names:
+        with metrics.stage("fetch_specified_repos"):
+            specified_repos = ranker.fetch_specified_repos(repo_names, incremental=incremental)
+
+    # 动态搜索开源项目
+    if search_query:
+        with metrics.stage("search_github_repositories"):
+            search_results = ranker.search_github_repositories(search_query, per_page=search_results,
+                                                               search_all=search_all)
+    else:
+        search_results = []
+
+    # 合并结果并去重
+    print("合并结果并去重...")
+    all_repos = list({repo['name']: repo for repo in specified_repos + search_results if repo.get('name')}.values())
+    if star_history or sort_key in GROWTH_SORT_KEYS:
+        with metrics.stage("add_star_history"):
+            ranker.add_star_history(all_repos)
+    # last_updated、增长数可能为 None（获取失败的仓库），排序时放到最后
+    sorted_repos = sorted(all_repos, key=lambda x: (x.get(sort_key) is not None, x.get(sort_key) or 0), reverse=True)
+
+    # 保存结果，Excel 的描述译文在写入前一次性预取
+    if output_file:
+        if sorted_repos:
+            print("保存结果到文件...")
+            ranker.save_report(sorted_repos, output_file, fmt)
+            print(f"调研完成，结果已保存到 {output_file}。")
+        else:
+            print("没有可用的仓库信息，未生成结果文件。")
+
+    if ranker.http_cache:
+        print(f"HTTP 缓存命中 {ranker.http_cache.hits} 次（304 响应不消耗 API 配额），新写入 {ranker.http_cache.stores} 条。")
+    metrics.print_summary()
+    if metrics_file:
+        metrics.write_json(metrics_file)
+        print(f"指标已保存到 {metrics_file}")
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+    return sorted_repos
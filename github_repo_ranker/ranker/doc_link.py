@@ -0,0 +1,139 @@
+"""
+README 文档链接提取
+
+每个仓库只请求一次 /readme 接口（原文格式），以流式方式读取，找到第一个文档链接或读满字节上限即停止；
+结果连同响应的 ETag 按仓库缓存，之后的请求携带 If-None-Match，README 未变化时 GitHub 返回 304，
+不下载内容也不计入速率限制。
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+import requests
+
+from .kv_cache import KVCache
+from .settings import GITHUB_API_URL, GITHUB_REQUEST_TIMEOUT, README_MAX_BYTES
+
+DOC_KEYWORD = re.compile(r"doc", re.IGNORECASE)
+URL_PATTERN = re.compile(r"https?://[^\s)\]>\"'<]+")
+# 徽章和图片的地址本身不是文档链接，例如 [![docs](https://img.shields.io/...)](https://docs.example.com)
+IMAGE_URL_PATTERNS = [
+    re.compile(r"!\[[^\]]*\]\((https?://[^)\s]+)"),
+    re.compile(r"<img\b[^>]*\bsrc=[\"'](https?://[^\"']+)", re.IGNORECASE),
+]
+README_ACCEPT = "application/vnd.github.raw"
+STREAM_CHUNK_SIZE = 8192
+
+
+def find_doc_link_in_line(line: str) -> Optional[str]:
+    """
+    从包含文档关键词的一行中提取链接，跳过图片地址，优先返回地址本身包含 doc 的链接
+    """
+    if 'http' not in line or not DOC_KEYWORD.search(line):
+        return None
+    image_urls = {match.group(1) for pattern in IMAGE_URL_PATTERNS for match in pattern.finditer(line)}
+    candidates = [url.rstrip(".,;:") for url in URL_PATTERN.findall(line) if url not in image_urls]
+    for url in candidates:
+        if DOC_KEYWORD.search(url):
+            return url
+    return candidates[0] if candidates else None
+
+
+def find_doc_link_in_lines(lines: Iterable[str]) -> Optional[str]:
+    for line in lines:
+        doc_link = find_doc_link_in_line(line)
+        if doc_link:
+            return doc_link
+    return None
+
+
+def find_doc_link(content: str) -> Optional[str]:
+    """
+    在README文本中查找第一个同时包含链接和文档关键词的行，返回其中的链接
+
+    :param content: README文本内容
+    :return: 文档链接，未找到时返回None
+    """
+    return find_doc_link_in_lines(content.splitlines())
+
+
+class DocLinkScanner:
+    """
+    按块接收 README 内容，逐行查找文档链接；累计读取超过 max_bytes 后丢弃其余内容，
+    因此超长的单行也不会缓存超过上限的字节
+    """
+
+    def __init__(self, max_bytes: int = README_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.read_bytes = 0
+        self.exhausted = False
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """
+        :param chunk: 新读取的内容
+        :return: 找到的文档链接，未找到时返回None，此时可根据 exhausted 判断是否应停止读取
+        """
+        chunk = chunk[:self.max_bytes - self.read_bytes]
+        self.read_bytes += len(chunk)
+        *lines, self._pending = (self._pending + chunk).split(b"\n")
+        doc_link = find_doc_link_in_lines(line.decode("utf-8", errors="replace") for line in lines)
+        if doc_link:
+            return doc_link
+        if self.read_bytes >= self.max_bytes:
+            self.exhausted = True
+            return self.finish()
+        return None
+
+    def finish(self) -> Optional[str]:
+        """
+        处理末尾没有换行符的最后一行
+        """
+        line, self._pending = self._pending, b""
+        return find_doc_link_in_line(line.decode("utf-8", errors="replace")) if line else None
+
+
+class DocLinkExtractor:
+    """
+    流式读取仓库 README 并提取文档链接，cache 为 None 时不缓存结果
+    """
+
+    def __init__(self, token: str, session: requests.Session = None, cache: Optional[KVCache] = None,
+                 max_bytes: int = README_MAX_BYTES):
+        self.token = token
+        self.session = session or requests.Session()
+        self.cache = cache
+        self.max_bytes = max_bytes
+
+    def extract(self, repo_name: str) -> Optional[str]:
+        """
+        :param repo_name: 仓库全名，如 "owner/name"
+        :return: 文档链接，未找到或仓库没有 README 时返回None
+        """
+        cached = self.cache.get(repo_name) if self.cache else None
+        headers = {"Accept": README_ACCEPT, **self._auth_headers()}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        with self.session.get(f"{GITHUB_API_URL}/repos/{repo_name}/readme", headers=headers, stream=True,
+                              timeout=GITHUB_REQUEST_TIMEOUT) as response:
+            if response.status_code == 304 and cached:
+                return cached["doc_link"]
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            scanner = DocLinkScanner(self.max_bytes)
+            doc_link = None
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                doc_link = scanner.feed(chunk)
+                if doc_link or scanner.exhausted:
+                    break
+            else:
+                doc_link = scanner.finish()
+            etag = response.headers.get("ETag")
+
+        if self.cache and etag:
+            self.cache.set(repo_name, {"etag": etag, "doc_link": doc_link})
+        return doc_link
+
+    def _auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"token {self.token}"} if self.token else {}
@@ -0,0 +1,226 @@
+"""
+GitHub GraphQL 批量查询引擎
+
+通过别名在一次GraphQL查询中同时获取多个仓库的元数据，替代逐个仓库调用REST API
+（get_repo、owner、get_readme、get_license、get_latest_release 共约8次往返），
+返回的字典结构与 fetch_repo_info 完全一致。
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from .doc_link import find_doc_link
+from .settings import GITHUB_GRAPHQL_URL, GITHUB_REQUEST_TIMEOUT, GRAPHQL_BATCH_SIZE, GRAPHQL_STATE_BATCH_SIZE
+
+NO_LICENSE = "未找到开源协议信息"
+
+# GraphQL 没有 REST /readme 那样的自动识别，只能按常见文件名逐个尝试
+README_EXPRESSIONS = ["HEAD:README.md", "HEAD:readme.md", "HEAD:Readme.md", "HEAD:README.rst", "HEAD:README"]
+
+REPO_FRAGMENT = """
+fragment RepoFields on Repository {
+  nameWithOwner
+  stargazerCount
+  forkCount
+  updatedAt
+  description
+  owner { login }
+  licenseInfo { name }
+  latestRelease { tagName }
+%s
+}
+""" % "\n".join(
+    f'  readme{i}: object(expression: "{expression}") {{ ... on Blob {{ text }} }}'
+    for i, expression in enumerate(README_EXPRESSIONS)
+)
+
+# 增量刷新使用的轻量查询，不含 README 等大字段，用于判断仓库是否有变化
+STATE_FRAGMENT = """
+fragment RepoFields on Repository {
+  nameWithOwner
+  pushedAt
+  updatedAt
+  stargazerCount
+  forkCount
+  description
+  licenseInfo { name }
+  latestRelease { tagName }
+}
+"""
+
+# 遇到这些状态码说明查询过大导致GitHub处理超时，拆分批次后重试
+SPLITTABLE_STATUS_CODES = {502, 503, 504}
+
+
+def build_batch_query(count: int, fragment: str = REPO_FRAGMENT) -> str:
+    """
+    构造包含 count 个仓库别名的GraphQL查询，仓库名通过变量传入以避免拼接注入
+
+    :param count: 本批次仓库数量
+    :param fragment: 定义 RepoFields 的查询片段
+    :return: GraphQL查询语句
+    """
+    variables = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(count))
+    repos = "\n".join(f"  repo{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepoFields }}" for i in range(count))
+    return f"query({variables}) {{\n{repos}\n}}\n{fragment}"
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """
+    将GraphQL返回的ISO 8601时间字符串转换为datetime，与PyGithub返回的类型保持一致
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def to_repo_info(node: Dict) -> Dict:
+    """
+    将GraphQL仓库节点转换为 fetch_repo_info 的返回结构
+    """
+    readme_text = None
+    for i in range(len(README_EXPRESSIONS)):
+        blob = node.get(f"readme{i}")
+        if blob and blob.get("text"):
+            readme_text = blob["text"]
+            break
+    return {
+        "name": node["nameWithOwner"],
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"],
+        "last_updated": parse_datetime(node.get("updatedAt")),
+        "owner": (node.get("owner") or {}).get("login"),
+        "doc_link": find_doc_link(readme_text) if readme_text else None,
+        "license": (node.get("licenseInfo") or {}).get("name") or NO_LICENSE,
+        "description": node.get("description"),
+        "latest_release": (node.get("latestRelease") or {}).get("tagName"),
+        "error": None
+    }
+
+
+def fetch_repos_graphql(repo_names: List[str], token: str, error_handler: Callable[[str, str], Dict],
+                        batch_size: int = GRAPHQL_BATCH_SIZE, session: requests.Session = None) -> List[Dict]:
+    """
+    批量获取仓库信息，结果顺序与 repo_names 一致
+
+    :param repo_names: 仓库全名列表，如 ["owner/name"]
+    :param token: GitHub Token，GraphQL API 必须鉴权
+    :param error_handler: 出错时生成占位结果的函数，签名同 handle_repo_error(repo_name, error_message)
+    :param batch_size: 每次查询的仓库数量
+    :param session: 可选的 requests.Session，用于复用连接
+    :return: 仓库信息列表
+    """
+    return _fetch_all(repo_names, token, REPO_FRAGMENT, to_repo_info, error_handler, batch_size, session)
+
+
+def to_repo_state(node: Dict) -> Dict:
+    """
+    将轻量查询的仓库节点转换为状态字典
+    """
+    return {
+        "name": node["nameWithOwner"],
+        "pushed_at": node.get("pushedAt"),
+        "updated_at": node.get("updatedAt"),
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"],
+        "description": node.get("description"),
+        "license": (node.get("licenseInfo") or {}).get("name") or NO_LICENSE,
+        "latest_release": (node.get("latestRelease") or {}).get("tagName"),
+    }
+
+
+def fetch_repo_states(repo_names: List[str], token: str, batch_size: int = GRAPHQL_STATE_BATCH_SIZE,
+                      session: requests.Session = None) -> List[Optional[Dict]]:
+    """
+    批量获取仓库的 pushed_at、updated_at、star 数等轻量状态，结果顺序与 repo_names 一致
+
+    :param repo_names: 仓库全名列表
+    :param token: GitHub Token
+    :param batch_size: 每次查询的仓库数量，轻量查询可以比完整查询大
+    :param session: 可选的 requests.Session
+    :return: 状态字典列表，获取失败的仓库为 None
+    """
+    def on_error(repo_name, error_message):
+        print(f"获取 {repo_name} 的状态时出错: {error_message}")
+        return None
+
+    return _fetch_all(repo_names, token, STATE_FRAGMENT, to_repo_state, on_error, batch_size, session)
+
+
+def _fetch_all(repo_names: List[str], token: str, fragment: str, convert: Callable[[Dict], Dict],
+               error_handler: Callable[[str, str], Optional[Dict]], batch_size: int,
+               session: Optional[requests.Session]) -> List[Optional[Dict]]:
+    http = session or requests.Session()
+    results = []
+    for start in range(0, len(repo_names), batch_size):
+        results.extend(_fetch_batch(repo_names[start:start + batch_size], token, fragment, convert, error_handler, http))
+    return results
+
+
+def _fetch_batch(repo_names: List[str], token: str, fragment: str, convert: Callable[[Dict], Dict],
+                 error_handler: Callable[[str, str], Optional[Dict]], http: requests.Session) -> List[Optional[Dict]]:
+    results: List[Optional[Dict]] = [None] * len(repo_names)
+    variables = {}
+    query_indexes = []
+    for i, repo_name in enumerate(repo_names):
+        owner, _, name = (repo_name or "").partition("/")
+        if not owner or not name:
+            results[i] = error_handler(repo_name, f"仓库名称格式错误: {repo_name}")
+            continue
+        variables[f"owner{len(query_indexes)}"] = owner
+        variables[f"name{len(query_indexes)}"] = name
+        query_indexes.append(i)
+
+    if not query_indexes:
+        return results
+
+    try:
+        response = http.post(
+            GITHUB_GRAPHQL_URL,
+            json={"query": build_batch_query(len(query_indexes), fragment), "variables": variables},
+            headers={"Authorization": f"bearer {token}"},
+            timeout=GITHUB_REQUEST_TIMEOUT
+        )
+        if response.status_code in SPLITTABLE_STATUS_CODES and len(query_indexes) > 1:
+            raise requests.exceptions.Timeout(f"GraphQL 查询超时 ({response.status_code})")
+        response.raise_for_status()
+        payload = response.json()
+    except requests.exceptions.Timeout:
+        if len(query_indexes) == 1:
+            i = query_indexes[0]
+            results[i] = error_handler(repo_names[i], "GraphQL 查询超时")
+            return results
+        # 批次过大时GitHub会在10秒处理上限内超时，对半拆分后重试
+        half = len(query_indexes) // 2
+        for part in (query_indexes[:half], query_indexes[half:]):
+            part_results = _fetch_batch([repo_names[i] for i in part], token, fragment, convert, error_handler, http)
+            for i, repo_info in zip(part, part_results):
+                results[i] = repo_info
+        return results
+    except Exception as e:
+        for i in query_indexes:
+            results[i] = error_handler(repo_names[i], f"GraphQL 查询失败: {e}")
+        return results
+
+    data = payload.get("data") or {}
+    errors = {}
+    for error in payload.get("errors") or []:
+        path = error.get("path") or []
+        message = error.get("message", "未知错误")
+        if error.get("type") == "NOT_FOUND":
+            message = f"404 {message}"
+        if path:
+            errors[path[0]] = message
+        else:
+            # 没有 path 的错误作用于整个查询，例如鉴权失败或查询超出复杂度限制
+            errors[None] = message
+
+    for alias_index, i in enumerate(query_indexes):
+        alias = f"repo{alias_index}"
+        node = data.get(alias)
+        if node:
+            results[i] = convert(node)
+        else:
+            results[i] = error_handler(repo_names[i], errors.get(alias) or errors.get(None) or "GraphQL 未返回仓库数据")
+    return results
@@ -0,0 +1,214 @@
+"""
+持久化的 HTTP 条件请求缓存
+
+以 SQLite 保存 GET 响应的 ETag / Last-Modified 和响应体，后续请求自动携带
+If-None-Match / If-Modified-Since，GitHub 返回 304 时直接用本地内容回放。
+304 响应不计入 GitHub API 的速率限制。缓存同时挂载到 PyGithub 客户端和
+搜索使用的 requests.Session 上，超过容量上限时按最近最少访问淘汰。
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# 这些头描述的是传输过程，缓存保存的是解码后的响应体，回放时不能沿用
+TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def cache_key(request: requests.PreparedRequest) -> str:
+    """
+    计算请求的缓存键。GitHub 响应按 Accept 和 Authorization 区分内容，
+    因此两者都参与计算，Token 只以摘要形式出现。同时兼容 requests 和 httpx 的请求对象
+    """
+    authorization = request.headers.get("Authorization", "")
+    parts = [
+        request.method,
+        str(request.url),
+        request.headers.get("Accept", ""),
+        hashlib.sha256(authorization.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """
+    基于 SQLite 的响应存储，可在多线程间共享
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT, status INTEGER, "
+            "headers TEXT, body BLOB, size INTEGER, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, status, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        etag, last_modified, status, headers, body = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+        }
+
+    def set(self, key: str, url: str, response):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in TRANSPORT_HEADERS}
+        body = response.content
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 response.status_code, json.dumps(headers), body, len(body), time.time())
+            )
+            self.stores += 1
+            self._evict()
+            self._conn.commit()
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def _evict(self):
+        """
+        总大小超过上限时，从最久未访问的记录开始删除，直到降到上限的90%，避免每次写入都触发淘汰
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        expired = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= target:
+                break
+            expired.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", expired)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    为 GET 请求附加条件请求头，并把 304 响应替换为缓存中的完整响应
+    """
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        # 流式读取的响应体不会一次性落到内存，不适合缓存
+        if request.method != "GET" or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        key = cache_key(request)
+        entry = self.cache.get(key)
+        if entry:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry:
+            # 先读取空响应体，让连接回到连接池
+            response.content
+            headers = CaseInsensitiveDict(entry["headers"])
+            # 304 携带最新的速率限制等头信息，覆盖缓存中的旧值
+            headers.update(response.headers)
+            response.status_code = entry["status"]
+            response.reason = "OK"
+            response.headers = headers
+            response.encoding = get_encoding_from_headers(headers)
+            response._content = entry["body"]
+            response.from_cache = True
+            self.cache.record_hit()
+        elif response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            self.cache.set(key, request.url, response)
+        return response
+
+    def close(self):
+        # PyGithub 每次请求都会新建并关闭 Session，这里保留连接池供后续请求复用，
+        # 需要真正释放连接时调用 shutdown
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+def install_pygithub_adapter(github, adapter: Optional[HTTPAdapter] = None, response_hooks: Sequence[Callable] = ()):
+    """
+    让指定 PyGithub 客户端之后创建的连接都使用 adapter 和 response 钩子，不影响其他客户端
+
+    PyGithub 只提供全局的 Requester.injectConnectionClasses，没有按客户端传入 Session 或连接类的参数，
+    这里改为替换该客户端 Requester 在创建时选定的连接类（私有属性），每个客户端各自统计、各自使用缓存。
+    已在 requirements.txt 固定的 PyGithub 2.6.1 和 2.10.0 上验证，其他版本缺少该属性时直接报错
+
+    :param github: PyGithub 客户端，需在发出第一个请求前调用
+    :param adapter: 要挂载到 PyGithub 内部 Session 上的 adapter，None 表示保留 PyGithub 自带的 adapter
+    :param response_hooks: 要挂到 PyGithub 内部 Session 上的 requests response 钩子
+    """
+    from github import Requester as requester_module
+
+    response_hooks = list(response_hooks)
+
+    def configure(connection, prefix: str):
+        if adapter is not None:
+            # 保留 PyGithub 自带的重试策略
+            adapter.max_retries = connection.adapter.max_retries
+            connection.session.mount(prefix, adapter)
+        connection.session.hooks["response"].extend(response_hooks)
+
+    class HTTPSConnection(requester_module.HTTPSRequestsConnectionClass):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            configure(self, "https://")
+
+    class HTTPConnection(requester_module.HTTPRequestsConnectionClass):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            configure(self, "http://")
+
+    requester = github.requester
+    # Requester 按 base_url 的协议在构造时选定连接类，保存在私有属性中
+    if not hasattr(requester, "_Requester__connectionClass"):
+        from importlib.metadata import version
+        raise RuntimeError(f"PyGithub {version('PyGithub')} 的 Requester 不再有 __connectionClass 属性，"
+                           f"无法为客户端挂载 HTTP 缓存和指标钩子，请安装 requirements.txt 中固定的 PyGithub 版本")
+    connection_class = HTTPSConnection if requester.base_url.startswith("https") else HTTPConnection
+    requester._Requester__connectionClass = connection_class
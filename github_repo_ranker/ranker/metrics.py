@@ -0,0 +1,244 @@
+"""
+调研过程的分阶段指标
+
+按阶段（fetch_repo_info、extract_doc_link、translate_to_chinese、save_report 等）统计耗时、调用次数、错误和重试，
+按接口统计请求次数、传输字节数、状态码和缓存命中，并根据 X-RateLimit-* 响应头计算各资源实际消耗的 API 配额。
+当前阶段保存在 ContextVar 中，线程池任务和 asyncio 任务各自进入阶段后，其中发出的请求会自动归到该阶段。
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+# 不在任何阶段内发出的请求归到此阶段
+DEFAULT_STAGE = "other"
+REPO_PATH = re.compile(r"^/repos/[^/]+/[^/]+")
+RAW_HOST = "raw.githubusercontent.com"
+
+_current_stage = contextvars.ContextVar("ranker_stage", default=DEFAULT_STAGE)
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """
+    把请求归类为接口模板，如 "GET api.github.com/repos/{owner}/{repo}/license"
+    """
+    parts = urlsplit(url)
+    if parts.netloc == RAW_HOST:
+        path = "/{owner}/{repo}/{ref}/{path}"
+    else:
+        path = REPO_PATH.sub("/repos/{owner}/{repo}", parts.path)
+    return f"{method} {parts.netloc}{path}"
+
+
+def _new_request_stats() -> Dict:
+    return {"requests": 0, "bytes": 0, "seconds": 0.0, "cache_hits": 0, "quota_calls": 0, "retries": 0, "statuses": {}}
+
+
+class Metrics:
+    """
+    线程安全的指标收集器
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict] = {}
+        self.endpoints: Dict[str, Dict] = {}
+        self.rate_limits: Dict[str, Dict] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        进入阶段，期间发出的请求计入该阶段；阶段可以嵌套，请求只计入最内层阶段
+        """
+        token = _current_stage.set(name)
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            _current_stage.reset(token)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stage(name)
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+                stats["errors"] += failed
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """
+        返回在阶段 name 中执行 func 的包装函数
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def record_retry(self, count: int = 1, stage: Optional[str] = None):
+        if count:
+            with self._lock:
+                self._stage(stage or _current_stage.get())["retries"] += count
+
+    def record_response(self, method: str, url: str, status: int, headers, received_bytes: int, seconds: float,
+                        from_cache: bool = False, retries: int = 0):
+        """
+        记录一次请求
+
+        :param headers: 响应头，用于读取速率限制
+        :param received_bytes: 实际传输的响应体字节数，命中缓存时为 0
+        :param from_cache: 是否由本地缓存提供（服务端返回 304）
+        :param retries: 传输层（urllib3）在得到这次响应之前自动重试的次数
+        """
+        # 带有速率限制头且不是 304 的响应才消耗配额，翻译接口等第三方请求不计入
+        consumes_quota = headers.get("X-RateLimit-Remaining") is not None and not from_cache and status != 304
+        stage = _current_stage.get()
+        with self._lock:
+            for stats in (self._stage(stage), self.endpoints.setdefault(endpoint_name(method, url), _new_request_stats())):
+                stats["requests"] += 1
+                stats["bytes"] += received_bytes
+                stats["seconds"] += seconds
+                stats["cache_hits"] += from_cache
+                stats["quota_calls"] += consumes_quota
+                stats["retries"] += retries
+                stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+            self._update_rate_limit(headers, consumes_quota)
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        requests 的 response 钩子，挂到 Session.hooks["response"] 上
+        """
+        from_cache = getattr(response, "from_cache", False)
+        if from_cache:
+            received_bytes = 0
+        elif kwargs.get("stream"):
+            # 流式响应的内容由调用方按需读取，只能以 Content-Length 估计
+            received_bytes = int(response.headers.get("Content-Length") or 0)
+        else:
+            received_bytes = len(response.content)
+        # PyGithub 的 GithubRetry 在 urllib3 层重试二级限流和 5xx，钩子只能看到最终响应，重试记录在 raw.retries 中
+        retry_state = getattr(response.raw, "retries", None)
+        retries = len(getattr(retry_state, "history", None) or ())
+        self.record_response(response.request.method, response.url, response.status_code, response.headers,
+                             received_bytes, response.elapsed.total_seconds(), from_cache, retries)
+
+    def _stage(self, name: str) -> Dict:
+        if name not in self.stages:
+            self.stages[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "errors": 0, **_new_request_stats()}
+        return self.stages[name]
+
+    def _update_rate_limit(self, headers, consumes_quota: bool):
+        """
+        按 X-RateLimit-Used 计算各资源的配额消耗，并发响应可能乱序到达，取最大值；配额重置后累计上一窗口的消耗
+        """
+        used = headers.get("X-RateLimit-Used")
+        remaining = headers.get("X-RateLimit-Remaining")
+        if used is None or remaining is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        used, reset_at = int(used), int(headers.get("X-RateLimit-Reset") or 0)
+        state = self.rate_limits.get(resource)
+        if state is None or reset_at > state["reset_at"]:
+            previous = state["consumed"] if state else 0
+            # 第一次看到的 used 已经包含了本次请求（如果它消耗了配额）
+            state = {"limit": None, "reset_at": reset_at, "used_before": max(0, used - consumes_quota), "used": used,
+                     "previous_windows": previous, "remaining": int(remaining)}
+            self.rate_limits[resource] = state
+        elif reset_at < state["reset_at"]:
+            return
+        state["limit"] = int(headers.get("X-RateLimit-Limit") or 0) or None
+        if used >= state["used"]:
+            state["used"] = used
+            state["remaining"] = int(remaining)
+        state["consumed"] = state["previous_windows"] + state["used"] - state["used_before"]
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_seconds": round(time.time() - self.started_at, 3),
+                "stages": json.loads(json.dumps(self.stages)),
+                "endpoints": json.loads(json.dumps(self.endpoints)),
+                "rate_limit": {
+                    resource: {"limit": state["limit"], "remaining": state["remaining"], "reset_at": state["reset_at"],
+                               "consumed": state["consumed"]}
+                    for resource, state in self.rate_limits.items()
+                },
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"各阶段耗时（共 {summary['wall_seconds']:.1f} 秒，并发阶段为累计耗时）：")
+        for name, stats in sorted(summary["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"  {name}: {stats['calls']} 次 {stats['seconds']:.1f} 秒，请求 {stats['requests']} 次"
+                  f"（缓存命中 {stats['cache_hits']}，消耗配额 {stats['quota_calls']}），"
+                  f"{stats['bytes'] / 1024:.0f} KB，错误 {stats['errors']}，重试 {stats['retries']}")
+        for resource, state in summary["rate_limit"].items():
+            print(f"  API 配额 {resource}: 本次消耗 {state['consumed']}，剩余 {state['remaining']}/{state['limit']}")
+
+    def write_json(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.summary(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def write_prometheus(self, path: str):
+        """
+        写出 node_exporter textfile collector 格式的指标，先写临时文件再替换，避免被读到一半
+        """
+        summary = self.summary()
+        lines = []
+
+        def gauge(name: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(value_)}"' for key, value_ in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        stages = summary["stages"].items()
+        endpoints = summary["endpoints"].items()
+        gauge("github_ranker_last_run_timestamp_seconds", "Unix time the last run finished.", [({}, int(time.time()))])
+        gauge("github_ranker_run_duration_seconds", "Wall time of the last run.", [({}, summary["wall_seconds"])])
+        gauge("github_ranker_stage_seconds", "Cumulative time spent in each stage.",
+              [({"stage": name}, round(stats["seconds"], 3)) for name, stats in stages])
+        gauge("github_ranker_stage_calls", "Number of times each stage ran.",
+              [({"stage": name}, stats["calls"]) for name, stats in stages])
+        gauge("github_ranker_stage_errors", "Stage runs that raised an error.",
+              [({"stage": name}, stats["errors"]) for name, stats in stages])
+        gauge("github_ranker_stage_retries", "Requests retried after throttling, by stage.",
+              [({"stage": name}, stats["retries"]) for name, stats in stages])
+        gauge("github_ranker_stage_quota_calls", "Requests that consumed API quota, by stage.",
+              [({"stage": name}, stats["quota_calls"]) for name, stats in stages])
+        gauge("github_ranker_http_requests", "HTTP requests by endpoint and status.",
+              [({"endpoint": name, "status": status}, count)
+               for name, stats in endpoints for status, count in stats["statuses"].items()])
+        gauge("github_ranker_http_response_bytes", "Response bytes transferred by endpoint.",
+              [({"endpoint": name}, stats["bytes"]) for name, stats in endpoints])
+        gauge("github_ranker_http_request_seconds", "Cumulative request time by endpoint.",
+              [({"endpoint": name}, round(stats["seconds"], 3)) for name, stats in endpoints])
+        gauge("github_ranker_http_cache_hits", "Requests answered by the local cache (304).",
+              [({"endpoint": name}, stats["cache_hits"]) for name, stats in endpoints])
+        gauge("github_ranker_rate_limit_consumed", "API quota consumed during the last run.",
+              [({"resource": resource}, state["consumed"]) for resource, state in summary["rate_limit"].items()])
+        gauge("github_ranker_rate_limit_remaining", "API quota remaining at the end of the last run.",
+              [({"resource": resource}, state["remaining"]) for resource, state in summary["rate_limit"].items()])
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temp_path, path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
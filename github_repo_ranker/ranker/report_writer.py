@@ -0,0 +1,178 @@
+"""
+流式报告输出
+
+逐条消费仓库信息并立即写出，写出阶段不再在内存中构建整张表：
+Excel 使用 xlsxwriter 的 constant_memory 模式逐行落盘，描述译文需在写入前预取（见 Translator.prefetch），
+写入过程只读取内存中的译文，不发起网络请求；CSV、JSONL、Parquet 输出原始字段，供程序处理，不做翻译。
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .settings import REPORT_FORMATS
+from .translation import TRANSLATION_UNAVAILABLE
+
+REPORT_FIELDS = ["name", "stars", "forks", "last_updated", "owner", "doc_link", "license", "description",
+                 "latest_release", "error", "growth_7d", "growth_30d", "growth_90d"]
+
+
+def to_plain_record(repo_info: Dict) -> Dict:
+    record = {field: repo_info.get(field) for field in REPORT_FIELDS}
+    if record["last_updated"] is not None:
+        record["last_updated"] = record["last_updated"].isoformat()
+    return record
+
+
+class ExcelSink:
+    needs_translation = True
+
+    def __init__(self, output_file: str):
+        import xlsxwriter
+
+        self.workbook = xlsxwriter.Workbook(output_file, {"constant_memory": True})
+        self.worksheet = self.workbook.add_worksheet("Repo Info")
+        headers = ["排名", "仓库名称", "Star 数 (k)", "Fork 数", "最后更新时间", "作者/公司", "官方文档链接", "开源协议", "仓库描述", "最近发布版本", "错误信息",
+                   "7天新增 Star", "30天新增 Star", "90天新增 Star"]
+        header_format = self.workbook.add_format({
+            'bold': True, 'font_color': 'white', 'bg_color': '#FF6F61', 'border': 1,
+            'align': 'center', 'valign': 'vcenter', 'font_size': 14, 'font_name': '微软雅黑'
+        })
+        self.cell_format = self.workbook.add_format({
+            'text_wrap': True, 'border': 1, 'align': 'left', 'valign': 'top',
+            'font_size': 12, 'font_name': '微软雅黑', 'bg_color': '#FFF4E6', 'bold': True
+        })
+        self.worksheet.set_column(0, len(headers) - 1, 20)
+        # constant_memory 模式下只能按行顺序写入，表头必须最先写
+        for col_idx, header in enumerate(headers):
+            self.worksheet.write(0, col_idx, header, header_format)
+
+    def write(self, rank: int, repo_info: Dict, translations: Dict[str, str]):
+        description = repo_info['description']
+        translated_description = translations.get(description, TRANSLATION_UNAVAILABLE) if description else "N/A"
+        row = [
+            rank,
+            repo_info['name'],
+            f"{repo_info['stars'] / 1000:.1f}k",
+            repo_info['forks'],
+            str(repo_info['last_updated']),
+            repo_info['owner'],
+            repo_info['doc_link'] or "N/A",
+            repo_info['license'],
+            f"{description}\n(翻译: {translated_description})" if description else "N/A",
+            repo_info['latest_release'] or "N/A",
+            repo_info.get('error', "无"),
+            # 未采样 star 历史时增长数为空
+            *("N/A" if repo_info.get(key) is None else repo_info[key] for key in ("growth_7d", "growth_30d", "growth_90d"))
+        ]
+        for col_idx, cell_value in enumerate(row):
+            self.worksheet.write(rank, col_idx, cell_value, self.cell_format)
+
+    def close(self):
+        self.workbook.close()
+
+
+class CsvSink:
+    needs_translation = False
+
+    def __init__(self, output_file: str):
+        # utf-8-sig 让 Excel 直接打开时中文不乱码
+        self.file = open(output_file, "w", encoding="utf-8-sig", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=["rank"] + REPORT_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, rank: int, repo_info: Dict, translations: Dict[str, str]):
+        self.writer.writerow({"rank": rank, **to_plain_record(repo_info)})
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlSink:
+    needs_translation = False
+
+    def __init__(self, output_file: str):
+        self.file = open(output_file, "w", encoding="utf-8")
+
+    def write(self, rank: int, repo_info: Dict, translations: Dict[str, str]):
+        self.file.write(json.dumps({"rank": rank, **to_plain_record(repo_info)}, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    needs_translation = False
+    # 每积累多少行写出一个 row group
+    batch_size = 10000
+
+    def __init__(self, output_file: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("导出 Parquet 需要安装 pyarrow：pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("rank", pa.int64()), ("name", pa.string()), ("stars", pa.int64()), ("forks", pa.int64()),
+            ("last_updated", pa.timestamp("us", tz="UTC")), ("owner", pa.string()), ("doc_link", pa.string()),
+            ("license", pa.string()), ("description", pa.string()), ("latest_release", pa.string()),
+            ("error", pa.string()), ("growth_7d", pa.int64()), ("growth_30d", pa.int64()), ("growth_90d", pa.int64()),
+        ])
+        self.writer = pq.ParquetWriter(output_file, self.schema)
+        self.rows = []
+
+    def write(self, rank: int, repo_info: Dict, translations: Dict[str, str]):
+        self.rows.append({"rank": rank, **{field: repo_info.get(field) for field in REPORT_FIELDS}})
+        if len(self.rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+SINKS = {"xlsx": ExcelSink, "csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+def resolve_format(output_file: str, fmt: Optional[str] = None) -> str:
+    """
+    确定输出格式，默认由文件扩展名决定
+
+    :return: xlsx/csv/jsonl/parquet 之一
+    """
+    fmt = (fmt or Path(output_file).suffix.lstrip(".")).lower()
+    if fmt not in SINKS:
+        raise ValueError(f"不支持的输出格式: {fmt}，可选值: {', '.join(REPORT_FORMATS)}")
+    return fmt
+
+
+def needs_translation(fmt: str) -> bool:
+    return SINKS[fmt].needs_translation
+
+
+def write_report(records: Iterable[Dict], output_file: str, fmt: Optional[str] = None,
+                 translations: Optional[Dict[str, str]] = None) -> int:
+    """
+    将仓库信息流式写入报告文件
+
+    :param records: 仓库信息，可以是生成器，按排名顺序给出
+    :param output_file: 输出文件路径
+    :param fmt: 输出格式，可选 xlsx/csv/jsonl/parquet，默认由文件扩展名决定
+    :param translations: 预先获取的 描述 -> 译文 映射，Excel 中缺少译文的描述显示为"翻译不可用"
+    :return: 写入的仓库数量
+    """
+    sink = SINKS[resolve_format(output_file, fmt)](output_file)
+    translations = translations or {}
+    rank = 0
+    try:
+        for rank, repo_info in enumerate(records, start=1):
+            sink.write(rank, repo_info, translations)
+    finally:
+        sink.close()
+    return rank
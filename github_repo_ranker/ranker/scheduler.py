@@ -0,0 +1,223 @@
+"""
+感知 GitHub 速率限制的自适应并发调度器
+
+根据 X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After 动态调整同时在途的请求数：
+连续成功时逐步增加并发，遇到限流时并发减半并暂停到建议的时间点，被限流的任务重新排队，
+而不是被记录为错误结果。
+"""
+import concurrent.futures
+import contextvars
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .settings import (RATE_LIMIT_RESERVE, SCHEDULER_INITIAL_CONCURRENCY, SCHEDULER_MAX_CONCURRENCY,
+                       SCHEDULER_MAX_RETRIES, SCHEDULER_MIN_CONCURRENCY)
+
+# 限流响应没有给出等待时间时的默认退避秒数
+DEFAULT_BACKOFF = 60
+
+
+class ThrottledError(Exception):
+    """
+    任务主动声明被限流时抛出，retry_after 为建议等待的秒数
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def throttle_delay(exc: Exception) -> Optional[float]:
+    """
+    判断异常是否由限流导致，是则返回建议等待的秒数，否则返回None
+
+    同时兼容 PyGithub 的 GithubException（status/headers 属性）和 requests 的 HTTPError（response 属性）
+    """
+    if isinstance(exc, ThrottledError):
+        return exc.retry_after if exc.retry_after is not None else DEFAULT_BACKOFF
+
+    status = getattr(exc, "status", None)
+    headers = getattr(exc, "headers", None)
+    response = getattr(exc, "response", None)
+    if response is not None:
+        status = status or response.status_code
+        headers = headers or response.headers
+    if status not in (403, 429):
+        return None
+
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    if headers.get("retry-after"):
+        return float(headers["retry-after"])
+    if headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+        return max(0.0, int(headers["x-ratelimit-reset"]) - time.time()) + 1
+    if status == 429 or "rate limit" in str(exc).lower():
+        return DEFAULT_BACKOFF
+    # 其余 403 属于权限问题，不重试
+    return None
+
+
+class RateLimitState:
+    """
+    记录最近一次响应头中的速率限制信息（X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After），
+    实例可直接作为调度器的 rate_limit_probe 使用，response_hook 可挂到 requests Session 上
+    """
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.retry_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_at = headers.get("X-RateLimit-Reset")
+        retry_after = headers.get("Retry-After")
+        with self._lock:
+            if retry_after:
+                self.retry_at = time.time() + float(retry_after)
+            if remaining is not None:
+                self.remaining = int(remaining)
+                self.reset_at = float(reset_at) if reset_at else None
+
+    def response_hook(self, response, *args, **kwargs):
+        self.update(response.headers)
+
+    def __call__(self) -> Optional[Tuple[int, float]]:
+        with self._lock:
+            # Retry-After 期间按配额耗尽处理，调度器暂停到建议的时间点
+            if self.retry_at is not None and self.retry_at > time.time():
+                return 0, self.retry_at
+            if self.remaining is None:
+                return None
+            return self.remaining, self.reset_at
+
+
+@dataclass
+class SchedulerStats:
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    throttled: int = 0
+    retries: int = 0
+    peak_concurrency: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"共 {self.total} 个任务，成功 {self.completed}，失败 {self.failed}，"
+                f"限流 {self.throttled} 次，重试 {self.retries} 次，最高并发 {self.peak_concurrency}，"
+                f"耗时 {self.elapsed:.1f} 秒，吞吐 {self.throughput:.2f} 个/秒")
+
+
+class AdaptiveScheduler:
+    """
+    自适应并发调度器，并发数按"加法增加、乘法减少"调整
+    """
+
+    def __init__(self, min_concurrency: int = SCHEDULER_MIN_CONCURRENCY,
+                 max_concurrency: int = SCHEDULER_MAX_CONCURRENCY,
+                 initial_concurrency: int = SCHEDULER_INITIAL_CONCURRENCY,
+                 max_retries: int = SCHEDULER_MAX_RETRIES,
+                 rate_limit_probe: Optional[Callable[[], Optional[Tuple[int, float]]]] = None,
+                 reserve: int = RATE_LIMIT_RESERVE):
+        """
+        :param min_concurrency: 最小并发数
+        :param max_concurrency: 最大并发数，也是线程池大小
+        :param initial_concurrency: 初始并发数
+        :param max_retries: 单个任务因限流最多重试的次数
+        :param rate_limit_probe: 返回 (剩余配额, 配额重置的时间戳) 的函数，来自最近一次响应的速率限制头
+        :param reserve: 剩余配额低于此值时暂停派发，等待配额重置
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = max(min_concurrency, min(initial_concurrency, max_concurrency))
+        self.max_retries = max_retries
+        self.rate_limit_probe = rate_limit_probe
+        self.reserve = reserve
+        self.stats = SchedulerStats()
+
+    def run(self, func: Callable[[Any], Any], items: Iterable[Any],
+            on_error: Callable[[Any, Exception], Any]) -> List[Any]:
+        """
+        并发执行 func(item)，返回结果顺序与 items 一致
+
+        :param func: 任务函数，出错时抛出异常
+        :param items: 任务参数列表
+        :param on_error: 非限流错误或重试耗尽时生成结果的函数，签名为 on_error(item, exception)
+        :return: 结果列表
+        """
+        items = list(items)
+        self.stats = SchedulerStats(total=len(items))
+        results: List[Any] = [None] * len(items)
+        pending = deque((index, 0) for index in range(len(items)))
+        inflight = {}
+        limit = self.initial_concurrency
+        paused_until = 0.0
+        successes = 0
+        start = time.monotonic()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while pending or inflight:
+                while pending and len(inflight) < limit and time.time() >= paused_until:
+                    index, attempt = pending.popleft()
+                    # 任务在调用方的上下文副本中执行，继承当前的指标阶段等 ContextVar
+                    inflight[executor.submit(contextvars.copy_context().run, func, items[index])] = (index, attempt)
+                self.stats.peak_concurrency = max(self.stats.peak_concurrency, len(inflight))
+
+                if not inflight:
+                    time.sleep(max(0.0, paused_until - time.time()))
+                    continue
+
+                done, _ = concurrent.futures.wait(inflight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    index, attempt = inflight.pop(future)
+                    try:
+                        results[index] = future.result()
+                        self.stats.completed += 1
+                        successes += 1
+                        if successes >= limit and limit < self.max_concurrency:
+                            limit += 1
+                            successes = 0
+                    except Exception as e:
+                        delay = throttle_delay(e)
+                        if delay is not None and attempt < self.max_retries:
+                            self.stats.throttled += 1
+                            self.stats.retries += 1
+                            pending.appendleft((index, attempt + 1))
+                            limit = max(self.min_concurrency, limit // 2)
+                            successes = 0
+                            if time.time() + delay > paused_until:
+                                paused_until = time.time() + delay
+                                print(f"触发 GitHub 限流，并发降至 {limit}，暂停 {delay:.0f} 秒后重试")
+                        else:
+                            results[index] = on_error(items[index], e)
+                            self.stats.failed += 1
+
+                paused_until, limit = self._check_budget(paused_until, limit)
+
+        self.stats.elapsed = time.monotonic() - start
+        return results
+
+    def _check_budget(self, paused_until: float, limit: int) -> Tuple[float, int]:
+        """
+        剩余配额不足时降到最小并发，并暂停到配额重置
+        """
+        if not self.rate_limit_probe:
+            return paused_until, limit
+        rate_limit = self.rate_limit_probe()
+        if not rate_limit:
+            return paused_until, limit
+        remaining, reset_at = rate_limit
+        if remaining is None or remaining < 0 or remaining > self.reserve:
+            return paused_until, limit
+        resume_at = (reset_at or time.time() + DEFAULT_BACKOFF) + 1
+        if resume_at > paused_until:
+            print(f"GitHub API 剩余配额 {remaining}，暂停至 {time.strftime('%H:%M:%S', time.localtime(resume_at))} 配额重置后继续")
+            paused_until = resume_at
+        return paused_until, self.min_concurrency
@@ -0,0 +1,173 @@
+"""
+突破1000条结果上限的分片搜索
+
+GitHub 搜索 API 对单个查询最多返回1000条结果。这里先按 stars: 区间、再按 created: 时间区间
+把查询不断二分，直到每个分片的结果数都不超过1000条，然后并发获取所有分片的全部分页。
+仓库信息直接取自搜索结果，不再为每个仓库额外调用 API。
+"""
+import math
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .graphql_engine import NO_LICENSE, parse_datetime
+from .scheduler import AdaptiveScheduler, RateLimitState
+from .settings import (GITHUB_API_URL, GITHUB_REQUEST_TIMEOUT, SEARCH_MAX_CONCURRENCY, SEARCH_PAGE_SIZE,
+                       SEARCH_RESULT_CAP)
+
+# GitHub 上线时间，作为 created: 区间的起点
+GITHUB_EPOCH = datetime(2008, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    搜索分片，为 None 的维度不附加对应的限定词
+    """
+    stars_min: Optional[int] = None
+    stars_max: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def query(self, base_query: str) -> str:
+        qualifiers = [base_query]
+        if self.stars_min is not None:
+            if self.stars_max is None:
+                qualifiers.append(f"stars:>={self.stars_min}")
+            else:
+                qualifiers.append(f"stars:{self.stars_min}..{self.stars_max}")
+        if self.created_from is not None:
+            qualifiers.append(f"created:{format_datetime(self.created_from)}..{format_datetime(self.created_to)}")
+        return " ".join(qualifiers)
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def search_item_to_repo_info(item: Dict) -> Dict:
+    """
+    将搜索结果条目转换为 fetch_repo_info 的返回结构，搜索结果不包含文档链接和发布版本
+    """
+    return {
+        "name": item["full_name"],
+        "stars": item.get("stargazers_count", 0),
+        "forks": item.get("forks_count", 0),
+        "last_updated": parse_datetime(item.get("updated_at")),
+        "owner": (item.get("owner") or {}).get("login"),
+        "doc_link": None,
+        "license": (item.get("license") or {}).get("name") or NO_LICENSE,
+        "description": item.get("description"),
+        "latest_release": None,
+        "error": None
+    }
+
+
+def split_shard(shard: Shard, top_stars: Optional[int]) -> List[Shard]:
+    """
+    将结果过多的分片一分为二，优先拆分 stars 区间，单个 star 数仍然过多时再拆分创建时间
+
+    :param shard: 待拆分的分片
+    :param top_stars: 该分片按 star 降序的第一条结果的 star 数，用于确定 stars 区间上限
+    :return: 拆分后的分片，无法继续拆分时返回空列表
+    """
+    if shard.stars_min is not None:
+        stars_max = shard.stars_max if shard.stars_max is not None else max(top_stars or 0, shard.stars_min)
+        if stars_max > shard.stars_min:
+            middle = (shard.stars_min + stars_max) // 2
+            return [replace(shard, stars_max=middle), replace(shard, stars_min=middle + 1, stars_max=stars_max)]
+        shard = replace(shard, stars_max=stars_max)
+
+    if shard.created_from is not None:
+        span = shard.created_to - shard.created_from
+        if span > timedelta(seconds=1):
+            middle = shard.created_from + timedelta(seconds=span.total_seconds() // 2)
+            return [replace(shard, created_to=middle), replace(shard, created_from=middle + timedelta(seconds=1))]
+    return []
+
+
+def search_all_repositories(query: str, token: str, session: requests.Session = None) -> List[Dict]:
+    """
+    获取搜索的全部结果（不受1000条上限限制）
+
+    :param query: 搜索关键词，可包含 language: 等限定词；若已包含 stars: 或 created: 则不再按该维度拆分
+    :param token: GitHub Token
+    :param session: 可选的 requests.Session，用于复用连接和本地缓存
+    :return: 去重后的仓库信息列表，按 star 数降序
+    """
+    http = session or requests.Session()
+    rate_limit = RateLimitState()
+
+    def fetch_page(task: Tuple[Shard, int]) -> Dict:
+        shard, page = task
+        response = http.get(
+            f"{GITHUB_API_URL}/search/repositories",
+            headers={"Authorization": f"token {token}"},
+            params={"q": shard.query(query), "sort": "stars", "order": "desc",
+                    "per_page": SEARCH_PAGE_SIZE, "page": page},
+            timeout=GITHUB_REQUEST_TIMEOUT
+        )
+        rate_limit.update(response.headers)
+        response.raise_for_status()
+        return response.json()
+
+    def on_error(task: Tuple[Shard, int], e: Exception):
+        shard, page = task
+        print(f"搜索分片 \"{shard.query(query)}\" 第 {page} 页获取失败: {e}")
+        return None
+
+    def new_scheduler() -> AdaptiveScheduler:
+        # 搜索API每分钟只有30次配额，保留1次即暂停
+        return AdaptiveScheduler(max_concurrency=SEARCH_MAX_CONCURRENCY,
+                                 initial_concurrency=SEARCH_MAX_CONCURRENCY,
+                                 rate_limit_probe=rate_limit, reserve=1)
+
+    root = Shard(
+        stars_min=None if re.search(r"\bstars:", query) else 0,
+        created_from=None if re.search(r"\bcreated:", query) else GITHUB_EPOCH,
+        created_to=None if re.search(r"\bcreated:", query) else datetime.now(timezone.utc).replace(microsecond=0)
+    )
+
+    # 第一阶段：逐层获取各分片的第一页，结果超过上限的分片继续拆分
+    items: Dict[str, Dict] = {}
+    page_tasks: List[Tuple[Shard, int]] = []
+    frontier = [root]
+    while frontier:
+        scheduler = new_scheduler()
+        payloads = scheduler.run(fetch_page, [(shard, 1) for shard in frontier], on_error)
+        next_frontier = []
+        settled = 0
+        for shard, payload in zip(frontier, payloads):
+            if payload is None:
+                continue
+            total = payload.get("total_count", 0)
+            first_page = payload.get("items", [])
+            if total > SEARCH_RESULT_CAP:
+                top_stars = first_page[0].get("stargazers_count") if first_page else None
+                children = split_shard(shard, top_stars)
+                if children:
+                    next_frontier.extend(children)
+                    continue
+                print(f"搜索分片 \"{shard.query(query)}\" 共 {total} 条结果且无法继续拆分，只获取前 {SEARCH_RESULT_CAP} 条")
+            settled += 1
+            for item in first_page:
+                items[item["full_name"]] = item
+            pages = math.ceil(min(total, SEARCH_RESULT_CAP) / SEARCH_PAGE_SIZE)
+            page_tasks.extend((shard, page) for page in range(2, pages + 1))
+        print(f"本轮确定 {settled} 个分片，继续拆分出 {len(next_frontier)} 个分片")
+        frontier = next_frontier
+
+    # 第二阶段：并发获取所有分片的剩余分页
+    if page_tasks:
+        scheduler = new_scheduler()
+        for payload in scheduler.run(fetch_page, page_tasks, on_error):
+            for item in (payload or {}).get("items", []):
+                items[item["full_name"]] = item
+        print(f"分页获取完成：{scheduler.stats.summary()}")
+
+    print(f"分片搜索共获取 {len(items)} 个仓库")
+    repo_infos = [search_item_to_repo_info(item) for item in items.values()]
+    return sorted(repo_infos, key=lambda repo_info: repo_info["stars"], reverse=True)
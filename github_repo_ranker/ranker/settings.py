@@ -0,0 +1,133 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# 加载环境变量
+load_dotenv()
+
+########################################
+# 调研默认参数，命令行参数和 rank() 的参数可覆盖
+########################################
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")  # GitHub Token
+# 动态搜索关键词，例如 "chatbot language:Python"
+DEFAULT_SEARCH_QUERY = "map client"
+# 动态搜索结果数量
+DEFAULT_SEARCH_RESULTS = 5
+# 是否获取搜索的全部结果（按 stars/created 分片突破 1000 条上限，忽略 DEFAULT_SEARCH_RESULTS）
+DEFAULT_SEARCH_ALL = False
+# 排序方式，可选值："stars"、"forks"、"last_updated"，以及按近 7/30/90 天新增 star 数排序的 "growth_7d"、"growth_30d"、"growth_90d"
+DEFAULT_SORT_KEY = "stars"
+GROWTH_SORT_KEYS = ("growth_7d", "growth_30d", "growth_90d")
+SORT_KEYS = ("stars", "forks", "last_updated") + GROWTH_SORT_KEYS
+# 是否采样 star 历史并估算近期增长（按增长排序时总会采样）
+DEFAULT_STAR_HISTORY = False
+# 仓库信息获取方式，可选值："rest"（逐个仓库调用 REST API）、"graphql"（GraphQL 批量查询，适合大量仓库）
+DEFAULT_FETCH_MODE = "rest"
+FETCH_MODES = ("rest", "graphql")
+# 并发后端，可选值："threads"（线程池 + requests/PyGithub）、"async"（asyncio + httpx，单线程支撑上千并发）
+DEFAULT_BACKEND = "threads"
+BACKENDS = ("threads", "async")
+# 是否增量刷新指定仓库：用一次批量轻量查询对比本地快照，只重新获取有变化的仓库，同时记录 star/fork 历史
+DEFAULT_INCREMENTAL = False
+# 指定仓库列表
+DEFAULT_SPECIFY_REPO_NAMES = [
+    "nanbingxyz/5ire",
+    "NitroRCr/AIaW",
+    "amidabuddha/console-chat-gpt",
+    "continuedev/continue",
+    "block/goose",
+    "danny-avila/LibreChat",
+    "3choff/mcp-chatbot",
+    "sooperset/mcp-client-slackbot",
+    "chainlit/chainlit",
+    "CherryHQ/cherry-studio",
+    "seekrays/seekchat",
+    "VikashLoomba/copilot-mcp",
+    "supercorp-ai/superinterface",
+    "ChatGPTNextWeb/NextChat",
+    "evilsocket/nerve",
+    "zed-industries/zed",
+    "luohy15/y-cli",
+    "Enconvo/Enconvo",
+    "BigSweetPotatoStudio/HyperChat",
+    "ggozad/oterm",
+    "Abiorh001/mcp_omni_connect",
+    "daodao97/chatmcp",
+    "cline/cline",
+    "getcursor/cursor",
+    "thinkinaixyz/deepchat",
+    "cognitivecomputations/dolphin-mcp",
+    "mario-andreschak/FLUJO",
+    "nick1udwig/kibitz",
+    "CopilotKit/open-mcp-client"
+]
+# 配置输出文件名，格式由扩展名决定
+DEFAULT_OUTPUT_FILE = "repo_rank.xlsx"
+REPORT_FORMATS = ("xlsx", "csv", "jsonl", "parquet")  # 支持的输出格式
+
+########################################
+# GitHub API 相关配置
+########################################
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")  # GitHub REST API基础URL
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")  # GitHub GraphQL API地址
+GITHUB_REQUEST_TIMEOUT = 30  # API请求超时时间(秒)
+GRAPHQL_BATCH_SIZE = 50  # 每次GraphQL查询包含的仓库数量，建议50~100，过大容易触发GitHub的查询超时(502)
+GRAPHQL_STATE_BATCH_SIZE = 100  # 增量刷新时每次轻量状态查询包含的仓库数量
+README_MAX_BYTES = 512 * 1024  # 提取文档链接时最多读取的README字节数
+
+########################################
+# 缓存配置
+########################################
+CACHE_DIR = Path(os.getenv("GITHUB_RANKER_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache"))  # 本地缓存目录
+HTTP_CACHE_PATH = CACHE_DIR / "http_cache.sqlite3"  # HTTP条件请求缓存文件
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # HTTP缓存容量上限(字节)，超出后淘汰最久未访问的响应
+TRANSLATION_CACHE_PATH = CACHE_DIR / "translations.sqlite3"  # 翻译结果缓存文件
+DOC_LINK_CACHE_PATH = CACHE_DIR / "doc_links.sqlite3"  # README文档链接缓存文件，按仓库保存README的ETag和文档链接
+STAR_HISTORY_CACHE_PATH = CACHE_DIR / "star_history.sqlite3"  # star历史采样缓存文件，按仓库索引
+STAR_HISTORY_CACHE_TTL = 12 * 3600  # star历史采样结果的有效期(秒)
+
+########################################
+# 指标配置
+########################################
+METRICS_FILE = os.getenv("GITHUB_RANKER_METRICS_FILE")  # 分阶段指标的JSON输出路径，为空时不输出
+PROMETHEUS_TEXTFILE = os.getenv("GITHUB_RANKER_PROMETHEUS_TEXTFILE")  # node_exporter textfile collector 的 .prom 输出路径，为空时不输出
+
+########################################
+# 快照配置
+########################################
+DATA_DIR = Path(os.getenv("GITHUB_RANKER_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))  # 数据存储目录
+SNAPSHOT_DB_PATH = DATA_DIR / "snapshots.sqlite3"  # 仓库快照和star/fork历史数据库，增量刷新时使用
+
+########################################
+# 并发调度配置
+########################################
+SCHEDULER_MIN_CONCURRENCY = 1  # 最小并发请求数
+SCHEDULER_MAX_CONCURRENCY = 16  # 最大并发请求数，过高容易触发GitHub的二级速率限制
+SCHEDULER_INITIAL_CONCURRENCY = 4  # 初始并发请求数，连续成功后逐步增加
+SCHEDULER_MAX_RETRIES = 5  # 单个仓库因限流最多重试的次数
+RATE_LIMIT_RESERVE = 50  # 剩余API配额低于此值时暂停请求，等待配额重置
+ASYNC_MAX_CONNECTIONS_PER_HOST = 32  # asyncio后端对每个主机的最大并发请求数
+ASYNC_MAX_IN_FLIGHT = 1000  # asyncio后端同时处理的最大仓库数
+
+########################################
+# 搜索配置
+########################################
+SEARCH_RESULT_CAP = 1000  # GitHub搜索API单个查询最多返回的结果数
+SEARCH_PAGE_SIZE = 100  # 搜索API每页最大结果数
+SEARCH_MAX_CONCURRENCY = 4  # 分片搜索的最大并发数，搜索API限额为每分钟30次，并发不宜过高
+
+########################################
+# star 历史采样配置
+########################################
+STAR_HISTORY_WINDOWS = (7, 30, 90)  # 估算新增star数的时间窗口(天)，与 GROWTH_SORT_KEYS 对应
+STAR_HISTORY_CURVE_SAMPLES = 10  # 绘制star曲线时均匀采样的页数
+STARGAZERS_PAGE_SIZE = 100  # stargazers接口每页最大条数
+STARGAZERS_MAX_PAGES = 400  # GitHub对stargazers接口只开放前400页，超出部分按当前总数线性插值
+
+########################################
+# 翻译配置
+########################################
+MYMEMORY_URL = os.getenv("MYMEMORY_URL", "https://api.mymemory.translated.net/get")  # MyMemory翻译接口地址
+TRANSLATION_LANGPAIR = "en|zh-CN"  # 翻译语言对
+TRANSLATION_TIMEOUT = 10  # 单次翻译请求超时时间(秒)
+TRANSLATION_MAX_WORKERS = 4  # 并发翻译请求数
@@ -0,0 +1,162 @@
+"""
+仓库快照存储与增量刷新
+
+SQLite 中保存每个仓库上次获取的完整信息及其 pushed_at / updated_at，并按运行记录 star、fork 历史。
+增量刷新时先用一次批量 GraphQL 轻量查询获取所有仓库的状态，只对有变化的仓库重新获取完整信息。
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .graphql_engine import fetch_repo_states, parse_datetime
+
+
+class SnapshotStore:
+    """
+    仓库快照和 star/fork 历史存储
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS repos ("
+            "name TEXT PRIMARY KEY, record TEXT, pushed_at TEXT, updated_at TEXT, fetched_at REAL);"
+            "CREATE TABLE IF NOT EXISTS history ("
+            "name TEXT, captured_at REAL, stars INTEGER, forks INTEGER);"
+            "CREATE INDEX IF NOT EXISTS idx_history_name ON history (name, captured_at);"
+        )
+        self._conn.commit()
+
+    def load(self, repo_names: List[str]) -> Dict[str, Dict]:
+        """
+        读取仓库快照
+
+        :param repo_names: 仓库全名列表
+        :return: 仓库名到 {"record", "pushed_at", "updated_at"} 的映射，没有快照的仓库不出现在结果中
+        """
+        snapshots = {}
+        with self._lock:
+            for start in range(0, len(repo_names), 500):
+                chunk = repo_names[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT name, record, pushed_at, updated_at FROM repos WHERE name IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for name, record, pushed_at, updated_at in rows:
+                    record = json.loads(record)
+                    record["last_updated"] = parse_datetime(record.get("last_updated"))
+                    snapshots[name] = {"record": record, "pushed_at": pushed_at, "updated_at": updated_at}
+        return snapshots
+
+    def save(self, snapshots: Dict[str, Tuple[Dict, Dict]]):
+        """
+        写入仓库快照
+
+        :param snapshots: 仓库名到 (仓库信息, 轻量状态) 的映射
+        """
+        now = time.time()
+        rows = []
+        for name, (record, state) in snapshots.items():
+            stored = dict(record)
+            if stored.get("last_updated") is not None:
+                stored["last_updated"] = stored["last_updated"].isoformat()
+            rows.append((name, json.dumps(stored, ensure_ascii=False), state["pushed_at"], state["updated_at"], now))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def record_history(self, states: Dict[str, Dict]):
+        """
+        记录本次运行各仓库的 star、fork 数
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO history VALUES (?, ?, ?, ?)",
+                [(name, now, state["stars"], state["forks"]) for name, state in states.items()]
+            )
+            self._conn.commit()
+
+    def history(self, repo_name: str, since: Optional[float] = None) -> List[Tuple[float, int, int]]:
+        """
+        查询仓库的 star、fork 历史
+
+        :param repo_name: 仓库全名
+        :param since: 起始时间戳，None 表示全部
+        :return: [(记录时间戳, star 数, fork 数)]，按时间升序
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT captured_at, stars, forks FROM history WHERE name = ? AND captured_at >= ? ORDER BY captured_at",
+                (repo_name, since or 0)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def is_changed(snapshot: Optional[Dict], state: Dict) -> bool:
+    """
+    判断仓库自上次快照后是否需要重新获取完整信息
+
+    updated_at 会随 star 数变化而更新，不能作为依据，只用于刷新报告中的最后更新时间。README 随推送变化，
+    以 pushed_at 判断；描述、开源协议和最近发布版本都可能在没有推送的情况下修改（发布版本可以基于已有的
+    tag 创建），直接比对轻量查询带回的值
+    """
+    if snapshot is None:
+        return True
+    record = snapshot["record"]
+    return (snapshot["pushed_at"] != state["pushed_at"]
+            or record.get("description") != state["description"]
+            or record.get("license") != state["license"]
+            or record.get("latest_release") != state["latest_release"])
+
+
+def refresh_incremental(repo_names: List[str], store: SnapshotStore, token: str,
+                        fetch: Callable[[List[str]], List[Dict]], session: requests.Session = None) -> List[Dict]:
+    """
+    增量获取仓库信息，结果顺序与 repo_names 一致
+
+    :param repo_names: 仓库全名列表
+    :param store: 快照存储
+    :param token: GitHub Token
+    :param fetch: 完整获取一批仓库信息的函数，只对有变化的仓库调用
+    :param session: 可选的 requests.Session
+    :return: 仓库信息列表
+    """
+    states = dict(zip(repo_names, fetch_repo_states(repo_names, token, session=session)))
+    snapshots = store.load(repo_names)
+    changed = [name for name in repo_names if states[name] is None or is_changed(snapshots.get(name), states[name])]
+    print(f"增量刷新：{len(repo_names)} 个仓库中 {len(changed)} 个有变化，需要重新获取")
+    fetched = dict(zip(changed, fetch(changed))) if changed else {}
+
+    results = []
+    updated_snapshots = {}
+    for name in repo_names:
+        state = states[name]
+        snapshot = snapshots.get(name)
+        record = fetched.get(name)
+        if record is None or (record.get("error") and snapshot):
+            # 未变化的仓库沿用快照，只刷新轻量查询带回的字段；获取失败时也退回快照
+            if snapshot is None:
+                results.append(record)
+                continue
+            record = dict(snapshot["record"])
+            if state:
+                record.update(stars=state["stars"], forks=state["forks"], last_updated=parse_datetime(state["updated_at"]))
+        results.append(record)
+        if state and not record.get("error"):
+            updated_snapshots[name] = (record, state)
+
+    store.save(updated_snapshots)
+    store.record_history({name: state for name, state in states.items() if state})
+    return results
@@ -0,0 +1,152 @@
+"""
+star 历史采样
+
+stargazers 接口使用 application/vnd.github.star+json 媒体类型时会带回每个 star 的 starred_at，
+且按时间升序分页。因此第 p 页第 i 条就是仓库的第 (p - 1) * 100 + i 个 star，
+对页码二分查找即可用 O(log n) 页定位任意时间点的 star 数，无需逐页遍历。
+"""
+import bisect
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .graphql_engine import parse_datetime
+from .kv_cache import KVCache
+from .scheduler import RateLimitState
+from .settings import (GITHUB_API_URL, GITHUB_REQUEST_TIMEOUT, STAR_HISTORY_CURVE_SAMPLES, STAR_HISTORY_WINDOWS,
+                       STARGAZERS_MAX_PAGES, STARGAZERS_PAGE_SIZE)
+
+DAY_SECONDS = 24 * 3600
+
+
+def growth_key(days: int) -> str:
+    return f"growth_{days}d"
+
+
+class StarHistorySampler:
+    """
+    对单个仓库采样 star 曲线并估算近期新增 star 数，cache 为 None 时不缓存结果
+    """
+
+    def __init__(self, token: str, session: requests.Session = None, cache: Optional[KVCache] = None,
+                 windows: Tuple[int, ...] = STAR_HISTORY_WINDOWS, curve_samples: int = STAR_HISTORY_CURVE_SAMPLES,
+                 page_size: int = STARGAZERS_PAGE_SIZE, max_pages: int = STARGAZERS_MAX_PAGES):
+        """
+        :param windows: 估算新增 star 数的时间窗口(天)
+        :param curve_samples: star 曲线均匀采样的页数
+        :param page_size: 每页条数
+        :param max_pages: 接口允许访问的最大页码
+        """
+        self.token = token
+        self.session = session or requests.Session()
+        self.cache = cache
+        self.windows = windows
+        self.curve_samples = curve_samples
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.rate_limit = RateLimitState()
+
+    def sample(self, repo_name: str, total_stars: int) -> Dict:
+        """
+        :param repo_name: 仓库全名
+        :param total_stars: 仓库当前 star 数
+        :return: {"growth_7d": ..., "growth_30d": ..., "growth_90d": ..., "curve": [[时间戳, star 数], ...],
+                  "pages_fetched": 请求的页数}
+        """
+        # star 数每次运行都可能变化，缓存只按有效期失效
+        if self.cache:
+            cached = self.cache.get(repo_name)
+            if cached is not None:
+                return cached
+
+        history = _RepoSampling(self, repo_name, total_stars).run()
+        if self.cache:
+            self.cache.set(repo_name, history)
+        return history
+
+    def fetch_page(self, repo_name: str, page: int) -> List[float]:
+        """
+        获取一页 stargazers，返回该页按时间升序的 starred_at 时间戳
+        """
+        response = self.session.get(
+            f"{GITHUB_API_URL}/repos/{repo_name}/stargazers",
+            headers={"Accept": "application/vnd.github.star+json", "Authorization": f"token {self.token}"},
+            params={"per_page": self.page_size, "page": page},
+            timeout=GITHUB_REQUEST_TIMEOUT,
+        )
+        self.rate_limit.update(response.headers)
+        response.raise_for_status()
+        return [parse_datetime(item["starred_at"]).timestamp() for item in response.json()]
+
+
+class _RepoSampling:
+    """
+    一次采样过程，记录已获取的页，二分查找和曲线采样共用
+    """
+
+    def __init__(self, sampler: StarHistorySampler, repo_name: str, total_stars: int):
+        self.sampler = sampler
+        self.repo_name = repo_name
+        self.total = total_stars
+        self.now = time.time()
+        self.page_size = sampler.page_size
+        self.total_pages = math.ceil(total_stars / self.page_size)
+        self.last_page = min(self.total_pages, sampler.max_pages)
+        self.pages: Dict[int, List[float]] = {}
+
+    def run(self) -> Dict:
+        history = {growth_key(days): self.growth(days) for days in self.sampler.windows}
+        history["curve"] = self.curve()
+        history["pages_fetched"] = len(self.pages)
+        return history
+
+    def page(self, number: int) -> List[float]:
+        if number not in self.pages:
+            self.pages[number] = self.sampler.fetch_page(self.repo_name, number)
+        return self.pages[number]
+
+    def growth(self, days: int) -> int:
+        if self.total == 0:
+            return 0
+        return max(0, self.total - self.count_at(self.now - days * DAY_SECONDS))
+
+    def count_at(self, timestamp: float) -> int:
+        """
+        估算 timestamp 时刻的 star 数：二分查找最后一个首条 starred_at 不晚于 timestamp 的页，再在页内定位
+        """
+        first_page = self.page(1)
+        if not first_page or first_page[0] > timestamp:
+            return 0
+        low, high = 1, self.last_page
+        while low < high:
+            middle = (low + high + 1) // 2
+            page = self.page(middle)
+            if page and page[0] <= timestamp:
+                low = middle
+            else:
+                high = middle - 1
+        page = self.page(low)
+        index = bisect.bisect_right(page, timestamp)
+        count = (low - 1) * self.page_size + index
+        if index == len(page) and low == self.last_page and self.last_page < self.total_pages:
+            # 目标时间晚于可访问的最后一个 star，在它和 (当前时间, 当前总数) 之间线性插值
+            last_starred_at = page[-1]
+            if self.now > last_starred_at:
+                count += round((self.total - count) * (timestamp - last_starred_at) / (self.now - last_starred_at))
+        return count
+
+    def curve(self) -> List[List[float]]:
+        """
+        在已获取的页之外再均匀补充采样页，以每页首条 star 作为曲线上的点，末尾追加当前总数
+        """
+        if self.last_page:
+            samples = min(self.sampler.curve_samples, self.last_page)
+            step = (self.last_page - 1) / max(1, samples - 1)
+            for i in range(samples):
+                self.page(1 + round(i * step))
+        points = [[page[0], (number - 1) * self.page_size + 1]
+                  for number, page in sorted(self.pages.items()) if page]
+        points.append([self.now, self.total])
+        return points
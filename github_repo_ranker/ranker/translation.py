@@ -0,0 +1,105 @@
+"""
+仓库描述翻译
+
+写入 Excel 之前先对所有描述去重，再用有界线程池并发调用 MyMemory 翻译接口，
+结果按"文本摘要 + 语言对"持久化缓存，重复运行时相同的描述不再请求接口。
+"""
+import concurrent.futures
+import contextvars
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from .kv_cache import KVCache
+from .metrics import Metrics
+from .settings import MYMEMORY_URL, TRANSLATION_LANGPAIR, TRANSLATION_MAX_WORKERS, TRANSLATION_TIMEOUT
+
+TRANSLATION_UNAVAILABLE = "翻译不可用"
+
+
+def translation_key(text: str, langpair: str) -> str:
+    return hashlib.sha256(f"{langpair}\n{text}".encode("utf-8")).hexdigest()
+
+
+def parse_translation(payload: Dict) -> Optional[str]:
+    """
+    解析 MyMemory 响应，失败时返回 None
+    """
+    # 额度用尽等情况下接口仍返回 200，需检查 responseStatus
+    if int(payload.get("responseStatus", 200)) == 200:
+        return payload.get("responseData", {}).get("translatedText") or None
+    print(f"翻译 API 返回错误: {payload.get('responseDetails')}")
+    return None
+
+
+class Translator:
+    """
+    带缓存的翻译器，cache 为 None 时不使用持久化缓存
+    """
+
+    def __init__(self, cache: Optional[KVCache] = None, session: requests.Session = None,
+                 langpair: str = TRANSLATION_LANGPAIR, timeout: float = TRANSLATION_TIMEOUT,
+                 max_workers: int = TRANSLATION_MAX_WORKERS,
+                 request_many: Optional[Callable[[List[str]], Dict[str, Optional[str]]]] = None,
+                 metrics: Optional[Metrics] = None):
+        """
+        :param request_many: 批量请求未命中缓存文本的函数，返回 原文 -> 译文（失败为 None），默认使用线程池
+        :param metrics: 指标收集器，批量翻译计入 translate_to_chinese 阶段
+        """
+        self.cache = cache
+        self.session = session or requests.Session()
+        self.langpair = langpair
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.request_many = request_many or self._request_concurrently
+        self.metrics = metrics or Metrics()
+
+    def translate(self, text: str) -> str:
+        """
+        翻译单条文本，失败时返回"翻译不可用"
+        """
+        if not text:
+            return TRANSLATION_UNAVAILABLE
+        return self.prefetch([text])[text]
+
+    def prefetch(self, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        批量翻译，先查缓存，未命中的文本去重后并发请求
+
+        :param texts: 待翻译文本，可包含重复和空值
+        :return: 原文到译文的映射
+        """
+        with self.metrics.stage("translate_to_chinese"):
+            return self._prefetch(texts)
+
+    def _prefetch(self, texts: Iterable[str]) -> Dict[str, str]:
+        unique_texts = list(dict.fromkeys(text for text in texts if text))
+        keys = {text: translation_key(text, self.langpair) for text in unique_texts}
+        cached = self.cache.get_many(keys.values()) if self.cache else {}
+        translations = {text: cached[key] for text, key in keys.items() if key in cached}
+
+        missing = [text for text in unique_texts if text not in translations]
+        if missing:
+            print(f"翻译 {len(unique_texts)} 条描述，缓存命中 {len(translations)} 条，需请求 {len(missing)} 条...")
+            fetched = self.request_many(missing)
+            # 只缓存成功的结果，失败的下次运行重试
+            succeeded = {text: result for text, result in fetched.items() if result is not None}
+            if self.cache:
+                self.cache.set_many({keys[text]: result for text, result in succeeded.items()})
+            translations.update({text: result or TRANSLATION_UNAVAILABLE for text, result in fetched.items()})
+        return translations
+
+    def _request_concurrently(self, texts: List[str]) -> Dict[str, Optional[str]]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, self._request, text) for text in texts]
+            return {text: future.result() for text, future in zip(texts, futures)}
+
+    def _request(self, text: str) -> Optional[str]:
+        try:
+            response = self.session.get(MYMEMORY_URL, params={"q": text, "langpair": self.langpair}, timeout=self.timeout)
+            if response.status_code == 200:
+                return parse_translation(response.json())
+        except Exception as e:
+            print(f"翻译 API 调用失败: {e}")
+        return None
@@ -0,0 +1,3 @@
+"""
+趋势报告的离线基准测试，在 github_trending_report 目录下运行 python -m benchmarks.parse_benchmark
+"""
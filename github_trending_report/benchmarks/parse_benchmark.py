@@ -0,0 +1,100 @@
+"""
+趋势页面解析基准测试
+
+对 benchmarks/fixtures 下保存的趋势页面，分别用原来的 BeautifulSoup(html.parser) 全页解析和各个解析后端解析，
+统计每页平均耗时，并校验各后端返回的记录与原实现一致（fetched_at 除外）。未安装的后端会被跳过。
+
+    python -m benchmarks.parse_benchmark
+    python -m benchmarks.parse_benchmark --repeat 50 --fixtures "benchmarks/fixtures/trending_weekly_*.html"
+"""
+import argparse
+import glob
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from src.crawler.trending_parser import PARSER_BACKENDS, _is_installed, parse_trending_html
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def parse_with_html_parser(html: str, since: str, language: str = "") -> List[Dict]:
+    """
+    改造前 fetch_trending_repos 中的解析逻辑，作为基准和正确性参照
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    trending_repos = []
+    for article in soup.find_all('article', {'class': 'Box-row'}):
+        title = article.find('h2').text.strip().replace('\n', '').replace(' ', '')
+        description = article.find('p', {'class': 'col-9'}).text.strip() if article.find('p', {'class': 'col-9'}) else ""
+        star_element = article.find('a', href=lambda href: href and '/stargazers' in href)
+        total_stars = star_element.text.strip().replace(',', '') if star_element else '--'
+        stars_change_element = article.find('span', class_='d-inline-block float-sm-right')
+        stars_change = stars_change_element.text.strip().split(' ')[0].replace(',', '') if stars_change_element else '--'
+        trending_repos.append({
+            'name': title,
+            'description': description,
+            'stars': total_stars,
+            f'{since}_stars': stars_change,
+            'language': language if language else "all",
+            'url': f"https://github.com/{title}",
+            'fetched_at': datetime.now().isoformat()
+        })
+    return trending_repos
+
+
+def fixture_since(path: Path) -> str:
+    """
+    从文件名 trending_{since}_{date}.html 中取出时间范围
+    """
+    return path.stem.split("_")[1]
+
+
+def without_fetched_at(repos: List[Dict]) -> List[Dict]:
+    return [{key: value for key, value in repo.items() if key != "fetched_at"} for repo in repos]
+
+
+def measure(parse: Callable[[str, str], List[Dict]], pages: List[tuple], repeat: int) -> float:
+    """
+    :return: 每页平均耗时(毫秒)
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html, since in pages:
+            parse(html, since)
+    return (time.perf_counter() - started) * 1000 / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在保存的趋势页面上对比各解析后端的耗时")
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR / "*.html"), help="趋势页面文件的 glob 模式")
+    parser.add_argument("--repeat", type=int, default=20, help="每个后端重复解析全部页面的次数")
+    args = parser.parse_args()
+
+    paths = [Path(path) for path in sorted(glob.glob(args.fixtures))]
+    if not paths:
+        raise SystemExit(f"未找到趋势页面文件: {args.fixtures}")
+    pages = [(path.read_text(encoding="utf-8"), fixture_since(path)) for path in paths]
+    print(f"共 {len(pages)} 个页面，平均 {sum(len(html) for html, _ in pages) / len(pages) / 1024:.0f} KB，"
+          f"每个后端重复 {args.repeat} 次")
+
+    expected = [without_fetched_at(parse_with_html_parser(html, since)) for html, since in pages]
+    baseline = measure(parse_with_html_parser, pages, args.repeat)
+    print(f"{'html.parser(原实现)':<20}{baseline:>10.2f} ms/页")
+    for backend in PARSER_BACKENDS:
+        if not _is_installed(backend):
+            print(f"{backend:<20}{'未安装，跳过':>10}")
+            continue
+        for (html, since), records, path in zip(pages, expected, paths):
+            actual = without_fetched_at(parse_trending_html(html, since=since, backend=backend))
+            if actual != records:
+                raise SystemExit(f"{backend} 解析 {path.name} 的结果与原实现不一致")
+        elapsed = measure(lambda html, since: parse_trending_html(html, since=since, backend=backend), pages, args.repeat)
+        print(f"{backend:<20}{elapsed:>10.2f} ms/页  {baseline / elapsed:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -184,4 +184,175 @@ WEEKLY_TREADING_CONFLUENCE_ABSTRACT  = PromptTemplate(
     - 摘要描述要突出文章的核心内容，引导读者快速了解文章内容
                 
    """
-)
\ No newline at end of file
+)
+
+# 分段生成(map-reduce)：公众号文章的项目介绍段落，每次只处理一小批项目
+WEEKLY_TREADING_WECHAT_SECTIONS = PromptTemplate(
+    input_variables=["trending_projects"],
+    template="""
+
+你是一位拥有世界级技术视野的资深技术专家，同时也是百万粉丝级别的技术文章作者，正在为微信公众号「每周Github技术趋势」专栏撰写项目介绍。
+本次需要介绍的趋势项目（每个项目都需要介绍）：\n{trending_projects}\n\n
+
+按列表顺序为每个项目写一段介绍。每个项目之前单独一行输出标记 [[SECTION:仓库]]（仓库与列表中的仓库名完全一致），标记之后按以下模板编写：
+     ```
+     <p style="color:#3daad6;font-weight:bold;font-size: 16px;">项目名称：一句话亮点</p>
+     <p style="color:#888888; font-size: 15px;">star⭐️: 本周 xxk｜总 xxk</p>
+     <p style="color:#888888; font-size: 15px;>项目地址：<br>URL</p>
+     <p style="font-size: 16px;>[项目详细介绍]，（首行不缩进）文章的核心内容，描述项目的基本功能，结合项目相关国内外讨论信息，介绍项目原理，重点介绍技术的突破性、前瞻性等，或项目的应用前景、应用案例与价值等，使用通俗比喻解释技术难点，针对存在伦理或安全等争议的内容，需从正反等多维度分析重点进行描述，引爆文章话题。</p>
+     <br>末尾空一行
+     ```
+
+要求：
+- 使用微信公众号支持的HTML格式，重点内容用<strong>加粗</strong>
+- 专业性与趣味性结合，使用准确的技术术语，复杂概念用生动比喻解释
+- 只输出标记和项目介绍，不要输出文章标题、导语、分类标题或其他说明
+
+"""
+)
+
+# 分段生成(map-reduce)：根据各项目的一句话亮点生成公众号文章的标题、导语、分类、趋势洞察等，项目介绍位置用占位符代替
+WEEKLY_TREADING_WECHAT_OUTLINE = PromptTemplate(
+    input_variables=["trending_projects"],
+    template="""
+
+你是一位拥有世界级技术视野的资深技术专家，同时也是百万粉丝级别的技术文章作者，专注于为中国开发者解读全球技术趋势。各项目的详细介绍已经写好，请根据以下本周趋势项目及其一句话亮点，写出「每周Github技术趋势」专栏文章的其余部分：\n{trending_projects}\n\n
+
+严格按以下顺序组织内容：
+0. 文章标题，提炼本周文章核心内容标题，具有阅读引导性。
+
+1. 【固定导语】(无标题)
+   - 开场白：<p style="font-size: 16px;>"GitHub Trends，Future Unfurls！本周GitHub又有哪些神仙项目霸榜热门？「每周GitHub技术趋势」继续为您解读。"</p>
+   - 内容概览：<p style="font-size: 16px;>（首行不缩进）1-2段总结本周核心内容，提炼3-5个关键词</p>
+   - <br>末尾空一行
+
+2. 【项目分类】
+   - 将项目归类为3-5个高度抽象的类别(不可归类的可以统一归到"其它上榜项目")
+   - 每个类别标题<p style="color:#ffffff;font-weight:bold;font-size: 17px;text-align: center"><span style="background-color:#3daad6">项目名称：（中文）一句话亮点</span></p>
+   - <br>每个类别标题后空一行
+   - 类别标题之后，每个属于该类别的项目单独一行输出占位符 [[PROJECT:仓库]]（仓库与列表中的仓库名完全一致），不要编写项目介绍；每个项目必须且只能出现一次
+
+3. 【本周趋势洞察】
+   - 标题<p style="color:#ffffff;font-weight:bold;font-size: 17px;text-align: center"><span style="background-color:#3daad6">本周趋势洞察</span></p>
+   - <br>标题后空一行
+   - 内容<p style="font-size: 16px;>（首行不缩进）输出1000字以上本周趋势洞察，结合国内外相关信息进行深度分析，展现全球技术视野和前瞻性见解，需要具有前瞻性、引领性、专业性、准确性。</p>
+   - <br>末尾空一行
+
+4. 【开发者建议】
+   - 标题<p style="color:#ffffff;font-weight:bold;font-size: 17px;text-align: center"><span style="background-color:#3daad6">开发者建议</span></p>
+   - <br>标题后空一行
+   - 内容<p style="font-size: 16px;>（首行不缩进）提供具体应用和学习建议，如何跟上本周技术趋势</p>
+   - <br>末尾空一行
+
+5. 【结尾引导】
+   - 内容<p style="font-size: 16px;>（首行不缩进）一段话设置2-3个开放式问题引导讨论，引爆话题，合理引导关注评论交流</p>
+   - <br>空一行
+   - 固定声明 <p style="color:#888888; font-size: 12px;>作者声明：「每周GitHub技术趋势」一般每周五晚上更新，旨在为开发者速递每周技术热点趋势，内容来源于Github Weekly Trending，综合相关项目互联网热门信息及AI整理，请注意鉴别。</p>
+   - <br>末尾空一行
+
+6、【参考文章】
+   - 标题<p style="font-weight:bold;font-size: 16px;text-align: left">参考文章：</p>
+   - 本篇文章的10个以内参考文章、讨论地址列表<p style="font-size: 15px;><strong>相关参考文章标题</strong>：<br>文章URL</p>
+
+输出要求：
+- 使用微信公众号支持的HTML格式，首行不缩进，正文未特殊设置时通常16号字，重点内容用<strong>加粗</strong>
+- 对争议性技术需正反分析，不使用微信风险内容(如下期预测、奖励等)
+- 去掉首尾其他大模型输出的html生成说明等文章无关内容，结果可直接用于微信公众号自动发表
+
+"""
+)
+
+# 分段生成(map-reduce)：Confluence文章的项目介绍段落，每次只处理一小批项目
+WEEKLY_TREADING_CONFLUENCE_SECTIONS = PromptTemplate(
+   input_variables=["trending_projects"],
+   template="""
+
+      你是一位拥有世界级技术视野的资深技术专家，正在为Confluence「每周Github技术趋势」专栏撰写项目介绍（使用标准Markdown格式，兼容Confluence Markdown宏）。
+      本次需要介绍的趋势项目（每个项目都需要介绍）：\n{trending_projects}\n\n
+
+      按列表顺序为每个项目写一段介绍。每个项目之前单独一行输出标记 [[SECTION:仓库]]（仓库与列表中的仓库名完全一致），标记之后按如下模板编写：
+
+       ▌ **项目名称：一句话亮点**  
+      ⭐ 本周 xxk | 总 xxk   🔗 [GitHub](项目仓库地址)                 
+      
+       [项目详细介绍]文章的核心内容，结合项目相关国内外讨论信息，重点介绍技术的突破性、前瞻性等，或项目的应用前景、应用案例与价值等，使用通俗语言解释技术难点。
+
+      输出要求：
+      - 使用标准Markdown格式，关键字加粗标黑
+      - 只输出标记和项目介绍，不要输出文章标题、概览、分类标题或其他说明
+
+   """
+)
+
+# 分段生成(map-reduce)：根据各项目的一句话亮点生成Confluence文章的概览、分类、趋势洞察等，项目介绍位置用占位符代替
+WEEKLY_TREADING_CONFLUENCE_OUTLINE = PromptTemplate(
+   input_variables=["trending_projects"],
+   template="""
+
+      你是一位拥有世界级技术视野的资深技术专家，专注于为中国开发者解读全球技术趋势。
+      各项目的详细介绍已经写好，请根据以下本周趋势项目及其一句话亮点，写出可直接发布到Confluence的「每周Github技术趋势」专栏文章的其余部分（使用标准Markdown格式，兼容Confluence Markdown宏）：\n{trending_projects}\n\n
+
+      文章要求-内容结构,严格按以下顺序和markdown组织内容：
+
+      **一、本周趋势概览**
+     【固定开场白】：技术不止眼前的代码，更有GitHub每周的前沿创意！ [每周GitHub技术趋势] 继续为您速递本周的热点项目和技术趋势 。
+      [用1-2段总结本周核心内容，引导阅读，提炼几个本周关键词]
+
+      ---
+
+      **二、项目解读**
+
+      **（一）项目分类标题 **，用（中文数字）作为序号，将本周项目分类为3-5个高度抽象的类别(不可归类的可以统一归到"其它上榜项目")
+      类别标题之后，每个属于该类别的项目单独一行输出占位符 [[PROJECT:仓库]]（仓库与列表中的仓库名完全一致），不要编写项目介绍；每个项目必须且只能出现一次
+
+      ---
+
+     ** 三、 本周趋势洞察**
+      文章的核心内容，输出1000字左右本周技术发展趋势洞察或总结，结合国内外相关信息进行深度分析，展现全球技术视野和前瞻性、引领性、专业性、准确性的技术发展洞察见解。
+
+      ---
+
+     ** 四、开发者建议**
+      提供研发部门具体应用和学习建议，如何跟上本周技术趋势。
+
+      ---
+
+      **五、思考问题**
+      设置3-5个开放式问题引导讨论，引爆话题，引导交流
+
+      ---
+
+      **六、 扩展阅读**
+      设置本篇文章相关的讨论、学习、参考文章列表，格式如下：
+      - [相关文章标题](文章URL)
+
+      【固定声明】*声明*：每周更新，内容基于Github Trending和AI整理，辅助大家关注全球开源技术发展，请注意自行鉴别和选择感兴趣的进一步学习。
+
+      输出要求，请严格按照以下格式：
+      - 使用标准Markdown格式，用于confluence markdown宏发表
+      - 输出去掉前后的"markdown"、双引号等字符，结果可直接用于Confluence api发布，符合api要求
+      - 关键字加粗标黑
+
+   """
+)
+
+# 支持分段生成的模板：模板名称 -> (项目介绍模板, 文章框架模板)
+MAP_REDUCE_TEMPLATES = {
+    "WEEKLY_TREADING_WECHAT": ("WEEKLY_TREADING_WECHAT_SECTIONS", "WEEKLY_TREADING_WECHAT_OUTLINE"),
+    "WEEKLY_TREADING_CONFLUENCE": ("WEEKLY_TREADING_CONFLUENCE_SECTIONS", "WEEKLY_TREADING_CONFLUENCE_OUTLINE"),
+}
+
+# 各模板需要的趋势项目字段，{trending_projects}会渲染为只包含这些字段的紧凑表格
+# period_stars表示各时间范围的新增星数，trending_status为新上榜/再次上榜标记，未列出的模板使用DEFAULT_PROJECT_FIELDS
+DEFAULT_PROJECT_FIELDS = ["name", "period_stars", "stars", "description"]
+PROJECT_FIELDS = {
+    "TECH_ANALYSIS_TEMPLATE": ["name", "stars", "description"],
+    "NEWS_REPORT_TEMPLATE": ["name", "period_stars", "description"],
+    "TUTORIAL_TEMPLATE": ["name", "description"],
+    "WEEKLY_TREADING_WECHAT": ["name", "period_stars", "stars", "trending_status", "description"],
+    "WEEKLY_TREADING_CONFLUENCE": ["name", "period_stars", "stars", "trending_status", "description"],
+    "WEEKLY_TREADING_WECHAT_SECTIONS": ["name", "period_stars", "stars", "description"],
+    "WEEKLY_TREADING_WECHAT_OUTLINE": ["name", "period_stars", "trending_status", "highlight"],
+    "WEEKLY_TREADING_CONFLUENCE_SECTIONS": ["name", "period_stars", "stars", "description"],
+    "WEEKLY_TREADING_CONFLUENCE_OUTLINE": ["name", "period_stars", "trending_status", "highlight"],
+}
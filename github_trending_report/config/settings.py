@@ -11,6 +11,7 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"  # 数据存储目录
 DATA_DIR.mkdir(exist_ok=True)
+TRENDING_DB_PATH = DATA_DIR / "trending_history.sqlite3"  # 趋势历史数据库，按仓库、日期、语言和时间范围索引
 
 ########################################
 # GitHub API 相关配置
@@ -20,6 +21,12 @@ GITHUB_API_URL = "https://api.github.com"  # GitHub API基础URL
 GITHUB_REQUEST_TIMEOUT = 10  # API请求超时时间(秒)
 GITHUB_TRENDING_SINCE = "weekly"  # 趋势时间范围: daily(日)/weekly(周)/monthly(月)
 GITHUB_TRENDING_LANGUAGE = ""  # 趋势语言筛选: 空字符串表示所有语言
+GITHUB_TRENDING_CRAWL_LANGUAGES = [GITHUB_TRENDING_LANGUAGE]  # 批量爬取的语言列表，如["", "python", "rust"]，文章基于合并后的结果生成
+GITHUB_TRENDING_CRAWL_PERIODS = [GITHUB_TRENDING_SINCE]  # 批量爬取的时间范围列表，如["daily", "weekly", "monthly"]
+GITHUB_TRENDING_MAX_CONCURRENCY = 4  # 批量爬取时的最大并发请求数
+GITHUB_TRENDING_REQUEST_INTERVAL = 0.5  # 批量爬取时相邻请求的最小间隔(秒)
+GITHUB_TRENDING_MAX_RETRIES = 3  # 遇到429或5xx时的最大重试次数
+GITHUB_TRENDING_PARSER = os.getenv("GITHUB_TRENDING_PARSER", "auto")  # 趋势页面解析后端: auto(自动)/selectolax/lxml/bs4
 
 ########################################
 # AI 服务配置
@@ -27,6 +34,17 @@ GITHUB_TRENDING_LANGUAGE = ""  # 趋势语言筛选: 空字符串表示所有语
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")  # DeepSeek API密钥
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1"  # DeepSeek API地址
 DEEPSEEK_MODEL = "deepseek-chat"  # 使用的DeepSeek模型
+ARTICLE_GENERATION_MAX_CONCURRENCY = 4  # 同时生成文章的最大数量(并发LLM调用数)
+ARTICLE_MAP_REDUCE_MIN_PROJECTS = 20  # 项目数不少于该值时分段生成文章(先并发生成项目介绍，再生成导语和趋势洞察)，0表示不分段
+ARTICLE_MAP_REDUCE_BATCH_SIZE = 5  # 分段生成时每次LLM调用介绍的项目数
+ARTICLE_MAP_REDUCE_MAX_CONCURRENCY = 4  # 分段生成时每篇文章同时进行的最大LLM调用数
+PROMPT_PROJECTS_TOKEN_BUDGET = 4000  # 提示词中项目列表的token预算，超过时缩短过长的项目描述，0表示不限制
+PROMPT_TOKENIZER_ENCODING = "cl100k_base"  # 统计token使用的tiktoken编码，无法加载时按字符数估算
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"  # 是否缓存LLM生成结果
+LLM_CACHE_FORCE_REFRESH = os.getenv("LLM_CACHE_FORCE_REFRESH", "false").lower() == "true"  # 忽略已有缓存重新生成
+LLM_CACHE_PATH = DATA_DIR / "llm_cache.sqlite3"  # LLM响应缓存数据库，按模板、模型、温度和输入内容寻址
+LLM_CACHE_TTL = 30 * 24 * 3600  # LLM响应缓存有效期(秒)
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # LLM响应缓存总大小上限(字节)，超过后淘汰最久未使用的响应
 
 ########################################
 # 发布平台配置
@@ -38,9 +56,15 @@ WECHAT_APP_SECRET = os.getenv("WECHAT_APP_SECRET")  # 微信公众号AppSecret
 WECHAT_PUBLISH_MODE = "draft" # 发布模式: draft(草稿)/publish(正式)
 WECHAT_AUTHOR="每周趋势AI助手"
 WECHAT_THUMB_MEDIA_ID = os.getenv("WECHAT_THUMB_MEDIA_ID")  # 微信公众号封面素材ID，避免每次都要上传一个封面图片
+WECHAT_SESSION_PATH = DATA_DIR / "wechat_session.json"  # 保存access_token(按有效期)和封面素材ID(按图片SHA-256)，含敏感信息，不要提交
 
 # 企业微信配置
 WECOM_WEBHOOK_URLS = os.getenv('WECOM_WEBHOOK_URLS', '').split(',')  # 企业微信机器人Webhook URL列表
+WECOM_MAX_CONCURRENCY = 8  # 同时推送的最大Webhook数，也是连接池大小
+WECOM_REQUEST_TIMEOUT = (5, 10)  # 每次推送的(连接, 读取)超时(秒)
+WECOM_MAX_RETRIES = 3  # 机器人触发频率限制(errcode 45009)时的最大重试次数
+WECOM_RETRY_BACKOFF = 2  # 频率限制重试的初始等待时间(秒)，每次重试翻倍
+WECOM_DESCRIPTION_MAX_BYTES = 512  # 卡片消息描述的最大字节数，超出部分截断
 
 # Confluence配置
 CONFLUENCE_URL = os.getenv("CONFLUENCE_URL")  # Confluence实例URL
@@ -48,6 +72,8 @@ CONFLUENCE_USERNAME = os.getenv("CONFLUENCE_USERNAME")  # Confluence用户名
 CONFLUENCE_API_TOKEN = os.getenv("CONFLUENCE_API_TOKEN")  # Confluence API令牌
 CONFLUENCE_SPACE_KEY = os.getenv("CONFLUENCE_SPACE_KEY")  # Confluence空间键
 CONFLUENCE_PARENT_PAGE_ID = os.getenv("CONFLUENCE_PARENT_PAGE_ID")  # Confluence父页面ID
+CONFLUENCE_BODY_FORMAT = "markdown_macro"  # 正文格式: markdown_macro(Markdown宏，需安装宏插件)/xhtml(转换为原生存储格式)
+CONFLUENCE_PUBLISH_MODE = "upsert"  # 发布模式: upsert(同名页面已存在时内容变化才更新)/create(总是新建页面)
 
 # 文章类型与发布渠道映射关系
 ARTICLE_CHANNEL_MAPPING = {
@@ -55,4 +81,11 @@ ARTICLE_CHANNEL_MAPPING = {
     # "TECH_ANALYSIS_TEMPLATE": ["confluence"]  # 技术分析模板发布渠道
     # "WEEKLY_TREADING_WECHAT": ["wechat"]  # 技术分析模板发布渠道
    "WEEKLY_TREADING_CONFLUENCE":["confluence", "wecom"]  # 技术分析模板发布渠道
-}
\ No newline at end of file
+}
+
+# 发布渠道之间的依赖，渠道在其依赖的渠道发布成功后才发布，并可使用其返回的文章地址
+CHANNEL_DEPENDENCIES = {
+    "wecom": ["confluence"],  # 企业微信卡片链接到Confluence页面
+}
+PUBLISH_MAX_CONCURRENCY = 4  # 同时发布的最大任务数(文章 x 渠道)
+RENDER_CACHE_SIZE = 64  # 内存中缓存的渠道渲染结果数(文章 x 格式)，重试和重新发布时不重复渲染
\ No newline at end of file
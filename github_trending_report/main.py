@@ -1,13 +1,17 @@
-import json
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Dict
 
-from src.crawler.github_trending import fetch_trending_repos
+from src.crawler.github_trending import fetch_trending_batch
+from src.crawler.trending_history import TrendingHistoryStore
 from src.generator.article_generator import ArticleGenerator
 from src.publisher.wechat import WeChatPublisher
 from src.publisher.confluence import ConfluencePublisher
 from src.publisher.wecom import WeComPublisher
+from src.pipeline.scheduler import DagScheduler
+from src.publisher.renderer import WECOM_SUMMARY, get_renderer
 from config.settings import DATA_DIR
 
 # 配置日志
@@ -18,112 +22,165 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(llm=None):
     """
     主流程：爬取GitHub趋势项目 -> 生成文章 -> 发布到各平台
+    
+    :param llm: 生成文章使用的LangChain语言模型，不传时使用DeepSeek，测试时可传入假模型
     """
     logger.info("开始GitHub技术趋势报告生成流程...")
     
     # 1. 爬取GitHub趋势项目
     logger.info("正在爬取GitHub趋势项目...")
-    from config.settings import GITHUB_TRENDING_SINCE, GITHUB_TRENDING_LANGUAGE
-    crawler_content = fetch_trending_repos(language=GITHUB_TRENDING_LANGUAGE, since=GITHUB_TRENDING_SINCE)
+    from config.settings import GITHUB_TRENDING_SINCE, GITHUB_TRENDING_CRAWL_LANGUAGES, GITHUB_TRENDING_CRAWL_PERIODS
+    crawler_content = fetch_trending_batch(languages=GITHUB_TRENDING_CRAWL_LANGUAGES, periods=GITHUB_TRENDING_CRAWL_PERIODS)
     
     if not crawler_content:
         logger.warning("未获取到趋势项目数据，流程终止")
         return
     
+    # 根据趋势历史库标记新上榜和再次上榜的项目
+    try:
+        TrendingHistoryStore().annotate_repos(crawler_content, since=GITHUB_TRENDING_SINCE)
+    except Exception as e:
+        logger.warning(f"读取趋势历史库失败，不标记新上榜项目: {e}")
     
-    # 2. 生成所有需要的文章
-    articles = {}
-    from config.settings import ARTICLE_CHANNEL_MAPPING
-    today = datetime.now().strftime("%Y%m%d")
     
-    # 获取所有需要生成的文章类型（去重）
-    required_article_types = set(ARTICLE_CHANNEL_MAPPING.keys())
+    # 2. 生成文章并发布：每篇文章生成完成后立即发布到其各个渠道，渠道之间按CHANNEL_DEPENDENCIES的依赖顺序发布
+    from config.settings import (ARTICLE_CHANNEL_MAPPING, ARTICLE_GENERATION_MAX_CONCURRENCY, CHANNEL_DEPENDENCIES,
+                                 PUBLISH_MAX_CONCURRENCY)
+    today = datetime.now().strftime("%Y%m%d")
     
-    logger.info(f"需要生成的文章类型: {', '.join(required_article_types)}")
-    generator = ArticleGenerator()
+    logger.info(f"需要生成的文章类型: {', '.join(ARTICLE_CHANNEL_MAPPING.keys())}")
+    generator = ArticleGenerator(llm=llm)
     
-    # 检查并生成文章
-    for article_prompt_template_name in required_article_types:
-        article_file = DATA_DIR / f"{today}_{GITHUB_TRENDING_SINCE}_{article_prompt_template_name}.text"
-        
-        # 如果文章已存在则跳过生成
-        if article_file.exists():
-            logger.info(f"文章{article_prompt_template_name}已存在，跳过生成")
-            with open(article_file, "r", encoding="utf-8") as f:
-                articles[article_prompt_template_name] = f.read()
-            continue
+    with DagScheduler(pools={"generate": ARTICLE_GENERATION_MAX_CONCURRENCY, "publish": PUBLISH_MAX_CONCURRENCY}) as scheduler:
+        for article_prompt_template_name, channels in ARTICLE_CHANNEL_MAPPING.items():
+            article_file = DATA_DIR / f"{today}_{GITHUB_TRENDING_SINCE}_{article_prompt_template_name}.text"
+            generate_task = f"generate:{article_prompt_template_name}"
+            scheduler.add_task(generate_task,
+                               partial(_prepare_article, generator, article_prompt_template_name, article_file,
+                                       crawler_content),
+                               pool="generate")
             
-        # 生成新文章
-        logger.info(f"生成文章{article_prompt_template_name}...")
-        articles.update(generator.generate_article(article_prompt_template_name, trending_projects=crawler_content))
+            # 各渠道格式在文章就绪后一次渲染，发布器直接使用缓存的结果；预渲染失败时各渠道发布时单独渲染自己的格式
+            render_task = f"render:{article_prompt_template_name}"
+            scheduler.add_task(render_task, partial(_render_task, article_prompt_template_name, generate_task),
+                               depends_on=[generate_task], pool="publish")
+            
+            for channel in channels:
+                dependencies = [dependency for dependency in CHANNEL_DEPENDENCIES.get(channel, []) if dependency in channels]
+                scheduler.add_task(
+                    f"publish:{article_prompt_template_name}:{channel}",
+                    partial(_publish_task, article_prompt_template_name, channel, generate_task, today),
+                    depends_on=[generate_task, render_task] + [f"publish:{article_prompt_template_name}:{dependency}"
+                                                  for dependency in dependencies],
+                    pool="publish")
         
-        # 保存生成的文章
-        logger.info(f"生成文章{article_prompt_template_name}生成完成，保存文章...")
-        with open(article_file, "w", encoding="utf-8") as f:
-            f.write(articles[article_prompt_template_name])
+        scheduler.wait()
+        logger.info("任务耗时报告:")
+        scheduler.log_report()
     
-    # 3. 发布文章
-    logger.info("所有文章生成完成，正在发布文章到各平台...")
-    article_urls = {}
+    logger.info("GitHub技术趋势报告生成流程完成!")
+
+
+def _prepare_article(generator: ArticleGenerator, article_prompt_template_name: str, article_file: Path,
+                     crawler_content, _dependency_results) -> str:
+    """
+    读取已存在的文章，不存在时生成并保存
+
+    :return: 文章内容
+    """
+    # 如果文章已存在则跳过生成
+    if article_file.exists():
+        logger.info(f"文章{article_prompt_template_name}已存在，跳过生成")
+        with open(article_file, "r", encoding="utf-8") as f:
+            return f.read()
     
-    # 按文章类型和渠道发布
-    for article_prompt_template_name, channels in ARTICLE_CHANNEL_MAPPING.items(): 
-        if article_prompt_template_name not in articles:
-            logger.warning(f"文章类型{article_prompt_template_name}未生成，跳过发布")
-            continue
-            
-        logger.info(f"开始发布{article_prompt_template_name}到{', '.join(channels)}...")
-        article_urls[article_prompt_template_name] = {}
-        
-        for channel in channels:
-            logger.info(f"正在发布{article_prompt_template_name}文章到{channel}平台...")
-            
-            try:
-                if channel == "wechat":
-                    # 发布到微信公众号
-                    wechat_publisher = WeChatPublisher()
-                    wechat_data = {
-                        "title": f"每{'日' if GITHUB_TRENDING_SINCE == 'daily' else '周' if GITHUB_TRENDING_SINCE == 'weekly' else '月'}GitHub技术趋势({today}期)",
-                        "content": articles[article_prompt_template_name],
-                        # "digest": "每周精选GitHub热门项目技术分析"，不传，微信自动截取54个字作为摘要介绍
-                    }
-                    article_url = wechat_publisher.publish_article(wechat_data)
-                    article_urls[article_prompt_template_name][channel] = article_url
-                elif channel == "confluence":
-                    # 发布到Confluence
-                    confluence_publisher = ConfluencePublisher()
-                    confluence_data = {
-                        "title": f"每{'日' if GITHUB_TRENDING_SINCE == 'daily' else '周' if GITHUB_TRENDING_SINCE == 'weekly' else '月'}GitHub技术趋势({today}期)",
-                        "content": articles[article_prompt_template_name]
-                    }
-                    article_url = confluence_publisher.publish_article(confluence_data)
-                    article_urls[article_prompt_template_name][channel] = article_url
-                elif channel == "wecom":
-                    # 发布到企业微信
-                    enterprise_wechat_publisher = WeComPublisher()
-                    # ！！！TODO这里需要自行修改获取其他渠道的文章地址, 这里使用confluence的地址作为企业微信的文章地址
-                    article_link_url = article_urls[article_prompt_template_name]["confluence"]
-                    if not article_link_url or article_link_url == "#":
-                        logger.warning(f"文章{article_prompt_template_name}在Confluence平台未发布或无法获取文章链接，跳过企业微信发布，请确认后再发布")
-                        continue
-                    # 生成企业微信卡片消息内容
-                    enterprise_wechat_data = {
-                        "title": f"每{'日' if GITHUB_TRENDING_SINCE == 'daily' else '周' if GITHUB_TRENDING_SINCE == 'weekly' else '月'}GitHub技术趋势({today}期)",
-                        "description":  articles[article_prompt_template_name],
-                        "url": article_link_url,
-                        "pic_url": "https://p3-flow-imagex-sign.byteimg.com/ocean-cloud-tos/image_skill/3a16d434-f260-43f6-b0e1-c52d444befa7_1747378622636380176_origin~tplv-a9rns2rl98-image-dark-watermark.png?rk3s=b14c611d&x-expires=1778914622&x-signature=ezzVk2TSTjr%2FSrfx4wTuP9JoWME%3D"
-                    }
-                    enterprise_wechat_publisher.publish_article(enterprise_wechat_data)
-                    article_urls[article_prompt_template_name][channel] = "#" # 企业微信没用文章地址，这里使用#代替
+    content = generator.generate_article(article_prompt_template_name,
+                                         trending_projects=crawler_content)[article_prompt_template_name]
+    
+    # 保存生成的文章
+    logger.info(f"生成文章{article_prompt_template_name}生成完成，保存文章...")
+    with open(article_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    return content
 
-            except Exception as e:
-                logger.error(f"发布{article_prompt_template_name}到{channel}失败: {str(e)}")
-                article_urls[article_prompt_template_name][channel] = "#"
 
-    logger.info("GitHub技术趋势报告生成流程完成!")
+def _render_task(article_prompt_template_name: str, generate_task: str, dependency_results):
+    """
+    预渲染文章的所有渠道格式，失败只记录日志，不影响依赖它的发布任务
+    """
+    try:
+        get_renderer().render(dependency_results[generate_task])
+    except Exception as e:
+        logger.warning(f"文章{article_prompt_template_name}预渲染失败，各渠道发布时单独渲染: {e}")
+
+
+def _publish_task(article_prompt_template_name: str, channel: str, generate_task: str, today: str,
+                  dependency_results) -> str:
+    """
+    调度器中的发布任务，依赖的渠道任务返回值按渠道名称传给发布函数
+    """
+    prefix = f"publish:{article_prompt_template_name}:"
+    channel_urls = {task[len(prefix):]: result for task, result in dependency_results.items() if task.startswith(prefix)}
+    return publish_to_channel(article_prompt_template_name, channel, dependency_results[generate_task], today, channel_urls)
+
+
+def publish_to_channel(article_prompt_template_name: str, channel: str, content: str, today: str,
+                       channel_urls: Dict[str, str] = None) -> str:
+    """
+    发布文章到单个渠道
+    
+    :param article_prompt_template_name: 文章模板名称
+    :param channel: 发布渠道，wechat、confluence或wecom
+    :param content: 文章内容
+    :param today: 期号日期，格式YYYYMMDD
+    :param channel_urls: 已发布的依赖渠道 -> 文章地址
+    :return: 文章地址，没有文章地址时返回"#"
+    """
+    from config.settings import GITHUB_TRENDING_SINCE
+    channel_urls = channel_urls or {}
+    title = f"每{'日' if GITHUB_TRENDING_SINCE == 'daily' else '周' if GITHUB_TRENDING_SINCE == 'weekly' else '月'}GitHub技术趋势({today}期)"
+    logger.info(f"正在发布{article_prompt_template_name}文章到{channel}平台...")
+    
+    if channel == "wechat":
+        # 发布到微信公众号
+        wechat_publisher = WeChatPublisher()
+        wechat_data = {
+            "title": title,
+            "content": content,
+            # "digest": "每周精选GitHub热门项目技术分析"，不传，微信自动截取54个字作为摘要介绍
+        }
+        return wechat_publisher.publish_article(wechat_data)
+    elif channel == "confluence":
+        # 发布到Confluence
+        confluence_publisher = ConfluencePublisher()
+        confluence_data = {
+            "title": title,
+            "content": content
+        }
+        return confluence_publisher.publish_article(confluence_data)
+    elif channel == "wecom":
+        # 发布到企业微信
+        enterprise_wechat_publisher = WeComPublisher()
+        # ！！！TODO这里需要自行修改获取其他渠道的文章地址, 这里使用confluence的地址作为企业微信的文章地址
+        article_link_url = channel_urls.get("confluence")
+        if not article_link_url or article_link_url == "#":
+            logger.warning(f"文章{article_prompt_template_name}在Confluence平台未发布或无法获取文章链接，跳过企业微信发布，请确认后再发布")
+            return "#"
+        # 生成企业微信卡片消息内容
+        enterprise_wechat_data = {
+            "title": title,
+            "description": get_renderer().render_format(content, WECOM_SUMMARY),
+            "url": article_link_url,
+            "pic_url": "https://p3-flow-imagex-sign.byteimg.com/ocean-cloud-tos/image_skill/3a16d434-f260-43f6-b0e1-c52d444befa7_1747378622636380176_origin~tplv-a9rns2rl98-image-dark-watermark.png?rk3s=b14c611d&x-expires=1778914622&x-signature=ezzVk2TSTjr%2FSrfx4wTuP9JoWME%3D"
+        }
+        results = enterprise_wechat_publisher.publish_article(enterprise_wechat_data)
+        if not any(result.success for result in results):
+            raise Exception(f"所有企业微信群({len(results)}个)消息推送失败")
+        return "#"  # 企业微信没用文章地址，这里使用#代替
+    raise ValueError(f"未知的发布渠道: {channel}")
 
 
 if __name__ == "__main__":
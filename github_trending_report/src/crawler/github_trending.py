@@ -1,23 +1,32 @@
 import json
 import requests
 import logging
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional
 from datetime import datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from config.settings import GITHUB_TRENDING_URL, DATA_DIR
+from config.settings import (GITHUB_TRENDING_URL, DATA_DIR, GITHUB_TRENDING_MAX_CONCURRENCY,
+                             GITHUB_TRENDING_REQUEST_INTERVAL, GITHUB_TRENDING_MAX_RETRIES)
+from src.crawler.trending_history import TrendingHistoryStore
+from src.crawler.trending_parser import parse_trending_html
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_trending_repos(language: str = "", since: str = "daily", spoken_language: str = "") -> List[Dict]:
+def fetch_trending_repos(language: str = "", since: str = "daily", spoken_language: str = "",
+                         session: Optional[requests.Session] = None) -> List[Dict]:
     """
     从GitHub Trending获取热门仓库
     
     :param language: 编程语言过滤，如"python"，空字符串表示所有语言
     :param since: 时间范围，可选"daily", "weekly", "monthly"
     :param spoken_language: 界面语言过滤，如"zh"表示中文
+    :param session: 复用连接的会话，不传时每次新建连接
     :return: 热门仓库列表，每个仓库包含名称、描述、星数等信息
     """
     # 生成文件名并检查本地缓存
@@ -43,7 +52,7 @@ def fetch_trending_repos(language: str = "", since: str = "daily", spoken_langua
     
     try:
         logger.info(f"正在从GitHub获取趋势数据: {url}，参数: {params}") 
-        response = requests.get(url, params=params, timeout=20)
+        response = (session or requests).get(url, params=params, timeout=20)
         response.raise_for_status()
         logger.debug(f"GitHub趋势API响应状态码: {response.status_code}")
         
@@ -51,36 +60,12 @@ def fetch_trending_repos(language: str = "", since: str = "daily", spoken_langua
         if not response.text:
             raise ValueError("GitHub趋势API返回空响应")
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        articles = soup.find_all('article', {'class': 'Box-row'})
+        trending_repos = parse_trending_html(response.text, since=since, language=language)
         
-        if not articles:
+        if not trending_repos:
             logger.warning("GitHub趋势页面解析失败，未找到项目数据")
             return []
         
-        trending_repos = []
-        for article in articles:
-            title = article.find('h2').text.strip().replace('\n', '').replace(' ', '')
-            description = article.find('p', {'class': 'col-9'}).text.strip() if article.find('p', {'class': 'col-9'}) else ""
-            
-            # 提取总 Stars 数
-            star_element = article.find('a', href=lambda href: href and '/stargazers' in href)
-            total_stars = star_element.text.strip().replace(',', '') if star_element else '--'
-
-            # 提取新增 Stars 数
-            stars_change_element = article.find('span', class_='d-inline-block float-sm-right')
-            stars_change = stars_change_element.text.strip().split(' ')[0].replace(',', '') if stars_change_element else '--'
-            repo_info = {
-                'name': title,
-                'description': description,
-                'stars': total_stars,
-                f'{since}_stars': stars_change,
-                'language': language if language else "all",
-                'url': f"https://github.com/{title}",
-                'fetched_at': datetime.now().isoformat()
-            }
-            trending_repos.append(repo_info)
-        
         # 保存获取的数据
         save_trending_data(trending_repos, filepath)
         
@@ -91,6 +76,116 @@ def fetch_trending_repos(language: str = "", since: str = "daily", spoken_langua
         return []
 
 
+def fetch_trending_batch(languages: Iterable[str] = ("",), periods: Iterable[str] = ("daily", "weekly", "monthly"),
+                         spoken_language: str = "", max_concurrency: int = GITHUB_TRENDING_MAX_CONCURRENCY,
+                         request_interval: float = GITHUB_TRENDING_REQUEST_INTERVAL) -> List[Dict]:
+    """
+    并发获取多个语言、时间范围组合的热门仓库，合并去重后返回
+    
+    每个组合仍读写各自的本地缓存文件；所有请求共用一个连接池，并限制并发数和请求间隔，避免对GitHub造成压力
+    
+    :param languages: 编程语言列表，空字符串表示所有语言
+    :param periods: 时间范围列表，可选"daily", "weekly", "monthly"
+    :param spoken_language: 界面语言过滤，如"zh"表示中文
+    :param max_concurrency: 同时进行的最大请求数
+    :param request_interval: 相邻两次请求发起的最小间隔(秒)
+    :return: 合并后的热门仓库列表，同一仓库只保留一条，并带上各时间范围的新增星数(如weekly_stars、monthly_stars)
+    """
+    combinations = [(language, since) for language in dict.fromkeys(languages) for since in dict.fromkeys(periods)]
+    logger.info(f"开始并发获取{len(combinations)}个趋势组合，最大并发数: {max_concurrency}")
+    
+    session = create_trending_session(max_concurrency)
+    limiter = _RequestLimiter(request_interval)
+    
+    def fetch(combination):
+        language, since = combination
+        # 已有缓存的组合不发请求，也就不占用请求间隔
+        if not get_trending_data_filepath(language, since, spoken_language).exists():
+            limiter.wait()
+        return fetch_trending_repos(language, since, spoken_language, session=session)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = list(executor.map(fetch, combinations))
+    finally:
+        session.close()
+    
+    failed = [f"{language or 'all'}/{since}" for (language, since), repos in zip(combinations, results) if not repos]
+    if failed:
+        logger.warning(f"以下趋势组合未获取到数据: {', '.join(failed)}")
+    
+    merged_repos = merge_trending_repos(results)
+    logger.info(f"趋势数据获取完成，共{len(merged_repos)}个不重复的项目")
+    return merged_repos
+
+
+def merge_trending_repos(repo_lists: Iterable[List[Dict]]) -> List[Dict]:
+    """
+    按仓库名合并多个趋势列表，保持首次出现的顺序
+    
+    总星数取各列表中最大的值，各时间范围的新增星数分别保留，编程语言优先保留具体语言而不是"all"
+    
+    :param repo_lists: fetch_trending_repos返回的仓库列表
+    :return: 合并后的仓库列表
+    """
+    merged = {}
+    for repos in repo_lists:
+        for repo in repos:
+            existing = merged.get(repo['name'])
+            if existing is None:
+                merged[repo['name']] = dict(repo)
+                continue
+            for key, value in repo.items():
+                if key.endswith('_stars') and existing.get(key, '--') == '--':
+                    existing[key] = value
+            if _star_count(repo['stars']) > _star_count(existing['stars']):
+                existing['stars'] = repo['stars']
+            if existing['language'] == "all":
+                existing['language'] = repo['language']
+            if not existing['description']:
+                existing['description'] = repo['description']
+    return list(merged.values())
+
+
+def create_trending_session(pool_size: int = GITHUB_TRENDING_MAX_CONCURRENCY) -> requests.Session:
+    """
+    创建抓取趋势页面用的会话：连接池大小与并发数一致，遇到429和5xx时按Retry-After退避重试
+    
+    :param pool_size: 连接池大小
+    :return: 会话
+    """
+    retry = Retry(total=GITHUB_TRENDING_MAX_RETRIES, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class _RequestLimiter:
+    """
+    保证相邻两次请求发起之间至少间隔interval秒，多线程共用
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+    
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+def _star_count(stars: str) -> int:
+    return int(stars) if stars.isdigit() else -1
+
+
 def get_trending_data_filepath(language: str = "", since: str = "daily", spoken_language: str = "") -> Path:
     """
     生成GitHub趋势数据文件名路径
@@ -110,7 +205,7 @@ def get_trending_data_filepath(language: str = "", since: str = "daily", spoken_
 
 def save_trending_data(repos: List[Dict], filepath: str = None):
     """
-    保存趋势数据到JSON文件
+    保存趋势数据到JSON文件，并追加到趋势历史库
     
     :param repos: 仓库数据列表
     :param filename: 自定义文件名
@@ -122,4 +217,9 @@ def save_trending_data(repos: List[Dict], filepath: str = None):
             json.dump(repos, f, ensure_ascii=False, indent=2)
         logger.info(f"趋势数据已保存到: {filepath}")
     except Exception as e:
-        logger.error(f"保存趋势数据失败: {e}")
\ No newline at end of file
+        logger.error(f"保存趋势数据失败: {e}")
+    
+    try:
+        TrendingHistoryStore().save_snapshot_file(repos, filepath)
+    except Exception as e:
+        logger.error(f"写入趋势历史库失败: {e}")
\ No newline at end of file
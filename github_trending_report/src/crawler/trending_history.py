@@ -0,0 +1,274 @@
+import argparse
+import json
+import logging
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import DATA_DIR, TRENDING_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# github_trending_{language}_{since}[_{spoken_language}]_{YYYY-MM-DD}.json，language为空表示所有语言
+TRENDING_FILE_PATTERN = re.compile(
+    r"^github_trending_(?P<language>[^_]*)_(?P<since>daily|weekly|monthly)(?:_(?P<spoken_language>[^_]+))?"
+    r"_(?P<date>\d{4}-\d{2}-\d{2})\.json$"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trending_entries (
+    snapshot_date TEXT NOT NULL,
+    language TEXT NOT NULL,
+    since TEXT NOT NULL,
+    spoken_language TEXT NOT NULL DEFAULT '',
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    stars INTEGER,
+    period_stars INTEGER,
+    url TEXT,
+    fetched_at TEXT,
+    PRIMARY KEY (snapshot_date, language, since, spoken_language, name)
+);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_name ON trending_entries (name, since, snapshot_date, rank);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_date ON trending_entries (snapshot_date, since, language);
+"""
+
+
+def parse_trending_filename(filepath) -> Optional[Dict[str, str]]:
+    """
+    从趋势数据文件名中解析爬取参数
+
+    :param filepath: 趋势数据文件路径
+    :return: 包含language、since、spoken_language、snapshot_date的字典，文件名不符合规则时返回None
+    """
+    match = TRENDING_FILE_PATTERN.match(Path(filepath).name)
+    if not match:
+        return None
+    return {
+        "language": match.group("language") or "all",
+        "since": match.group("since"),
+        "spoken_language": match.group("spoken_language") or "",
+        "snapshot_date": match.group("date"),
+    }
+
+
+class TrendingHistoryStore:
+    """
+    GitHub趋势历史数据存储，基于SQLite，按仓库、日期、语言和时间范围建立索引
+
+    每天每个爬取组合保存一份快照，同一天重复保存时覆盖之前的记录；每次操作使用独立连接，可在多线程中共用
+    """
+
+    def __init__(self, db_path=TRENDING_DB_PATH):
+        """
+        :param db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        # WAL模式下NORMAL只在检查点时同步磁盘，断电最多丢失最近的快照，可以从JSON文件重新导入
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def save_snapshot(self, repos: List[Dict], since: str, snapshot_date: str, language: str = "all",
+                      spoken_language: str = "") -> int:
+        """
+        保存一次爬取结果
+
+        :param repos: fetch_trending_repos返回的仓库列表，顺序即排名
+        :param since: 时间范围
+        :param snapshot_date: 快照日期，格式YYYY-MM-DD
+        :param language: 编程语言，"all"表示所有语言
+        :param spoken_language: 界面语言
+        :return: 保存的记录数
+        """
+        with closing(self._connect()) as connection, connection:
+            return _write_snapshot(connection, repos, since, snapshot_date, language, spoken_language)
+
+    def save_snapshot_file(self, repos: List[Dict], filepath) -> int:
+        """
+        按趋势数据文件名中的爬取参数保存快照
+
+        :param repos: 仓库数据列表
+        :param filepath: 对应的趋势数据文件路径
+        :return: 保存的记录数，文件名不符合规则时不保存并返回0
+        """
+        params = parse_trending_filename(filepath)
+        if params is None:
+            logger.debug(f"文件名不符合趋势数据命名规则，不写入历史库: {filepath}")
+            return 0
+        return self.save_snapshot(repos, **params)
+
+    def import_json_files(self, data_dir=DATA_DIR) -> int:
+        """
+        一次性导入data目录中已有的趋势数据JSON文件，可重复执行
+
+        :param data_dir: 趋势数据目录
+        :return: 导入的记录数
+        """
+        imported = 0
+        # 所有文件在同一个事务中写入
+        with closing(self._connect()) as connection, connection:
+            for filepath in sorted(Path(data_dir).glob("github_trending_*.json")):
+                params = parse_trending_filename(filepath)
+                if params is None:
+                    logger.warning(f"跳过无法识别的文件: {filepath}")
+                    continue
+                try:
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        repos = json.load(f)
+                except Exception as e:
+                    logger.error(f"读取趋势数据文件失败: {filepath}, {e}")
+                    continue
+                imported += _write_snapshot(connection, repos, **params)
+        logger.info(f"已从{data_dir}导入{imported}条趋势记录")
+        return imported
+
+    def query(self, name: str = None, start_date: str = None, end_date: str = None, language: str = None,
+              since: str = None, spoken_language: str = None, limit: int = None) -> List[Dict]:
+        """
+        按条件查询趋势记录，结果按日期、时间范围、语言和排名排序
+
+        :param name: 仓库全名，如"owner/repo"
+        :param start_date: 起始日期(含)，格式YYYY-MM-DD
+        :param end_date: 结束日期(含)，格式YYYY-MM-DD
+        :param language: 编程语言，"all"表示所有语言的榜单
+        :param since: 时间范围
+        :param spoken_language: 界面语言
+        :param limit: 最多返回的记录数
+        :return: 趋势记录列表
+        """
+        conditions, params = _build_conditions(name=name, start_date=start_date, end_date=end_date, language=language,
+                                               since=since, spoken_language=spoken_language)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT * FROM trending_entries{where} ORDER BY snapshot_date, since, language, rank"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as connection:
+            return [dict(row) for row in connection.execute(sql, params)]
+
+    def repo_summaries(self, names: Iterable[str], since: str = None, before_date: str = None,
+                       language: str = None) -> Dict[str, Dict]:
+        """
+        统计仓库的上榜历史
+
+        :param names: 仓库全名列表
+        :param since: 只统计该时间范围的榜单，None表示全部
+        :param before_date: 只统计该日期之前(不含)的快照，用于判断当天的项目是否首次上榜
+        :param language: 只统计该语言的榜单，None表示全部
+        :return: 仓库名 -> {"appearances": 上榜天数, "first_seen": 首次上榜日期, "last_seen": 最近上榜日期,
+                 "best_rank": 最好排名}，从未上榜的仓库不在结果中
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        conditions, params = _build_conditions(since=since, language=language, before_date=before_date)
+        conditions.append(f"name IN ({', '.join('?' * len(names))})")
+        params.extend(names)
+        sql = ("SELECT name, COUNT(DISTINCT snapshot_date) AS appearances, MIN(snapshot_date) AS first_seen, "
+               "MAX(snapshot_date) AS last_seen, MIN(rank) AS best_rank FROM trending_entries "
+               f"WHERE {' AND '.join(conditions)} GROUP BY name")
+        with closing(self._connect()) as connection:
+            return {row["name"]: dict(row) for row in connection.execute(sql, params)}
+
+    def annotate_repos(self, repos: List[Dict], since: str, snapshot_date: str = None) -> List[Dict]:
+        """
+        为仓库标记是否首次上榜，供文章生成时区分新上榜和再次上榜的项目
+
+        会在每个仓库上增加trending_status("new"/"recurring")、trending_appearances(此前上榜天数)和
+        first_trending_date(首次上榜日期，新上榜为None)
+
+        :param repos: 仓库数据列表，原地修改
+        :param since: 按该时间范围的历史榜单判断
+        :param snapshot_date: 本次快照日期，只统计之前的快照，默认今天
+        :return: repos
+        """
+        snapshot_date = snapshot_date or datetime.now().strftime("%Y-%m-%d")
+        summaries = self.repo_summaries((repo["name"] for repo in repos), since=since, before_date=snapshot_date)
+        for repo in repos:
+            summary = summaries.get(repo["name"])
+            repo["trending_status"] = "recurring" if summary else "new"
+            repo["trending_appearances"] = summary["appearances"] if summary else 0
+            repo["first_trending_date"] = summary["first_seen"] if summary else None
+        return repos
+
+
+def _write_snapshot(connection: sqlite3.Connection, repos: List[Dict], since: str, snapshot_date: str,
+                    language: str = "all", spoken_language: str = "") -> int:
+    language = language or "all"
+    rows = [
+        (snapshot_date, language, since, spoken_language, rank, repo["name"], repo.get("description"),
+         _to_int(repo.get("stars")), _to_int(repo.get(f"{since}_stars")), repo.get("url"), repo.get("fetched_at"))
+        for rank, repo in enumerate(repos, start=1)
+    ]
+    # 同一天重新爬取时以最新结果为准，先删除旧快照避免残留已跌出榜单的仓库
+    connection.execute(
+        "DELETE FROM trending_entries WHERE snapshot_date = ? AND language = ? AND since = ? AND spoken_language = ?",
+        (snapshot_date, language, since, spoken_language))
+    connection.executemany(
+        "INSERT OR REPLACE INTO trending_entries (snapshot_date, language, since, spoken_language, rank, name, "
+        "description, stars, period_stars, url, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+_FILTER_CONDITIONS = {
+    "name": "name = ?",
+    "start_date": "snapshot_date >= ?",
+    "end_date": "snapshot_date <= ?",
+    "before_date": "snapshot_date < ?",
+    "language": "language = ?",
+    "since": "since = ?",
+    "spoken_language": "spoken_language = ?",
+}
+
+
+def _build_conditions(**filters):
+    """
+    把非None的过滤条件转换为SQL条件和参数
+    """
+    conditions, params = [], []
+    for key, value in filters.items():
+        if value is not None:
+            conditions.append(_FILTER_CONDITIONS[key])
+            params.append(value)
+    return conditions, params
+
+
+def _to_int(value) -> Optional[int]:
+    value = str(value).replace(',', '') if value is not None else ""
+    return int(value) if value.isdigit() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub趋势历史数据")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="导入data目录中已有的趋势数据JSON文件")
+    import_parser.add_argument("--data-dir", default=str(DATA_DIR))
+    history_parser = subparsers.add_parser("history", help="查询仓库的上榜记录")
+    history_parser.add_argument("name", help="仓库全名，如owner/repo")
+    history_parser.add_argument("--since", choices=("daily", "weekly", "monthly"))
+    args = parser.parse_args()
+
+    store = TrendingHistoryStore()
+    if args.command == "import":
+        store.import_json_files(args.data_dir)
+    else:
+        for entry in store.query(name=args.name, since=args.since):
+            print(f"{entry['snapshot_date']} {entry['since']:<8}{entry['language']:<12}第{entry['rank']}名 "
+                  f"stars={entry['stars']} 新增={entry['period_stars']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,154 @@
+import importlib.util
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config.settings import GITHUB_TRENDING_PARSER
+
+logger = logging.getLogger(__name__)
+
+# 可选的解析后端，auto 按列表顺序选择第一个已安装的
+PARSER_BACKENDS = ("selectolax", "lxml", "bs4")
+# 新增 Stars 数所在 span 的 class，需与整个 class 属性完全一致
+STARS_CHANGE_CLASS = "d-inline-block float-sm-right"
+
+
+def parse_trending_html(html: str, since: str = "daily", language: str = "", backend: str = None) -> List[Dict]:
+    """
+    解析GitHub Trending页面，只处理article.Box-row节点
+
+    :param html: 趋势页面HTML
+    :param since: 时间范围，用于生成"{since}_stars"字段
+    :param language: 编程语言过滤，空字符串表示所有语言
+    :param backend: 解析后端，可选"auto", "selectolax", "lxml", "bs4"，默认使用配置GITHUB_TRENDING_PARSER
+    :return: 热门仓库列表，字段与fetch_trending_repos一致
+    """
+    parse_articles = _PARSERS[resolve_backend(backend or GITHUB_TRENDING_PARSER)]
+    return [_build_record(fields, since, language) for fields in parse_articles(html) if fields is not None]
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """
+    确定实际使用的解析后端，auto时依次尝试selectolax、lxml，都未安装则使用bs4
+
+    :param backend: 配置的解析后端
+    :return: 后端名称
+    """
+    if backend not in ("auto",) + PARSER_BACKENDS:
+        raise ValueError(f"未知的趋势页面解析后端: {backend}")
+    if backend != "auto":
+        return backend
+    for candidate in PARSER_BACKENDS[:-1]:
+        if _is_installed(candidate):
+            return candidate
+    return "bs4"
+
+
+def _is_installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _pick_fields(elements: Iterable, tag: Callable, attr: Callable, text: Callable) -> Optional[Dict[str, str]]:
+    """
+    按文档顺序遍历一次article的子孙节点，取出各字段第一次出现的节点文本
+
+    :param elements: article的子孙元素节点
+    :param tag: 取节点标签名的函数
+    :param attr: 取节点属性值（字符串）的函数
+    :param text: 取节点全部文本的函数
+    :return: 字段文本，缺少仓库标题时返回None
+    """
+    fields = {}
+    for element in elements:
+        name = tag(element)
+        if name == "h2":
+            key = "title"
+        elif name == "p" and "col-9" in (attr(element, "class") or "").split():
+            key = "description"
+        elif name == "a" and "/stargazers" in (attr(element, "href") or ""):
+            key = "stars"
+        elif name == "span" and " ".join((attr(element, "class") or "").split()) == STARS_CHANGE_CLASS:
+            key = "stars_change"
+        else:
+            continue
+        if key not in fields:
+            fields[key] = text(element)
+            if len(fields) == 4:
+                break
+
+    if "title" not in fields:
+        logger.warning("趋势项目缺少仓库标题，已跳过")
+        return None
+    return fields
+
+
+def _build_record(fields: Dict[str, str], since: str, language: str) -> Dict:
+    title = fields["title"].strip().replace('\n', '').replace(' ', '')
+    description = fields["description"].strip() if "description" in fields else ""
+    total_stars = fields["stars"].strip().replace(',', '') if "stars" in fields else '--'
+    stars_change = fields["stars_change"].strip().split(' ')[0].replace(',', '') if "stars_change" in fields else '--'
+    return {
+        'name': title,
+        'description': description,
+        'stars': total_stars,
+        f'{since}_stars': stars_change,
+        'language': language if language else "all",
+        'url': f"https://github.com/{title}",
+        'fetched_at': datetime.now().isoformat()
+    }
+
+
+def _parse_with_selectolax(html: str) -> List[Optional[Dict[str, str]]]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    return [
+        _pick_fields(
+            # traverse从article自身开始
+            (node for node in article.traverse() if node is not article),
+            lambda node: node.tag,
+            lambda node, name: node.attributes.get(name),
+            lambda node: node.text(deep=True),
+        )
+        for article in tree.css("article.Box-row")
+    ]
+
+
+def _parse_with_lxml(html: str) -> List[Optional[Dict[str, str]]]:
+    import lxml.html
+
+    root = lxml.html.fromstring(html)
+    articles = root.xpath("//article[contains(concat(' ', normalize-space(@class), ' '), ' Box-row ')]")
+    return [
+        _pick_fields(
+            article.iter("h2", "p", "a", "span"),
+            lambda element: element.tag,
+            lambda element, name: element.get(name),
+            lambda element: element.text_content(),
+        )
+        for article in articles
+    ]
+
+
+def _parse_with_bs4(html: str) -> List[Optional[Dict[str, str]]]:
+    # 只构建article.Box-row子树，安装了lxml时用它作为底层解析器
+    parser = "lxml" if _is_installed("lxml") else "html.parser"
+    soup = BeautifulSoup(html, parser, parse_only=SoupStrainer("article", class_="Box-row"))
+    return [
+        _pick_fields(
+            article.find_all(["h2", "p", "a", "span"]),
+            lambda element: element.name,
+            lambda element, name: " ".join(element.get_attribute_list(name)) if element.has_attr(name) else None,
+            lambda element: element.text,
+        )
+        for article in soup.find_all("article")
+    ]
+
+
+_PARSERS = {
+    "selectolax": _parse_with_selectolax,
+    "lxml": _parse_with_lxml,
+    "bs4": _parse_with_bs4,
+}
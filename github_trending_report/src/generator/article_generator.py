@@ -1,9 +1,16 @@
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 from langchain.chains import LLMChain
 from langchain_openai import ChatOpenAI
-from config.settings import DEEPSEEK_API_KEY, DEEPSEEK_MODEL, DEEPSEEK_API_URL
+from config.settings import (DEEPSEEK_API_KEY, DEEPSEEK_MODEL, DEEPSEEK_API_URL,
+                             ARTICLE_MAP_REDUCE_MIN_PROJECTS, ARTICLE_MAP_REDUCE_BATCH_SIZE,
+                             ARTICLE_MAP_REDUCE_MAX_CONCURRENCY, LLM_CACHE_ENABLED, LLM_CACHE_FORCE_REFRESH)
 import config.prompts as prompts
+from src.generator.llm_cache import LLMResponseCache, cache_key
+from src.generator.map_reduce import assemble_article, parse_sections, section_highlight
+from src.generator.project_serializer import serialize_projects
+from src.generator.streaming import SerializedStreamingStdOutCallbackHandler
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 
 class ArticleGenerator:
@@ -11,35 +18,69 @@ class ArticleGenerator:
     技术文章生成器，根据提示词模板动态生成文章
     """
     
-    def __init__(self):
+    def __init__(self, llm=None, cache: Optional[LLMResponseCache] = None, use_cache: bool = LLM_CACHE_ENABLED,
+                 force_refresh: bool = LLM_CACHE_FORCE_REFRESH):
+        """
+        :param llm: LangChain语言模型，不传时使用DeepSeek；测试时可传入FakeListLLM等假模型
+        :param cache: LLM响应缓存，不传时使用默认路径的缓存
+        :param use_cache: 是否使用LLM响应缓存
+        :param force_refresh: 忽略已有缓存重新调用LLM，新结果仍会写入缓存
+        """
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatOpenAI(
+        self.llm = llm or ChatOpenAI(
             openai_api_key=DEEPSEEK_API_KEY,
             model_name=DEEPSEEK_MODEL,
             temperature=0.7,
             openai_api_base=DEEPSEEK_API_URL,
             streaming=True,
-            callbacks=[StreamingStdOutCallbackHandler()]
+            # 多个模板并发生成时，同一时刻只有一个实时输出，其余完成后整段输出
+            callbacks=[SerializedStreamingStdOutCallbackHandler()]
         )
+        self.cache = (cache or LLMResponseCache()) if use_cache else None
+        self.force_refresh = force_refresh
         self.logger.debug("ArticleGenerator初始化完成")
     
-    def generate_article(self, template_name: str, **kwargs) -> Dict[str, str]:
+    def generate_article(self, template_name: str, map_reduce: Optional[bool] = None, **kwargs) -> Dict[str, str]:
         """
         根据模板名称生成文章
         
         :param template_name: 提示词模板名称
+        :param map_reduce: 是否分段生成，None时项目数不少于ARTICLE_MAP_REDUCE_MIN_PROJECTS则分段生成；
+                           只对config/prompts.py中MAP_REDUCE_TEMPLATES里的模板生效
         :param kwargs: 任意关键字参数，用于填充提示词模板
         :return: 包含文章类型和内容的字典
         """
         self.logger.info(f"开始生成文章，模板: {template_name}")
+        template = self._get_template(template_name)
 
+        projects = kwargs.get("trending_projects")
+        if template_name in prompts.MAP_REDUCE_TEMPLATES and isinstance(projects, list) and projects:
+            if map_reduce is None:
+                map_reduce = bool(ARTICLE_MAP_REDUCE_MIN_PROJECTS) and len(projects) >= ARTICLE_MAP_REDUCE_MIN_PROJECTS
+            if map_reduce:
+                return {template_name: self._generate_map_reduce(template_name, **kwargs)}
+        return {template_name: self._generate(template_name, template, kwargs)}
+
+    def _get_template(self, template_name: str):
         try:
             self.logger.debug(f"尝试获取模板: {template_name}")
-            template = getattr(prompts, template_name)
+            return getattr(prompts, template_name)
         except AttributeError as e:
             self.logger.error(f"模板获取失败: {str(e)}")
             raise ValueError(f"未知的模板名称: {template_name}")
 
+    def _generate(self, template_name: str, template, kwargs: Dict) -> str:
+        """
+        调用一次LLM，输入未变化时直接返回缓存的结果
+        """
+        kwargs = self._prepare_inputs(template_name, kwargs)
+        key = self._cache_key(template, kwargs) if self.cache else None
+        if key and not self.force_refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.logger.info(f"模板{template_name}的输入未变化，使用缓存的文章内容")
+                return cached
+
         try:
             self.logger.info(f"使用LLM生成文章内容，模板: {template_name}")
             class LoggingCallbackHandler(StreamingStdOutCallbackHandler):
@@ -51,11 +92,87 @@ class ArticleGenerator:
             
             if not content:
                 self.logger.warning("LLM返回空内容")
-                return {template_name: ""}
+                return ""
                 
             self.logger.debug(f"文章生成成功，模板: {template_name}")
-            return {template_name: content}
+            if key:
+                self.cache.set(key, content, template_name=template_name, model=self._model_name())
+            return content
             
         except Exception as e:
             self.logger.error(f"文章生成过程中发生错误: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def _generate_map_reduce(self, template_name: str, trending_projects: List[Dict], **kwargs) -> str:
+        """
+        分段生成文章：项目介绍按小批量并发生成，再根据各项目的一句话亮点生成标题、导语、分类和趋势洞察，最后拼装
+        """
+        sections_template_name, outline_template_name = prompts.MAP_REDUCE_TEMPLATES[template_name]
+        batches = [trending_projects[i:i + ARTICLE_MAP_REDUCE_BATCH_SIZE]
+                   for i in range(0, len(trending_projects), ARTICLE_MAP_REDUCE_BATCH_SIZE)]
+        self.logger.info(f"分段生成文章{template_name}: {len(trending_projects)}个项目分为{len(batches)}批")
+
+        sections = self._generate_sections(sections_template_name, batches, kwargs)
+        # 批量输出中遗漏的项目逐个补生成一次
+        missing = [project for project in trending_projects if project["name"] not in sections]
+        if missing:
+            self.logger.warning(f"{len(missing)}个项目的介绍未生成，逐个重试: {', '.join(p['name'] for p in missing)}")
+            sections.update(self._generate_sections(sections_template_name, [[project] for project in missing], kwargs))
+        if not sections:
+            raise RuntimeError(f"文章{template_name}的项目介绍全部生成失败")
+
+        outline_projects = [{**project, "highlight": section_highlight(sections[project["name"]])}
+                            for project in trending_projects if project["name"] in sections]
+        outline = self._generate(outline_template_name, self._get_template(outline_template_name),
+                                 {**kwargs, "trending_projects": outline_projects})
+        return assemble_article(outline, [project["name"] for project in trending_projects], sections)
+
+    def _generate_sections(self, template_name: str, batches: List[List[Dict]], kwargs: Dict) -> Dict[str, str]:
+        """
+        并发生成各批项目的介绍，单批失败只记录日志
+        
+        :return: 仓库名 -> 项目介绍
+        """
+        template = self._get_template(template_name)
+
+        def generate_batch(batch):
+            try:
+                text = self._generate(template_name, template, {**kwargs, "trending_projects": batch})
+                return parse_sections(text, (project["name"] for project in batch))
+            except Exception as e:
+                self.logger.error(f"项目介绍生成失败({', '.join(p['name'] for p in batch)}): {str(e)}")
+                return {}
+
+        sections = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(ARTICLE_MAP_REDUCE_MAX_CONCURRENCY, len(batches)))) as executor:
+            for batch_sections in executor.map(generate_batch, batches):
+                sections.update(batch_sections)
+        return sections
+
+    def _prepare_inputs(self, template_name: str, inputs: Dict) -> Dict:
+        """
+        把项目列表序列化为模板需要字段的紧凑表格，并记录节省的token数
+        """
+        projects = inputs.get("trending_projects")
+        if not isinstance(projects, list):
+            return inputs
+        fields = prompts.PROJECT_FIELDS.get(template_name, prompts.DEFAULT_PROJECT_FIELDS)
+        text, stats = serialize_projects(projects, fields)
+        saved = stats["raw_tokens"] - stats["tokens"]
+        self.logger.info(f"模板{template_name}的项目列表共{stats['tokens']}个token，原始格式{stats['raw_tokens']}个，"
+                         f"节省{saved}个({saved / max(1, stats['raw_tokens']):.0%})"
+                         + (f"，缩短了{stats['truncated']}条描述" if stats["truncated"] else ""))
+        return {**inputs, "trending_projects": text}
+
+    def _model_name(self) -> str:
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or type(self.llm).__name__
+
+    def _cache_key(self, template, inputs: Dict) -> str:
+        """
+        缓存键由模板原文、模型、温度和模板输入的哈希组成
+
+        :param inputs: _prepare_inputs处理后的输入，项目列表已序列化为实际发送给LLM的表格，
+                       "此前上榜N次"等标注变化时提示词不同，缓存键也随之变化
+        """
+        return cache_key(template.template, self._model_name(), getattr(self.llm, "temperature", None),
+                         {name: inputs.get(name) for name in template.input_variables})
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# 不参与缓存键计算的字段，只能是不会渲染进提示词的字段，如每次爬取都会变化的抓取时间
+VOLATILE_INPUT_FIELDS = ("fetched_at",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    template_name TEXT,
+    model TEXT,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used_at);
+"""
+
+
+def hash_input(inputs: Dict) -> str:
+    """
+    计算提示词输入的哈希，忽略VOLATILE_INPUT_FIELDS中的字段
+
+    :param inputs: 填充提示词模板的参数
+    :return: SHA-256十六进制字符串
+    """
+    normalized = json.dumps(_strip_volatile(inputs), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(template_text: str, model: str, temperature, inputs: Dict) -> str:
+    """
+    由模板原文、模型、温度和输入哈希计算缓存键，任意一项变化都会重新生成
+
+    :return: SHA-256十六进制字符串
+    """
+    payload = json.dumps({"template": template_text, "model": model, "temperature": temperature,
+                          "input": hash_input(inputs)}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {key: _strip_volatile(item) for key, item in value.items() if key not in VOLATILE_INPUT_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+class LLMResponseCache:
+    """
+    按内容寻址的LLM响应缓存，基于SQLite持久化
+
+    条目超过有效期后失效；总大小超过上限时按最近使用时间淘汰最旧的条目。每次操作使用独立连接，可在多线程中共用
+    """
+
+    def __init__(self, db_path=LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        :param db_path: SQLite数据库文件路径
+        :param ttl: 有效期(秒)
+        :param max_bytes: 缓存内容总大小上限(字节)
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        :param key: 缓存键
+        :return: 缓存的响应内容，不存在或已过期时返回None
+        """
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute("SELECT content, created_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            content, created_at = row
+            if now - created_at > self.ttl:
+                connection.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key))
+            return content
+
+    def set(self, key: str, content: str, template_name: str = None, model: str = None):
+        """
+        保存响应内容，并清理过期和超出大小上限的条目
+
+        :param key: 缓存键
+        :param content: 响应内容
+        :param template_name: 模板名称，仅用于排查
+        :param model: 模型名称，仅用于排查
+        """
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, template_name, model, content, size, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, template_name, model, content, size, now, now))
+            connection.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl,))
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        """
+        总大小超过上限时，按最近使用时间从旧到新删除，刚写入的条目最后删除
+        """
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in connection.execute("SELECT key, size FROM llm_responses ORDER BY last_used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"LLM缓存超过{self.max_bytes}字节，已淘汰{evicted}条最久未使用的响应")
@@ -0,0 +1,79 @@
+import logging
+import re
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# 项目介绍模板在每个项目前输出的标记
+SECTION_MARKER = re.compile(r"^[ \t]*\[\[SECTION:\s*(?P<name>[^\]]+?)\s*\]\][ \t]*$", re.MULTILINE)
+# 文章框架模板中项目介绍的占位符
+PROJECT_PLACEHOLDER = re.compile(r"^[ \t]*\[\[PROJECT:\s*(?P<name>[^\]]+?)\s*\]\][ \t]*(?:\n|$)", re.MULTILINE)
+HTML_TAG = re.compile(r"<[^>]+>")
+HIGHLIGHT_MAX_LENGTH = 80
+
+
+def parse_sections(text: str, names: Iterable[str]) -> Dict[str, str]:
+    """
+    按[[SECTION:仓库]]标记拆分一批项目介绍
+
+    :param text: 项目介绍模板的输出
+    :param names: 本批项目的仓库名，不在其中的标记会被忽略
+    :return: 仓库名 -> 项目介绍，同一项目出现多次时保留第一段
+    """
+    names = set(names)
+    markers = list(SECTION_MARKER.finditer(text))
+    sections = {}
+    for index, marker in enumerate(markers):
+        name = marker.group("name")
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+        section = text[marker.end():end].strip()
+        if name in names and section and name not in sections:
+            sections[name] = section
+    return sections
+
+
+def section_highlight(section: str) -> str:
+    """
+    取项目介绍的第一行（"项目名称：一句话亮点"）作为文章框架模板的输入，去掉HTML标签和Markdown标记
+    """
+    for line in section.splitlines():
+        line = HTML_TAG.sub("", line).replace("**", "").strip(" ▌#*`")
+        if line:
+            return line[:HIGHLIGHT_MAX_LENGTH]
+    return ""
+
+
+def assemble_article(outline: str, names: List[str], sections: Dict[str, str]) -> str:
+    """
+    把项目介绍填入文章框架的[[PROJECT:仓库]]占位符
+
+    重复的占位符只保留第一个，未知仓库的占位符会被删除；框架中遗漏的项目按原顺序补在最后一个占位符之后，
+    框架中没有任何占位符时补在文章末尾
+
+    :param outline: 文章框架模板的输出
+    :param names: 所有项目的仓库名，按榜单顺序
+    :param sections: 仓库名 -> 项目介绍
+    :return: 完整文章
+    """
+    placed = set()
+
+    def replace(match):
+        name = match.group("name")
+        if name not in sections or name in placed:
+            return ""
+        placed.add(name)
+        return sections[name] + "\n"
+
+    matches = list(PROJECT_PLACEHOLDER.finditer(outline))
+    unplaced = [name for name in names if name in sections and name not in
+                {match.group("name") for match in matches}]
+    if unplaced:
+        logger.warning(f"文章框架中遗漏了{len(unplaced)}个项目，已补在项目介绍末尾: {', '.join(unplaced)}")
+    extra = "\n\n".join(sections[name] for name in unplaced)
+
+    if not matches:
+        return f"{outline.rstrip()}\n\n{extra}" if extra else outline
+    last = matches[-1]
+    head = PROJECT_PLACEHOLDER.sub(replace, outline[:last.end()])
+    tail = outline[last.end():]
+    return f"{head}\n{extra}\n{tail}" if extra else head + tail
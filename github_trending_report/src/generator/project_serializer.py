@@ -0,0 +1,145 @@
+import logging
+import math
+import re
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from config.settings import PROMPT_PROJECTS_TOKEN_BUDGET, PROMPT_TOKENIZER_ENCODING
+
+logger = logging.getLogger(__name__)
+
+# 各字段在表头中的名称，新增星数字段按时间范围展开
+COLUMN_TITLES = {
+    "name": "仓库",
+    "stars": "总star",
+    "daily_stars": "今日新增star",
+    "weekly_stars": "本周新增star",
+    "monthly_stars": "本月新增star",
+    "trending_status": "上榜情况",
+    "highlight": "一句话亮点",
+    "description": "描述",
+}
+PERIOD_STARS_FIELDS = ("daily_stars", "weekly_stars", "monthly_stars")
+# 描述截断后追加的标记
+TRUNCATION_MARK = "…"
+CJK_PATTERN = re.compile(r"[⺀-鿿가-힯＀-￯]")
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    统计文本的token数，优先使用tiktoken；tiktoken未安装或无法加载编码文件（如离线环境）时按字符数估算
+
+    :param text: 文本
+    :return: token数
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 中日韩字符约1个token，其余字符约4个一个token
+    cjk_count = len(CJK_PATTERN.findall(text))
+    return cjk_count + math.ceil((len(text) - cjk_count) / 4)
+
+
+def _get_encoding():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(PROMPT_TOKENIZER_ENCODING)
+            except Exception as e:
+                logger.warning(f"无法加载tiktoken编码{PROMPT_TOKENIZER_ENCODING}，按字符数估算token: {e}")
+                _encoding = False
+        return _encoding or None
+
+
+def serialize_projects(projects: List[Dict], fields: Sequence[str],
+                       token_budget: int = PROMPT_PROJECTS_TOKEN_BUDGET) -> Tuple[str, Dict[str, int]]:
+    """
+    把趋势项目渲染为紧凑的竖线分隔表格，只保留模板需要的字段
+
+    项目地址可由仓库名推出，不单独输出；超过token预算时统一缩短过长的描述，直到整张表不超过预算
+
+    :param projects: 爬虫返回的项目列表
+    :param fields: 需要的字段，"period_stars"表示项目中出现的所有时间范围的新增星数
+    :param token_budget: 表格的token预算，0表示不限制
+    :return: (表格文本, {"raw_tokens": 原始格式token数, "tokens": 表格token数, "truncated": 被截断的描述数})
+    """
+    columns = _expand_columns(projects, fields)
+    descriptions = [_clean(project.get("description") or "") for project in projects]
+
+    text = _render(projects, columns, descriptions)
+    tokens = count_tokens(text)
+    truncated = 0
+    if token_budget and tokens > token_budget and "description" in columns:
+        limit = _fit_description_limit(projects, columns, descriptions, token_budget)
+        shortened = [_truncate(description, limit) for description in descriptions]
+        truncated = sum(1 for original, short in zip(descriptions, shortened) if original != short)
+        text = _render(projects, columns, shortened)
+        tokens = count_tokens(text)
+    if token_budget and tokens > token_budget:
+        logger.warning(f"项目表格共{tokens}个token，缩短描述后仍超过预算{token_budget}")
+
+    return text, {"raw_tokens": count_tokens(str(projects)), "tokens": tokens, "truncated": truncated}
+
+
+def _expand_columns(projects: List[Dict], fields: Sequence[str]) -> List[str]:
+    columns = []
+    for field in fields:
+        if field == "period_stars":
+            columns.extend(key for key in PERIOD_STARS_FIELDS if any(key in project for project in projects))
+        elif field == "trending_status":
+            # 只有读取过趋势历史库的项目才有上榜情况
+            if any(field in project for project in projects):
+                columns.append(field)
+        else:
+            columns.append(field)
+    return columns
+
+
+def _render(projects: List[Dict], columns: List[str], descriptions: List[str]) -> str:
+    header = "|".join(COLUMN_TITLES.get(column, column) for column in columns)
+    lines = [f"{header}（项目地址为 https://github.com/仓库）"]
+    for project, description in zip(projects, descriptions):
+        lines.append("|".join(
+            description if column == "description" else _format_value(column, project)
+            for column in columns
+        ))
+    return "\n".join(lines)
+
+
+def _format_value(column: str, project: Dict) -> str:
+    value = project.get(column)
+    if column == "trending_status" and value is not None:
+        appearances = project.get("trending_appearances") or 0
+        return "新上榜" if value == "new" else f"此前上榜{appearances}次"
+    return _clean("--" if value is None else str(value))
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.replace("|", "/").split())
+
+
+def _truncate(description: str, limit: int) -> str:
+    if len(description) <= limit:
+        return description
+    return description[:limit].rstrip() + TRUNCATION_MARK
+
+
+def _fit_description_limit(projects: List[Dict], columns: List[str], descriptions: List[str],
+                           token_budget: int) -> int:
+    """
+    二分查找描述的最大字符数，使表格token数不超过预算；不存在时返回0
+    """
+    low, high = 0, max(len(description) for description in descriptions)
+    while low < high:
+        middle = (low + high + 1) // 2
+        rendered = _render(projects, columns, [_truncate(description, middle) for description in descriptions])
+        if count_tokens(rendered) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    return low
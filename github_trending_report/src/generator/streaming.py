@@ -0,0 +1,76 @@
+import sys
+import threading
+from typing import Dict, List
+from uuid import UUID
+
+from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+
+
+class SerializedStreamingStdOutCallbackHandler(StreamingStdOutCallbackHandler):
+    """
+    多篇文章并发生成时不交错输出的流式回调
+
+    同一时刻只有一次LLM调用实时输出到控制台，其他调用的令牌先缓存，完成后(若有调用正在实时输出，则等其结束后)整段输出；
+    实时输出的调用结束后，由仍在进行中的最早一次调用接替实时输出
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._live = None
+        # 进行中且未实时输出的调用 -> 已收到的令牌
+        self._buffers: Dict[UUID, List[str]] = {}
+        # 实时输出期间完成的调用输出，等实时输出结束后再输出
+        self._completed: List[str] = []
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID = None, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID = None, **kwargs) -> None:
+        self._start(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID = None, **kwargs) -> None:
+        with self._lock:
+            if run_id == self._live:
+                _write(token)
+            else:
+                self._buffers.setdefault(run_id, []).append(token)
+
+    def on_llm_end(self, response, *, run_id: UUID = None, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID = None, **kwargs) -> None:
+        self._finish(run_id)
+
+    def _start(self, run_id: UUID):
+        with self._lock:
+            if self._live is None:
+                self._live = run_id
+            else:
+                self._buffers.setdefault(run_id, [])
+
+    def _finish(self, run_id: UUID):
+        with self._lock:
+            if run_id != self._live:
+                tokens = self._buffers.pop(run_id, [])
+                if not tokens:
+                    return
+                if self._live is None:
+                    _write("".join(tokens) + "\n")
+                else:
+                    self._completed.append("".join(tokens) + "\n")
+                return
+            _write("\n")
+            self._live = None
+            for text in self._completed:
+                _write(text)
+            self._completed.clear()
+            if self._buffers:
+                # 先补上接替者已缓存的令牌，之后的令牌实时输出
+                self._live, tokens = next(iter(self._buffers.items()))
+                del self._buffers[self._live]
+                _write("".join(tokens))
+
+
+def _write(text: str):
+    sys.stdout.write(text)
+    sys.stdout.flush()
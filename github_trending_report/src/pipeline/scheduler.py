@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+FINISHED_STATUSES = (SUCCESS, FAILED, SKIPPED)
+
+
+@dataclass
+class TaskRecord:
+    """
+    任务的状态和耗时，时间为相对调度器创建时刻的秒数
+    """
+    name: str
+    pool: str
+    depends_on: List[str]
+    status: str = PENDING
+    result: Any = None
+    error: Optional[str] = None
+    added_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    func: Callable = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def waited(self) -> Optional[float]:
+        """
+        从加入到开始执行的等待时间，包括等待依赖任务和等待线程池空闲
+        """
+        return None if self.started_at is None else self.started_at - self.added_at
+
+
+class DagScheduler:
+    """
+    按依赖关系并发执行任务的调度器
+
+    任务的所有依赖成功后立即提交到所属线程池执行，依赖失败或被跳过时任务被跳过；
+    任务可以在其他任务运行期间继续加入，依赖的任务也可以晚于依赖它的任务加入
+    """
+
+    def __init__(self, pools: Dict[str, int]):
+        """
+        :param pools: 线程池名称 -> 最大并发数，不同线程池互不占用
+        """
+        self._executors = {name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"dag-{name}")
+                           for name, size in pools.items()}
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._condition = threading.Condition()
+        self._origin = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def add_task(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Sequence[str] = (),
+                 pool: str = None):
+        """
+        加入任务
+
+        :param name: 任务名称，需唯一
+        :param func: 任务函数，参数为依赖任务名称 -> 依赖任务返回值
+        :param depends_on: 依赖的任务名称
+        :param pool: 执行任务的线程池，默认使用第一个线程池
+        """
+        pool = pool or next(iter(self._executors))
+        if pool not in self._executors:
+            raise ValueError(f"未知的线程池: {pool}")
+        with self._condition:
+            if name in self._tasks:
+                raise ValueError(f"任务已存在: {name}")
+            record = TaskRecord(name=name, pool=pool, depends_on=list(depends_on), added_at=self._now(), func=func)
+            self._tasks[name] = record
+            self._schedule(record)
+
+    def wait(self) -> Dict[str, TaskRecord]:
+        """
+        等待所有任务结束，依赖的任务始终未加入或依赖关系成环时，相关任务被跳过
+
+        :return: 任务名称 -> 任务记录
+        """
+        with self._condition:
+            while True:
+                if all(record.status in FINISHED_STATUSES for record in self._tasks.values()):
+                    return dict(self._tasks)
+                if not any(record.status == RUNNING for record in self._tasks.values()):
+                    self._skip_unresolvable()
+                    continue
+                self._condition.wait()
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def report(self) -> List[str]:
+        """
+        生成按开始时间排序的任务耗时报告
+        """
+        with self._condition:
+            records = sorted(self._tasks.values(), key=lambda record: (record.started_at is None, record.started_at or 0))
+        lines = [f"{'任务':<48}{'状态':<10}{'开始(s)':>9}{'等待(s)':>9}{'耗时(s)':>9}"]
+        for record in records:
+            started = "-" if record.started_at is None else f"{record.started_at:.1f}"
+            waited = "-" if record.waited is None else f"{record.waited:.1f}"
+            duration = "-" if record.duration is None else f"{record.duration:.1f}"
+            line = f"{record.name:<48}{record.status:<10}{started:>9}{waited:>9}{duration:>9}"
+            if record.error:
+                line += f"  {record.error}"
+            lines.append(line)
+        lines.append(f"总耗时: {self._now():.1f}s")
+        return lines
+
+    def log_report(self):
+        for line in self.report():
+            logger.info(line)
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def _schedule(self, record: TaskRecord):
+        """
+        依赖全部结束时提交或跳过任务，需持有锁
+        """
+        if record.status != PENDING:
+            return
+        dependencies = [self._tasks.get(name) for name in record.depends_on]
+        if any(dependency is None or dependency.status not in FINISHED_STATUSES for dependency in dependencies):
+            return
+        failed = [dependency.name for dependency in dependencies if dependency.status != SUCCESS]
+        if failed:
+            self._finish(record, SKIPPED, error=f"依赖任务未成功: {', '.join(failed)}")
+            return
+        record.status = RUNNING
+        results = {dependency.name: dependency.result for dependency in dependencies}
+        self._executors[record.pool].submit(self._run, record, results)
+
+    def _run(self, record: TaskRecord, results: Dict[str, Any]):
+        record.started_at = self._now()
+        try:
+            result = record.func(results)
+        except Exception as e:
+            logger.error(f"任务{record.name}执行失败: {str(e)}")
+            with self._condition:
+                self._finish(record, FAILED, error=str(e))
+            return
+        with self._condition:
+            record.result = result
+            self._finish(record, SUCCESS)
+
+    def _finish(self, record: TaskRecord, status: str, error: str = None):
+        """
+        记录任务结束并调度依赖它的任务，需持有锁
+        """
+        record.status = status
+        record.error = error
+        record.finished_at = self._now()
+        if record.started_at is None:
+            record.started_at = record.finished_at
+        for dependent in self._tasks.values():
+            if record.name in dependent.depends_on:
+                self._schedule(dependent)
+        self._condition.notify_all()
+
+    def _skip_unresolvable(self):
+        """
+        没有任务在运行但仍有等待的任务时，依赖的任务不存在或依赖关系成环，跳过这些任务，需持有锁
+        """
+        for record in list(self._tasks.values()):
+            if record.status == PENDING:
+                missing = [name for name in record.depends_on if name not in self._tasks]
+                if missing:
+                    self._finish(record, SKIPPED, error=f"依赖任务不存在: {', '.join(missing)}")
+        # 跳过任务只会让依赖它的任务也被跳过，不会提交新任务；此时仍在等待的任务在依赖环上，或者直接、间接依赖环上的任务
+        blocked = [record for record in self._tasks.values() if record.status == PENDING]
+        if not blocked:
+            return
+        logger.error(f"任务依赖关系存在环，跳过{len(blocked)}个任务: {', '.join(record.name for record in blocked)}")
+        # 先统一标记，避免环上的任务互相记为"依赖任务未成功"
+        for record in blocked:
+            record.status = SKIPPED
+        for record in blocked:
+            self._finish(record, SKIPPED, error="依赖关系存在环")
@@ -1,8 +1,12 @@
 from atlassian import Confluence
-from typing import Dict
+from typing import Dict, Optional
 import logging
 from config.settings import CONFLUENCE_URL, CONFLUENCE_USERNAME, CONFLUENCE_API_TOKEN
-from config.settings import CONFLUENCE_SPACE_KEY, CONFLUENCE_PARENT_PAGE_ID
+from config.settings import CONFLUENCE_SPACE_KEY, CONFLUENCE_PARENT_PAGE_ID, CONFLUENCE_PUBLISH_MODE
+from src.publisher.renderer import CONFLUENCE_STORAGE, article_hash, get_renderer
+
+# 保存页面内容哈希的页面属性key
+CONTENT_HASH_PROPERTY = "github-trending-report-content-hash"
 
 class ConfluencePublisher:
     """
@@ -26,20 +30,81 @@ class ConfluencePublisher:
         :return: 文章发布后的URL
         """
         try:
-            # 为文章内容添加Markdown宏支持
-            markdown_body = f'<ac:structured-macro ac:name="markdown"><ac:plain-text-body><![CDATA[{article_data.get("content", "")}]]></ac:plain-text-body></ac:structured-macro>';
+            title = article_data.get("title", "GitHub技术趋势报告")
+            # 转换为Confluence存储格式(默认使用Markdown宏)，结果按内容缓存
+            markdown_body = get_renderer().render_format(article_data.get("content", ""), CONFLUENCE_STORAGE)
             
-            result = self.client.create_page(
-                space=space_key,
-                title=article_data.get("title", "GitHub技术趋势报告"),
-                body=markdown_body,
-                parent_id=parent_page_id
-            )
+            if CONFLUENCE_PUBLISH_MODE == "upsert":
+                page_id = self.upsert_page(space_key, title, markdown_body, parent_page_id)
+            else:
+                page_id = self.client.create_page(
+                    space=space_key,
+                    title=title,
+                    body=markdown_body,
+                    parent_id=parent_page_id
+                )['id']
             
-            page_url = f"{self.client.url}/pages/viewpage.action?pageId={result['id']}"
-            logging.info(f"Confluence文章发布成功，页面ID: {result['id']}, 文章URL: {page_url}")
+            page_url = f"{self.client.url}/pages/viewpage.action?pageId={page_id}"
+            logging.info(f"Confluence文章发布成功，页面ID: {page_id}, 文章URL: {page_url}")
             return page_url
             
         except Exception as e:
             logging.error(f"Confluence文章发布失败: {e}")
-            return "#"
\ No newline at end of file
+            return "#"
+    
+    def upsert_page(self, space_key: str, title: str, body: str, parent_page_id: str = None) -> str:
+        """
+        按空间和标题查找页面(一次请求，同时取回版本、父页面和内容哈希)：不存在时新建；
+        已存在且内容哈希和父页面都未变化时跳过写入；否则更新页面
+        
+        :param space_key: Confluence空间key
+        :param title: 页面标题，同一空间内唯一
+        :param body: 存储格式的页面内容
+        :param parent_page_id: 父页面ID(可选)，页面不在该父页面下时会被移动过去
+        :return: 页面ID
+        """
+        content_hash = article_hash(body)
+        page = self.client.get_page_by_title(
+            space=space_key, title=title,
+            expand=f"version,ancestors,metadata.properties.{CONTENT_HASH_PROPERTY}"
+        )
+        
+        if page is None:
+            page_id = self.client.create_page(space=space_key, title=title, body=body, parent_id=parent_page_id)['id']
+            logging.info(f"Confluence页面不存在，已新建: {title}")
+            self._save_content_hash(page_id, content_hash, None)
+            return page_id
+        
+        page_id = page['id']
+        hash_property = page.get('metadata', {}).get('properties', {}).get(CONTENT_HASH_PROPERTY)
+        ancestors = page.get('ancestors') or []
+        current_parent_id = str(ancestors[-1]['id']) if ancestors else None
+        same_parent = not parent_page_id or current_parent_id == str(parent_page_id)
+        if hash_property and hash_property.get('value') == content_hash and same_parent:
+            logging.info(f"Confluence页面内容未变化，跳过更新: {title}, 页面ID: {page_id}")
+            return page_id
+        
+        if not same_parent:
+            logging.warning(f"Confluence页面{title}的父页面为{current_parent_id}，将移动到{parent_page_id}下")
+        # 内容哈希已比较过，不需要客户端再读取一次页面内容比较
+        self.client.update_page(page_id, title, body=body, parent_id=parent_page_id, always_update=True)
+        logging.info(f"Confluence页面内容已变化，已更新: {title}, 页面ID: {page_id}, "
+                     f"更新前版本: {page.get('version', {}).get('number', '?')}")
+        if not hash_property or hash_property.get('value') != content_hash:
+            self._save_content_hash(page_id, content_hash, hash_property)
+        return page_id
+    
+    def _save_content_hash(self, page_id: str, content_hash: str, hash_property: Optional[Dict]):
+        """
+        把内容哈希保存为页面属性；保存失败只影响下次是否跳过写入，不影响本次发布
+        """
+        try:
+            if hash_property:
+                version = hash_property.get('version', {}).get('number', 1)
+                self.client.update_page_property(page_id, {
+                    "key": CONTENT_HASH_PROPERTY, "value": content_hash, "version": {"number": version + 1}
+                })
+            else:
+                self.client.set_page_property(page_id, {"key": CONTENT_HASH_PROPERTY, "value": content_hash})
+        except Exception as e:
+            logging.warning(f"保存Confluence页面内容哈希失败，下次发布将重新写入页面: {e}")
\ No newline at end of file
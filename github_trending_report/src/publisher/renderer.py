@@ -0,0 +1,182 @@
+import hashlib
+import html
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+import markdown
+
+from config.settings import CONFLUENCE_BODY_FORMAT, RENDER_CACHE_SIZE, WECOM_DESCRIPTION_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+WECHAT_HTML = "wechat_html"
+CONFLUENCE_STORAGE = "confluence_storage"
+WECOM_SUMMARY = "wecom_summary"
+RENDER_FORMATS = (WECHAT_HTML, CONFLUENCE_STORAGE, WECOM_SUMMARY)
+
+# 公众号编辑器会丢弃<style>和class，样式需要内联到标签上，已有style属性的标签保持不变
+WECHAT_STYLES = {
+    "h1": "font-size: 22px; font-weight: bold; text-align: center; color: #333333; margin: 20px 0;",
+    "h2": "color: #ffffff; font-weight: bold; font-size: 17px; text-align: center; background-color: #3daad6; margin: 20px 0 10px;",
+    "h3": "color: #3daad6; font-weight: bold; font-size: 16px; margin: 16px 0 8px;",
+    "h4": "font-weight: bold; font-size: 16px; margin: 12px 0 6px;",
+    "p": "font-size: 16px; line-height: 1.75; margin: 10px 0;",
+    "li": "font-size: 16px; line-height: 1.75;",
+    "blockquote": "color: #888888; border-left: 4px solid #3daad6; padding-left: 10px; margin: 10px 0;",
+    "pre": "background-color: #f6f8fa; padding: 10px; overflow-x: auto; font-size: 14px;",
+    "code": "background-color: #f6f8fa; font-family: Menlo, Consolas, monospace; font-size: 14px;",
+    "a": "color: #3daad6;",
+    "table": "border-collapse: collapse; width: 100%; font-size: 14px;",
+    "th": "border: 1px solid #dddddd; padding: 6px; background-color: #f6f8fa;",
+    "td": "border: 1px solid #dddddd; padding: 6px;",
+}
+OPENING_TAG = re.compile(r"<(?P<tag>%s)(?P<attrs>(?:\s[^>]*)?)>" % "|".join(WECHAT_STYLES), re.IGNORECASE)
+# 大模型常把HTML包在```html代码块中并附带说明文字，只保留代码块内容
+HTML_FENCE = re.compile(r"```html\s*\n(?P<body>.*?)\n\s*```", re.DOTALL | re.IGNORECASE)
+HTML_TAG = re.compile(r"<[^>]+>")
+BLOCK_END = re.compile(r"</(?:p|h[1-6]|li|div|tr|blockquote|pre)>|<br\s*/?>", re.IGNORECASE)
+SUMMARY_MARK = "…"
+
+
+def article_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ArticleRenderer:
+    """
+    把生成的文章一次性渲染为各发布渠道的格式，按文章内容哈希和格式缓存结果
+
+    Markdown文章只解析一次，各格式共用解析结果；Markdown解析器在实例内复用，多线程调用时串行使用
+    """
+
+    def __init__(self, cache_size: int = RENDER_CACHE_SIZE, confluence_body_format: str = CONFLUENCE_BODY_FORMAT):
+        """
+        :param cache_size: 最多缓存的渲染结果数(文章 x 格式)
+        :param confluence_body_format: Confluence正文格式，"markdown_macro"使用Markdown宏，"xhtml"转换为原生存储格式
+        """
+        self.cache_size = cache_size
+        self.confluence_body_format = confluence_body_format
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._markdown = markdown.Markdown(extensions=["tables", "fenced_code", "sane_lists"], output_format="xhtml")
+        self._markdown_lock = threading.Lock()
+
+    def render(self, content: str, formats: Iterable[str] = RENDER_FORMATS) -> Dict[str, str]:
+        """
+        渲染文章的多种格式，已缓存的格式不重新渲染
+
+        :param content: 生成的文章内容，Markdown或HTML
+        :param formats: 需要的格式
+        :return: 格式 -> 渲染结果
+        """
+        digest = article_hash(content)
+        results, missing = {}, []
+        with self._cache_lock:
+            for fmt in formats:
+                if fmt not in RENDER_FORMATS:
+                    raise ValueError(f"未知的渲染格式: {fmt}")
+                cached = self._cache.get((digest, fmt))
+                if cached is None:
+                    missing.append(fmt)
+                else:
+                    self._cache.move_to_end((digest, fmt))
+                    results[fmt] = cached
+        if not missing:
+            return results
+
+        body = _extract_html(content)
+        is_html = body is not None
+        if not is_html:
+            body = self._markdown_to_html(content)
+        rendered = {}
+        for fmt in missing:
+            if fmt == WECHAT_HTML:
+                rendered[fmt] = _inline_wechat_styles(body)
+            elif fmt == CONFLUENCE_STORAGE:
+                rendered[fmt] = self._confluence_storage(content, body, is_html)
+            else:
+                rendered[fmt] = _summary(body, WECOM_DESCRIPTION_MAX_BYTES)
+        logger.debug(f"文章{digest[:12]}已渲染: {', '.join(missing)}")
+
+        with self._cache_lock:
+            for fmt, output in rendered.items():
+                self._cache[(digest, fmt)] = output
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        results.update(rendered)
+        return results
+
+    def render_format(self, content: str, fmt: str) -> str:
+        """
+        :param content: 生成的文章内容
+        :param fmt: 渲染格式，见RENDER_FORMATS
+        :return: 渲染结果
+        """
+        return self.render(content, (fmt,))[fmt]
+
+    def _markdown_to_html(self, content: str) -> str:
+        with self._markdown_lock:
+            try:
+                return self._markdown.convert(content)
+            finally:
+                self._markdown.reset()
+
+    def _confluence_storage(self, content: str, body: str, is_html: bool) -> str:
+        if self.confluence_body_format == "xhtml" or is_html:
+            return body
+        # CDATA中不能出现"]]>"，拆成两个CDATA段
+        cdata = content.replace("]]>", "]]]]><![CDATA[>")
+        return (f'<ac:structured-macro ac:name="markdown"><ac:plain-text-body><![CDATA[{cdata}]]>'
+                f'</ac:plain-text-body></ac:structured-macro>')
+
+
+def _extract_html(content: str):
+    """
+    内容为HTML时返回HTML正文(去掉代码块外的说明文字)，否则返回None
+    """
+    match = HTML_FENCE.search(content)
+    if match:
+        return match.group("body").strip()
+    stripped = content.strip()
+    return stripped if stripped.startswith("<") else None
+
+
+def _inline_wechat_styles(body: str) -> str:
+    def add_style(match):
+        attrs = match.group("attrs")
+        if re.search(r"\sstyle\s*=", attrs, re.IGNORECASE):
+            return match.group(0)
+        return f'<{match.group("tag")}{attrs.rstrip()} style="{WECHAT_STYLES[match.group("tag").lower()]}">'
+
+    return OPENING_TAG.sub(add_style, body)
+
+
+def _summary(body: str, max_bytes: int) -> str:
+    """
+    提取纯文本摘要，按UTF-8字节数截断(企业微信卡片描述限制512字节)
+    """
+    text = HTML_TAG.sub("", BLOCK_END.sub("\n", body))
+    lines = [" ".join(html.unescape(line).split()) for line in text.splitlines()]
+    text = "\n".join(line for line in lines if line)
+    if len(text.encode("utf-8")) <= max_bytes:
+        return text
+    limit = max_bytes - len(SUMMARY_MARK.encode("utf-8"))
+    return text.encode("utf-8")[:limit].decode("utf-8", "ignore").rstrip() + SUMMARY_MARK
+
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> ArticleRenderer:
+    """
+    进程内共用的渲染器，发布流程和各发布器共享同一份缓存
+    """
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None:
+            _default_renderer = ArticleRenderer()
+        return _default_renderer
@@ -1,27 +1,75 @@
 from wechatpy import WeChatClient
+from wechatpy.exceptions import WeChatClientException
 from config.settings import WECHAT_APP_ID, WECHAT_APP_SECRET,WECHAT_PUBLISH_MODE, WECHAT_AUTHOR, WECHAT_THUMB_MEDIA_ID
+from src.publisher.renderer import WECHAT_HTML, get_renderer
+from src.publisher.wechat_session import FileSessionStorage
 from typing import Dict
+import hashlib
 import json
 import os
 import logging
-import markdown
+
+COVER_IMAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "cover_image.png")
+# 素材ID无效，如缓存的封面素材已在公众号后台删除
+INVALID_MEDIA_ID_ERRCODE = 40007
 
 class WeChatPublisher:
     """
     微信公众号文章发布器
     """
     
-    def __init__(self):
-        self.client = WeChatClient(WECHAT_APP_ID, WECHAT_APP_SECRET)
+    def __init__(self, session=None):
+        """
+        :param session: wechatpy会话存储，默认使用文件存储，多次运行共用未过期的access_token和已上传的封面素材
+        """
+        self.session = session or FileSessionStorage()
+        self.client = WeChatClient(WECHAT_APP_ID, WECHAT_APP_SECRET, session=self.session)
     
     def markdown_to_html(self, markdown_content: str) -> str:
         """
-        将Markdown内容转换为微信公众号支持的HTML格式
+        将文章内容转换为微信公众号支持的内联样式HTML，结果按内容缓存
         
-        :param markdown_content: Markdown格式的文章内容
+        :param markdown_content: Markdown或HTML格式的文章内容
         :return: 转换后的HTML内容
         """
-        return markdown.markdown(markdown_content)
+        return get_renderer().render_format(markdown_content, WECHAT_HTML)
+        
+    def get_thumb_media_id(self, refresh: bool = False) -> str:
+        """
+        获取封面素材ID：优先使用配置的WECHAT_THUMB_MEDIA_ID，否则按封面图片内容的SHA-256查找已上传的素材，
+        图片内容变化或没有记录时才上传
+        
+        :param refresh: 忽略已记录的素材ID重新上传
+        :return: 封面素材ID
+        """
+        if WECHAT_THUMB_MEDIA_ID:
+            logging.info(f"使用配置的封面素材ID: {WECHAT_THUMB_MEDIA_ID}")
+            return WECHAT_THUMB_MEDIA_ID
+        
+        if not os.path.exists(COVER_IMAGE_PATH):
+            raise ValueError(f"封面图片路径不存在: {COVER_IMAGE_PATH}")
+        with open(COVER_IMAGE_PATH, 'rb') as f:
+            image = f.read()
+        cache_key = f"{self.client.appid}_cover_media_{hashlib.sha256(image).hexdigest()}"
+        
+        media_id = None if refresh else self.session.get(cache_key)
+        if media_id:
+            logging.info(f"封面图片未变化，使用已上传的封面素材ID: {media_id}")
+            return media_id
+        
+        # 上传封面素材
+        try:
+            with open(COVER_IMAGE_PATH, 'rb') as f:
+                result = self.client.material.add(
+                    media_type='image',
+                    media_file=f
+                )
+            logging.info(f"上传封面素材成功: {json.dumps(result)}")
+        except Exception as e:
+            logging.error(f"上传封面素材失败: {str(e)}")
+            raise
+        self.session.set(cache_key, result['media_id'])
+        return result['media_id']
         
     def publish_article(self, article_data: Dict) -> str:
         """
@@ -31,42 +79,28 @@ class WeChatPublisher:
         :return: 文章发布后的URL
         """
         try:
-            # 处理封面素材
-            if WECHAT_THUMB_MEDIA_ID:
-                result = {'media_id': WECHAT_THUMB_MEDIA_ID}
-                logging.info(f"使用配置的封面素材ID: {result['media_id']}")
-            else:
-                # 上传封面素材
-                cover_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "cover_image.png")
-                if not os.path.exists(cover_path):
-                    raise ValueError(f"封面图片路径不存在: {cover_path}")
-                    
-                try:
-                    with open(cover_path, 'rb') as f:
-                        result = self.client.material.add(
-                            media_type='image',
-                            media_file=f
-                        )
-                        logging.info(f"上传封面素材成功: {json.dumps(result)}")
-                except Exception as e:
-                    logging.error(f"上传封面素材失败: {str(e)}")
-                    raise
+            thumb_media_id = self.get_thumb_media_id()
 
             # 构造图文消息
-            content = article_data.get("content", "")
-            if content.startswith("#"):  # 简单检测是否为Markdown
-                content = self.markdown_to_html(content)
+            content = self.markdown_to_html(article_data.get("content", ""))
                 
             articles = [{
                 "title": article_data.get("title", "GitHub技术趋势报告"),
                 "content": content,
-                "thumb_media_id": result['media_id'],
+                "thumb_media_id": thumb_media_id,
                 "author": article_data.get("author", WECHAT_AUTHOR),
                 "digest": article_data.get("digest")
             }]
             
-            # 创建草稿
-            result = self.client.draft.add(articles=articles)
+            # 创建草稿，缓存的封面素材失效时重新上传一次
+            try:
+                result = self.client.draft.add(articles=articles)
+            except WeChatClientException as e:
+                if e.errcode != INVALID_MEDIA_ID_ERRCODE or WECHAT_THUMB_MEDIA_ID:
+                    raise
+                logging.warning(f"缓存的封面素材ID已失效，重新上传封面: {thumb_media_id}")
+                articles[0]["thumb_media_id"] = self.get_thumb_media_id(refresh=True)
+                result = self.client.draft.add(articles=articles)
             
             # 如果是发布模式而非草稿，则发布草稿
             if WECHAT_PUBLISH_MODE != "draft":
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+from wechatpy.session import SessionStorage
+
+from config.settings import WECHAT_SESSION_PATH
+
+logger = logging.getLogger(__name__)
+
+# 同一文件的读写在进程内共用一把锁
+_locks: Dict[Path, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(path.resolve(), threading.Lock())
+
+
+class FileSessionStorage(SessionStorage):
+    """
+    基于JSON文件的wechatpy会话存储，进程重启后继续使用未过期的access_token
+
+    每个键可带有效期，过期后读取返回默认值；写入先写临时文件再替换，避免中断时损坏文件
+    """
+
+    def __init__(self, path=WECHAT_SESSION_PATH):
+        """
+        :param path: 会话文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = _lock_for(self.path)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None:
+            return default
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return default
+        return entry["value"]
+
+    def set(self, key, value, ttl=None):
+        if value is None:
+            return
+        with self._lock:
+            data = self._load()
+            data[key] = {"value": value, "expires_at": time.time() + ttl if ttl else None}
+            self._save(data)
+
+    def delete(self, key):
+        with self._lock:
+            data = self._load()
+            if data.pop(key, None) is not None:
+                self._save(data)
+
+    def _load(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取微信会话文件失败，忽略已保存的会话: {self.path}, {e}")
+            return {}
+
+    def _save(self, data: Dict):
+        now = time.time()
+        data = {key: entry for key, entry in data.items()
+                if entry.get("expires_at") is None or entry["expires_at"] > now}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        # access_token属于凭证，文件只允许当前用户读写
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
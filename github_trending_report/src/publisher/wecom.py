@@ -1,64 +1,130 @@
 # -*- coding: utf-8 -*-
-import os
+import time
 import requests
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
 import logging
 
+from requests.adapters import HTTPAdapter
+
 # 企业微信配置
-from config.settings import WECOM_WEBHOOK_URLS
+from config.settings import (WECOM_WEBHOOK_URLS, WECOM_MAX_CONCURRENCY, WECOM_REQUEST_TIMEOUT, WECOM_MAX_RETRIES,
+                             WECOM_RETRY_BACKOFF)
+
+# 机器人发送消息超过频率限制(每分钟20条)
+RATE_LIMIT_ERRCODE = 45009
+
+
+@dataclass
+class WebhookResult:
+    """
+    单个群机器人的推送结果
+    """
+    webhook: str  # 脱敏后的Webhook地址
+    success: bool
+    attempts: int
+    elapsed: float
+    errcode: Optional[int] = None
+    errmsg: str = ""
+
 
 class WeComPublisher:
     """
     企业微信文章发布器，通过机器人以卡片式消息推送文章到群聊
     """
-    
-    def __init__(self):
-        if not WECOM_WEBHOOK_URLS:
+
+    def __init__(self, webhook_urls: List[str] = None, session: requests.Session = None):
+        """
+        :param webhook_urls: 群机器人Webhook地址列表，默认使用WECOM_WEBHOOK_URLS
+        :param session: 推送使用的会话，不传时创建连接池大小为WECOM_MAX_CONCURRENCY的会话
+        """
+        self.webhook_urls = [url.strip() for url in (webhook_urls or WECOM_WEBHOOK_URLS) if url.strip()]
+        if not self.webhook_urls:
             raise ValueError("企业微信Webhook URL列表未配置，请检查环境变量")
-        self.webhook_urls = WECOM_WEBHOOK_URLS
-    
-    def publish_article(self, article_data: Dict) -> str:
+        self.session = session or create_wecom_session()
+
+    def publish_article(self, article_data: Dict) -> List[WebhookResult]:
         """
-        发布文章到企业微信群聊
-        
+        并发推送文章到所有企业微信群聊，单个群推送失败不影响其他群
+
         :param article_data: 文章数据，包含标题、简介、链接等
-        :return: 文章发布后的URL
+        :return: 每个Webhook的推送结果，顺序与webhook_urls一致
         """
-        failed_urls = []
-        for webhook_url in self.webhook_urls:
-            if not webhook_url.strip():
-                continue
-            try:
-                title = article_data.get("title", "无标题文章")
-                description = article_data.get("description", "暂无文章简介")
-                article_url = article_data.get("url", "#")
-                pic_url = article_data.get("pic_url", "#")
-                
-                payload = {
-                    "msgtype": "news",
-                    "news": {
-                        "articles": [
-                            {
-                                "title": title,
-                                "description": description,
-                                "url": article_url,
-                                "picurl": pic_url
-                            }
-                        ]
+        payload = {
+            "msgtype": "news",
+            "news": {
+                "articles": [
+                    {
+                        "title": article_data.get("title", "无标题文章"),
+                        "description": article_data.get("description", "暂无文章简介"),
+                        "url": article_data.get("url", "#"),
+                        "picurl": article_data.get("pic_url", "#")
                     }
-                }
-                
-                response = requests.post(webhook_url, json=payload)
+                ]
+            }
+        }
+
+        max_workers = max(1, min(WECOM_MAX_CONCURRENCY, len(self.webhook_urls)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda url: self._post(url, payload), self.webhook_urls))
+
+        succeeded = sum(1 for result in results if result.success)
+        logging.info(f"企业微信消息推送完成，成功{succeeded}/{len(results)}个群")
+        for result in results:
+            status = "成功" if result.success else f"失败 errcode={result.errcode} {result.errmsg}"
+            logging.info(f"  {result.webhook}: {status}，尝试{result.attempts}次，耗时{result.elapsed:.2f}s")
+        return results
+
+    def _post(self, webhook_url: str, payload: Dict) -> WebhookResult:
+        """
+        推送到单个Webhook，触发频率限制时按指数退避重试，其他错误不重试以免重复发送
+        """
+        start = time.perf_counter()
+        webhook = mask_webhook_url(webhook_url)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                response = self.session.post(webhook_url, json=payload, timeout=WECOM_REQUEST_TIMEOUT)
                 response.raise_for_status()
-                
                 result = response.json()
-                if result.get("errcode") != 0:
-                    failed_urls.append(webhook_url)
-                    logging.error(f"企业微信消息推送失败，URL: {webhook_url}, 错误信息: {result.get('errmsg')}")
             except Exception as e:
-                failed_urls.append(webhook_url)
-                logging.error(f"企业微信消息推送失败，URL: {webhook_url}, 错误信息: {str(e)}")
-        
-        if failed_urls:
-            raise Exception(f"部分企业微信群消息推送失败，失败URL: {', '.join(failed_urls)}")
-        return ""
\ No newline at end of file
+                logging.error(f"企业微信消息推送失败，URL: {webhook}, 错误信息: {str(e)}")
+                return WebhookResult(webhook, False, attempts, time.perf_counter() - start, errmsg=str(e))
+
+            errcode = result.get("errcode")
+            if errcode == 0:
+                return WebhookResult(webhook, True, attempts, time.perf_counter() - start, errcode=errcode)
+            if errcode == RATE_LIMIT_ERRCODE and attempts <= WECOM_MAX_RETRIES:
+                delay = WECOM_RETRY_BACKOFF * 2 ** (attempts - 1)
+                logging.warning(f"企业微信机器人触发频率限制，{delay}秒后重试，URL: {webhook}")
+                time.sleep(delay)
+                continue
+            logging.error(f"企业微信消息推送失败，URL: {webhook}, 错误信息: {result.get('errmsg')}")
+            return WebhookResult(webhook, False, attempts, time.perf_counter() - start, errcode=errcode,
+                                 errmsg=result.get("errmsg", ""))
+
+
+def create_wecom_session(pool_size: int = WECOM_MAX_CONCURRENCY) -> requests.Session:
+    """
+    创建推送用的会话，同一主机的连接保持复用，连接池大小与并发数一致
+
+    :param pool_size: 连接池大小
+    :return: 会话
+    """
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def mask_webhook_url(webhook_url: str) -> str:
+    """
+    隐藏Webhook地址中的key，只保留末尾4位用于区分不同的群
+    """
+    parsed = urlparse(webhook_url)
+    key = parse_qs(parsed.query).get("key", [""])[0]
+    return f"{parsed.netloc}{parsed.path}?key=***{key[-4:]}" if key else f"{parsed.netloc}{parsed.path}"
@@ -0,0 +1,56 @@
+import threading
+from functools import partial
+from typing import Any, List, Optional
+
+from langchain_core.language_models.llms import LLM
+
+import config.settings as settings
+import main
+from src.generator.article_generator import ArticleGenerator
+
+PROJECTS = [{"name": "octo/demo", "description": "demo project", "stars": 100, "daily_stars": 10}]
+
+
+class BarrierLLM(LLM):
+    """
+    两个调用都到达屏障后才返回，只有并发生成时才能都成功；提示词包含fail_marker时直接失败
+    """
+    barrier: Any
+    fail_marker: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "barrier"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        if self.fail_marker in prompt:
+            raise RuntimeError("LLM调用失败")
+        self.barrier.wait(timeout=10)
+        return f"# 文章\n\n{prompt[:12]}"
+
+
+def test_templates_generate_concurrently_and_failure_is_isolated(tmp_path, monkeypatch):
+    published = []
+    monkeypatch.setattr(settings, "ARTICLE_CHANNEL_MAPPING", {
+        "TECH_ANALYSIS_TEMPLATE": ["confluence"],
+        "NEWS_REPORT_TEMPLATE": ["confluence"],
+        "TUTORIAL_TEMPLATE": ["confluence"],
+    })
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(main, "fetch_trending_batch", lambda **kwargs: [dict(project) for project in PROJECTS])
+    monkeypatch.setattr(main, "TrendingHistoryStore", lambda: type("Store", (), {"annotate_repos": lambda *a, **k: None})())
+    monkeypatch.setattr(main, "ArticleGenerator", partial(ArticleGenerator, use_cache=False))
+    lock = threading.Lock()
+
+    def publish(template_name, channel, content, today, channel_urls=None):
+        with lock:
+            published.append(template_name)
+        return "#"
+
+    monkeypatch.setattr(main, "publish_to_channel", publish)
+
+    main.main(llm=BarrierLLM(barrier=threading.Barrier(2), fail_marker="实战教程"))
+
+    assert sorted(published) == ["NEWS_REPORT_TEMPLATE", "TECH_ANALYSIS_TEMPLATE"]
+    articles = sorted(path.name.split("_", 2)[2] for path in tmp_path.glob("*.text"))
+    assert articles == ["NEWS_REPORT_TEMPLATE.text", "TECH_ANALYSIS_TEMPLATE.text"]